@@ -0,0 +1,104 @@
+# app/archive.py
+"""
+Cold-Storage Archival of Old Calculations
+
+Moves calculations whose updated_at is older than ARCHIVE_AFTER_DAYS from
+`calculations` into the compressed `archived_calculations` table, in
+batches of ARCHIVE_BATCH_SIZE. Each batch copies and deletes its rows in
+one transaction, so a row is always in exactly one of the two tables and
+the job can be stopped and re-run at any time. On PostgreSQL the batch is
+locked with SKIP LOCKED, so rows being edited are left for the next run.
+
+GET /calculations/{calc_id} falls back to the archive when the id is not
+in the hot table; list views show hot rows only. Archived rows are
+read-only apart from DELETE: PUT and inputs:append on one return 409
+Conflict rather than 404, so clients can tell "archived" from "gone".
+
+Usage:
+    python -m app.archive [--older-than-days N] [--batch-size N]
+"""
+
+import argparse
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, insert, select
+
+from app.core.config import get_settings
+from app.models.archive import ArchivedCalculation, pack_inputs
+from app.models.calculation import Calculation
+
+settings = get_settings()
+
+
+def archive_batch(bind, cutoff: datetime, batch_size: int) -> int:
+    """Archive up to `batch_size` rows last updated before `cutoff`; returns the count."""
+    with bind.begin() as conn:
+        rows = conn.execute(
+            select(
+                Calculation.id,
+                Calculation.user_id,
+                Calculation.type,
+                Calculation.inputs,
+                Calculation.result,
+                Calculation.created_at,
+                Calculation.updated_at,
+            )
+            .where(Calculation.updated_at < cutoff)
+            .order_by(Calculation.updated_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not rows:
+            return 0
+
+        archived_at = datetime.utcnow()
+        conn.execute(insert(ArchivedCalculation), [
+            {
+                "id": row.id,
+                "user_id": row.user_id,
+                "type": row.type,
+                "inputs_packed": pack_inputs(row.inputs),
+                "result": row.result,
+                "created_at": row.created_at,
+                "updated_at": row.updated_at,
+                "archived_at": archived_at,
+            }
+            for row in rows
+        ])
+        conn.execute(delete(Calculation).where(Calculation.id.in_([row.id for row in rows])))
+    return len(rows)
+
+
+def archive_calculations(
+    bind,
+    older_than_days: Optional[float] = None,
+    batch_size: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> int:
+    """Archive every calculation older than the cutoff; returns the number moved."""
+    days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    cutoff = (now or datetime.utcnow()) - timedelta(days=days)
+
+    total = 0
+    while True:
+        moved = archive_batch(bind, cutoff, size)
+        total += moved
+        if moved < size:
+            return total
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Move old calculations to the archive table")
+    parser.add_argument("--older-than-days", type=float, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    from app.database import engine
+    moved = archive_calculations(engine, args.older_than_days, args.batch_size)
+    print(f"Archived {moved} calculations")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# app/auth/calibrate.py
+"""
+Deploy-time bcrypt Calibration
+
+Finds the largest bcrypt cost whose hash time stays within a latency
+budget on this machine and saves it as BCRYPT_ROUNDS in the env file
+Settings reads, so every worker starts with the same cost.
+
+Calibration runs once per deployment, not in each worker: timings taken
+while workers boot side by side are noisy, and workers that settle on
+different costs would keep flagging each other's hashes for rehash on
+login. Run it on the hardware the app is deployed to; where settings come
+from the environment instead of a file, use --print-only and set the
+printed value.
+
+Usage:
+    python -m app.auth.calibrate --target-ms MS [--env-file PATH] [--print-only]
+"""
+
+import argparse
+import os
+
+from app.auth.jwt import calibrate_bcrypt_rounds
+
+
+def write_env_setting(path: str, name: str, value) -> None:
+    """Set `name=value` in an env file, replacing an existing assignment or appending one."""
+    lines = []
+    if os.path.exists(path):
+        with open(path) as env_file:
+            lines = env_file.read().splitlines()
+    assignment = f"{name}={value}"
+    for index, line in enumerate(lines):
+        if line.split("=", 1)[0].strip() == name:
+            lines[index] = assignment
+            break
+    else:
+        lines.append(assignment)
+    partial = f"{path}.tmp"
+    with open(partial, "w") as out:
+        out.write("\n".join(lines) + "\n")
+    os.replace(partial, path)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Calibrate and save the bcrypt cost")
+    parser.add_argument("--target-ms", type=float, required=True, help="Hash time budget in milliseconds")
+    parser.add_argument("--env-file", default=".env", help="Env file to save BCRYPT_ROUNDS to")
+    parser.add_argument("--print-only", action="store_true", help="Print the setting without saving it")
+    args = parser.parse_args(argv)
+
+    rounds = calibrate_bcrypt_rounds(args.target_ms)
+    if not args.print_only:
+        write_env_setting(args.env_file, "BCRYPT_ROUNDS", rounds)
+        print(f"Saved to {args.env_file}:")
+    print(f"BCRYPT_ROUNDS={rounds}")
+
+
+if __name__ == "__main__":
+    main()
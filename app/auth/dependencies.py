@@ -2,19 +2,24 @@ from datetime import datetime
 from uuid import UUID
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from app.auth.jwt import check_token_revocation
+from app.schemas.token import TokenType
 from app.schemas.user import UserResponse
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
-def get_current_user(
+async def get_current_user(
     token: str = Depends(oauth2_scheme)
 ) -> UserResponse:
     """
     Dependency to get the current user from the JWT token without a database lookup.
     This function supports two types of payloads:
-      - A full payload as a dict containing user info.
-      - A minimal payload, either as a dict with only a 'sub' key or directly as a UUID.
+      - A full payload containing user info.
+      - A minimal payload with only the 'sub' claim.
+    Only access tokens are accepted; a refresh token is rejected even when it
+    is signed with the same key. Tokens revoked by logout or logout-all are
+    rejected as well.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -22,36 +27,19 @@ def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    token_data = User.verify_token(token)
-    if token_data is None:
+    token_data = User.verify_token_payload(token)
+    if token_data is None or token_data.get("type") != TokenType.ACCESS.value:
         raise credentials_exception
+    await check_token_revocation(token_data)
 
     try:
-        # If the token data is a dictionary:
-        if isinstance(token_data, dict):
-            # If the payload contains a full set of user fields, use them directly.
-            if "username" in token_data:
-                return UserResponse(**token_data)
-            # Otherwise, assume it is a minimal payload with only the 'sub' key.
-            elif "sub" in token_data:
-                return UserResponse(
-                    id=token_data["sub"],
-                    username="unknown",
-                    email="unknown@example.com",
-                    first_name="Unknown",
-                    last_name="User",
-                    is_active=True,
-                    is_verified=False,
-                    created_at=datetime.utcnow(),
-                    updated_at=datetime.utcnow(),
-                )
-            else:
-                raise credentials_exception
-
-        # If the token data is directly a UUID (minimal payload):
-        elif isinstance(token_data, UUID):
+        # If the payload contains a full set of user fields, use them directly.
+        if "username" in token_data:
+            return UserResponse(**token_data)
+        # Otherwise, assume it is a minimal payload with only the 'sub' key.
+        elif "sub" in token_data:
             return UserResponse(
-                id=token_data,
+                id=UUID(token_data["sub"]),
                 username="unknown",
                 email="unknown@example.com",
                 first_name="Unknown",
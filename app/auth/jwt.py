@@ -1,38 +1,149 @@
 # app/auth/jwt.py
 from datetime import datetime, timedelta, timezone
 from typing import Any, Optional, Union
+from functools import lru_cache
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
 from uuid import UUID
+import logging
 import secrets
+import statistics
+import time
+
+from redis.exceptions import RedisError
 
 from app.core.config import get_settings
-from app.auth.redis import add_to_blacklist, is_blacklisted
+from app.auth.keys import get_keyring
+from app.auth.redis import add_to_blacklist, is_blacklisted, get_token_generation
 from app.schemas.token import TokenType
 from app.database import get_db
 from sqlalchemy.orm import Session
 from app.models.user import User
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Revocation checks are skipped until this monotonic time after a Redis error
+_revocation_unavailable_until = 0.0
+
+# Password hashing. min/max rounds equal to the target make needs_update() flag
+# any hash created with a different cost, so it is rehashed on the next login.
+# passlib is imported on first use: only login, registration and password
+# changes hash anything, and most requests just verify a JWT.
+@lru_cache()
+def get_password_context():
+    from passlib.context import CryptContext
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=settings.BCRYPT_ROUNDS,
+        bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+        bcrypt__max_rounds=settings.BCRYPT_ROUNDS
+    )
 
-# Password hashing
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto",
-    bcrypt__rounds=settings.BCRYPT_ROUNDS
-)
+def __getattr__(name: str):
+    # Keeps `from app.auth.jwt import pwd_context` working without an eager import
+    if name == "pwd_context":
+        return get_password_context()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+BCRYPT_MIN_ROUNDS = 4
+BCRYPT_MAX_ROUNDS = 31
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_password_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Hash a password using bcrypt."""
-    return pwd_context.hash(password)
+    return get_password_context().hash(password)
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check whether a stored hash uses a different cost than the current configuration."""
+    return get_password_context().needs_update(hashed_password)
+
+def calibrate_bcrypt_rounds(
+    target_ms: float,
+    probe_rounds: int = 8,
+    samples: int = 3
+) -> int:
+    """
+    Pick the largest bcrypt cost whose hash time stays within `target_ms` on this machine.
+
+    Times a few hashes at `probe_rounds` and extrapolates, since each extra
+    round doubles the work. Always returns at least BCRYPT_MIN_ROUNDS.
+    """
+    from passlib.context import CryptContext
+    probe_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=probe_rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        probe_context.hash("calibration-probe")
+        timings.append((time.perf_counter() - start) * 1000)
+    probe_ms = statistics.median(timings)
+
+    rounds = probe_rounds
+    while rounds < BCRYPT_MAX_ROUNDS and probe_ms * 2 ** (rounds + 1 - probe_rounds) <= target_ms:
+        rounds += 1
+    while rounds > BCRYPT_MIN_ROUNDS and probe_ms * 2 ** (rounds - probe_rounds) > target_ms:
+        rounds -= 1
+    return rounds
+
+def rehash_user_password(bind, user_id: Union[str, UUID], plain_password: str) -> None:
+    """
+    Re-hash a user's password with the current cost and store it.
+
+    Meant to run as a background task after a successful login, so the extra
+    bcrypt work is not on the request path. Skips the update if the stored hash
+    changed in the meantime (e.g. the password was reset).
+    """
+    with Session(bind=bind) as db:
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None or not password_needs_rehash(user.password):
+            return
+        old_hash = user.password
+        new_hash = get_password_hash(plain_password)
+        updated = db.query(User).filter(
+            User.id == user_id,
+            User.password == old_hash
+        ).update({User.password: new_hash}, synchronize_session=False)
+        if updated:
+            db.commit()
+
+def get_signing_key(token_type: TokenType) -> tuple[Any, Optional[dict]]:
+    """
+    Return the key used to sign a new token and any extra JWT headers.
+    Asymmetric algorithms sign with the active key ring entry and add its `kid`.
+    """
+    keyring = get_keyring()
+    if keyring is not None:
+        return keyring.active.private_key, {"kid": keyring.active_kid}
+    secret = (
+        settings.JWT_SECRET_KEY 
+        if token_type == TokenType.ACCESS 
+        else settings.JWT_REFRESH_SECRET_KEY
+    )
+    return secret, None
+
+def get_verification_key(token: str, token_type: TokenType) -> Any:
+    """
+    Return the key that should verify `token`.
+    Asymmetric tokens are matched to a cached public key by their `kid` header.
+    """
+    keyring = get_keyring()
+    if keyring is None:
+        return (
+            settings.JWT_SECRET_KEY 
+            if token_type == TokenType.ACCESS 
+            else settings.JWT_REFRESH_SECRET_KEY
+        )
+    signing_key = keyring.get(jwt.get_unverified_header(token).get("kid"))
+    if signing_key is None:
+        raise JWTError("Unknown signing key")
+    return signing_key.public_key
 
 def create_token(
     user_id: Union[str, UUID],
@@ -57,28 +168,62 @@ def create_token(
     if isinstance(user_id, UUID):
         user_id = str(user_id)
 
+    issued_at = datetime.now(timezone.utc)
     to_encode = {
         "sub": user_id,
         "type": token_type.value,
         "exp": expire,
-        "iat": datetime.now(timezone.utc),
+        "iat": issued_at,
+        # `iat` has 1-second resolution; token generations are compared in ms
+        "iat_ms": int(issued_at.timestamp() * 1000),
         "jti": secrets.token_hex(16)
     }
 
-    secret = (
-        settings.JWT_SECRET_KEY 
-        if token_type == TokenType.ACCESS 
-        else settings.JWT_REFRESH_SECRET_KEY
-    )
+    key, headers = get_signing_key(token_type)
 
     try:
-        return jwt.encode(to_encode, secret, algorithm=settings.ALGORITHM)
+        return jwt.encode(to_encode, key, algorithm=settings.ALGORITHM, headers=headers)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Could not create token: {str(e)}"
         )
 
+def issued_at_ms(payload: dict) -> int:
+    """A token's issue time in epoch milliseconds (second precision for older tokens)."""
+    if "iat_ms" in payload:
+        return int(payload["iat_ms"])
+    return int(payload["iat"]) * 1000
+
+async def check_token_revocation(payload: dict) -> None:
+    """
+    Raise 401 if a verified token has been revoked: its JTI is blacklisted
+    (logout) or it was issued at or before the user's token generation
+    (logout-all, refresh-token reuse).
+
+    Redis is optional, so when it is unreachable the checks are skipped
+    for TOKEN_REVOCATION_REDIS_RETRY_SECONDS rather than failing every
+    authenticated request; signature and expiry are still enforced.
+    """
+    global _revocation_unavailable_until
+    if time.monotonic() < _revocation_unavailable_until:
+        return
+    try:
+        revoked = (
+            await is_blacklisted(payload["jti"])
+            or issued_at_ms(payload) <= await get_token_generation(payload["sub"])
+        )
+    except (RedisError, OSError):
+        logger.warning("Redis unavailable, skipping token revocation checks")
+        _revocation_unavailable_until = time.monotonic() + settings.TOKEN_REVOCATION_REDIS_RETRY_SECONDS
+        return
+    if revoked:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
 async def decode_token(
     token: str,
     token_type: TokenType,
@@ -88,15 +233,11 @@ async def decode_token(
     Decode and verify a JWT token.
     """
     try:
-        secret = (
-            settings.JWT_SECRET_KEY 
-            if token_type == TokenType.ACCESS 
-            else settings.JWT_REFRESH_SECRET_KEY
-        )
+        key = get_verification_key(token, token_type)
         
         payload = jwt.decode(
             token,
-            secret,
+            key,
             algorithms=[settings.ALGORITHM],
             options={"verify_exp": verify_exp}
         )
@@ -108,13 +249,7 @@ async def decode_token(
                 headers={"WWW-Authenticate": "Bearer"},
             )
             
-        if await is_blacklisted(payload["jti"]):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token has been revoked",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-            
+        await check_token_revocation(payload)
         return payload
         
     except jwt.ExpiredSignatureError:
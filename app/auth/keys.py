@@ -0,0 +1,102 @@
+# app/auth/keys.py
+"""
+Signing keys for asymmetric JWTs.
+
+When ALGORITHM is an RSA or EC algorithm, tokens are signed with a private key
+loaded from JWT_KEY_DIR and carry its `kid` in the header. Keys are parsed once
+and cached, and their public halves are published as a JWKS so other services
+can verify tokens without sharing a secret.
+
+Key directory layout:
+    <kid>.pem      private key (PEM); can sign and verify
+    <kid>.pub.pem  public key only; verify-only (a retired key during rotation)
+
+The signing key is JWT_ACTIVE_KID, or the last private key in sorted order, so
+date-prefixed kids (e.g. "2025-06") rotate by simply adding a newer file.
+"""
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+from jose import jwk
+from jose.backends.base import Key
+
+from app.core.config import get_settings
+
+ASYMMETRIC_ALGORITHMS = {"RS256", "RS384", "RS512", "ES256", "ES384", "ES512"}
+
+
+class SigningKey:
+    """A parsed key pair (or public key) identified by `kid`."""
+
+    def __init__(self, kid: str, algorithm: str, private_key: Optional[Key], public_key: Key):
+        self.kid = kid
+        self.algorithm = algorithm
+        self.private_key = private_key
+        self.public_key = public_key
+
+    def to_jwk(self) -> dict:
+        """Public JWK representation of this key."""
+        data = self.public_key.to_dict()
+        data.update({"kid": self.kid, "use": "sig", "alg": self.algorithm})
+        return data
+
+
+class KeyRing:
+    """All keys accepted for verification, plus the one used for signing."""
+
+    def __init__(self, keys: Dict[str, SigningKey], active_kid: str):
+        if active_kid not in keys or keys[active_kid].private_key is None:
+            raise ValueError(f"No private key found for active kid '{active_kid}'")
+        self.keys = keys
+        self.active_kid = active_kid
+
+    @property
+    def active(self) -> SigningKey:
+        return self.keys[self.active_kid]
+
+    def get(self, kid: Optional[str]) -> Optional[SigningKey]:
+        return self.keys.get(kid) if kid else None
+
+    def jwks(self) -> dict:
+        return {"keys": [key.to_jwk() for key in self.keys.values()]}
+
+
+def load_keyring(key_dir: str, algorithm: str, active_kid: Optional[str] = None) -> KeyRing:
+    """
+    Parse every key in `key_dir` into jose key objects.
+
+    Raises:
+        ValueError: If the algorithm is not asymmetric or no usable key is found
+    """
+    if algorithm not in ASYMMETRIC_ALGORITHMS:
+        raise ValueError(f"Algorithm {algorithm} does not use signing keys")
+
+    keys: Dict[str, SigningKey] = {}
+    for path in sorted(Path(key_dir).glob("*.pem")):
+        pem = path.read_text()
+        if path.name.endswith(".pub.pem"):
+            kid = path.name[:-len(".pub.pem")]
+            keys.setdefault(kid, SigningKey(kid, algorithm, None, jwk.construct(pem, algorithm)))
+        else:
+            kid = path.stem
+            private_key = jwk.construct(pem, algorithm)
+            keys[kid] = SigningKey(kid, algorithm, private_key, private_key.public_key())
+
+    signing_kids = [kid for kid, key in keys.items() if key.private_key is not None]
+    if not signing_kids:
+        raise ValueError(f"No private signing keys found in {key_dir}")
+
+    return KeyRing(keys, active_kid or signing_kids[-1])
+
+
+@lru_cache()
+def get_keyring() -> Optional[KeyRing]:
+    """Load and cache the configured key ring; None when using a shared-secret algorithm."""
+    settings = get_settings()
+    if settings.ALGORITHM not in ASYMMETRIC_ALGORITHMS:
+        return None
+    if not settings.JWT_KEY_DIR:
+        raise ValueError(f"JWT_KEY_DIR must be set when ALGORITHM is {settings.ALGORITHM}")
+    return load_keyring(settings.JWT_KEY_DIR, settings.ALGORITHM, settings.JWT_ACTIVE_KID)
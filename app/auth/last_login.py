@@ -0,0 +1,149 @@
+# app/auth/last_login.py
+"""
+Write-behind buffering of users.last_login.
+
+Writing last_login on every login makes each login a row UPDATE on the
+users table: during login peaks that is lock contention on hot rows and
+WAL churn for a value nobody needs to the millisecond. Instead, each
+worker keeps the latest login time per user in memory and writes them all
+with a single UPDATE statement (a CASE on the user id, not one UPDATE per
+user):
+
+- every LAST_LOGIN_FLUSH_SECONDS, from a background task started in the
+  app lifespan, and
+- as soon as LAST_LOGIN_MAX_PENDING users are waiting, by waking that task
+  early so memory and the size of one UPDATE stay bounded without making
+  the login that filled the buffer pay for the write, and
+- on shutdown.
+
+So a stored last_login is at most one flush interval behind while the
+worker runs; only a crashed worker loses its pending timestamps. The UPDATE
+never moves last_login backwards, so workers flushing in any order agree.
+A failed flush keeps its timestamps for the next attempt.
+
+Outside the lifespan (scripts, tests) or with LAST_LOGIN_FLUSH_SECONDS = 0,
+logins write last_login through the caller's session as before.
+"""
+
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import case, or_, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class LastLoginBuffer:
+    """Collects login timestamps and writes them to the users table in batches."""
+
+    def __init__(self, flush_seconds: float, max_pending: int):
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self._pending: Dict[UUID, datetime] = {}
+        self._lock = threading.Lock()
+        self._bind = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    @property
+    def running(self) -> bool:
+        return self._bind is not None
+
+    def record(self, db, user, at: datetime) -> None:
+        """
+        Note that `user` logged in at `at`.
+
+        Buffered while the flusher runs; otherwise set on the user and
+        flushed through `db`, for the caller to commit.
+        """
+        if not self.running:
+            user.last_login = at
+            db.flush()
+            return
+        with self._lock:
+            previous = self._pending.get(user.id)
+            if previous is None or at > previous:
+                self._pending[user.id] = at
+            full = len(self._pending) >= self.max_pending
+        if full:
+            # Logins may be recorded from the threadpool
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def flush(self, bind=None) -> int:
+        """Write every pending timestamp in one UPDATE statement; returns how many were written."""
+        from app.models.user import User
+
+        bind = bind or self._bind
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending or bind is None:
+            return 0
+
+        # Parameter lists would go out as executemany, one UPDATE per user
+        login_at = case(pending, value=User.id)
+        statement = (
+            update(User)
+            .where(
+                User.id.in_(pending),
+                or_(User.last_login.is_(None), User.last_login < login_at),
+            )
+            .values(last_login=login_at)
+        )
+        try:
+            with bind.begin() as conn:
+                conn.execute(statement)
+        except SQLAlchemyError:
+            logger.exception("Flushing %d last_login timestamps failed; will retry", len(pending))
+            with self._lock:
+                for user_id, at in pending.items():
+                    newer = self._pending.get(user_id)
+                    if newer is None or at > newer:
+                        self._pending[user_id] = at
+            return 0
+        return len(pending)
+
+    async def run(self) -> None:
+        """Flush every flush_seconds, or sooner when the buffer fills, until cancelled."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await asyncio.to_thread(self.flush)
+
+    def start(self, bind) -> None:
+        """Start buffering logins (no-op when flush_seconds is 0)."""
+        if self.flush_seconds > 0 and self._flusher is None:
+            self._bind = bind
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._flusher = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write what is still pending."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        bind, self._bind = self._bind, None  # later logins write through
+        if bind is not None:
+            await asyncio.to_thread(self.flush, bind)
+
+
+last_login_buffer = LastLoginBuffer(
+    flush_seconds=settings.LAST_LOGIN_FLUSH_SECONDS,
+    max_pending=settings.LAST_LOGIN_MAX_PENDING,
+)
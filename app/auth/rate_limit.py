@@ -0,0 +1,280 @@
+# app/auth/rate_limit.py
+"""
+Request rate limiting and concurrency quotas.
+
+Limits are enforced with sliding-window counters and lease sets in Redis, so
+they hold across all uvicorn workers. If Redis is unreachable, each worker
+falls back to in-process token buckets and counters until Redis recovers.
+"""
+
+import math
+import secrets
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+from redis.exceptions import RedisError
+
+from app.auth.dependencies import get_current_active_user
+from app.auth.redis import get_redis
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Trims entries older than the window, then admits the request if there is room.
+# Returns {allowed, retry_after_ms} in a single round trip.
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
+if redis.call('ZCARD', key) < limit then
+    redis.call('ZADD', key, now, ARGV[4])
+    redis.call('PEXPIRE', key, window)
+    return {1, 0}
+end
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+return {0, tonumber(oldest[2]) + window - now}
+"""
+
+# Drops expired leases, then takes a lease if fewer than the limit are held.
+# Leases expire on their own, so a crashed worker cannot leak slots forever.
+ACQUIRE_LEASE_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local lease = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now)
+if redis.call('ZCARD', key) < tonumber(ARGV[3]) then
+    redis.call('ZADD', key, now + lease, ARGV[4])
+    redis.call('PEXPIRE', key, lease)
+    return 1
+end
+return 0
+"""
+
+# While set in the future, limiters skip Redis and use local buckets.
+_redis_unavailable_until = 0.0
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    retry_after: float  # seconds until the next request would be admitted
+
+
+class TokenBucket:
+    """In-process token bucket: `capacity` burst, refilled at `rate` tokens per second."""
+
+    def __init__(self, capacity: int, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def consume(self) -> RateLimitResult:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return RateLimitResult(True, 0.0)
+        return RateLimitResult(False, (1 - self.tokens) / self.rate)
+
+
+class SlidingWindowLimiter:
+    """Allow at most `limit` requests per identifier in any `window` seconds."""
+
+    def __init__(self, name: str, limit: int, window: float, max_local_buckets: int = 10_000):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.max_local_buckets = max_local_buckets
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def _local_hit(self, identifier: str) -> RateLimitResult:
+        bucket = self._buckets.get(identifier)
+        if bucket is None:
+            # Evict the least recently used buckets only: clearing them all would let
+            # a flood of new identifiers reset the bucket of the one under attack
+            while len(self._buckets) >= self.max_local_buckets:
+                self._buckets.popitem(last=False)
+            bucket = self._buckets[identifier] = TokenBucket(self.limit, self.limit / self.window)
+        else:
+            self._buckets.move_to_end(identifier)
+        return bucket.consume()
+
+    async def hit(self, identifier: str) -> RateLimitResult:
+        """Record a request for `identifier` and report whether it is within the limit."""
+        global _redis_unavailable_until
+        if time.monotonic() < _redis_unavailable_until:
+            return self._local_hit(identifier)
+
+        now_ms = int(time.time() * 1000)
+        try:
+            redis = await get_redis()
+            allowed, retry_after_ms = await redis.eval(
+                SLIDING_WINDOW_SCRIPT,
+                1,
+                f"ratelimit:{self.name}:{identifier}",
+                now_ms,
+                int(self.window * 1000),
+                self.limit,
+                # Random like lease ids: hits from other workers in the same
+                # millisecond must not collapse into one ZSET member
+                f"{now_ms}-{secrets.token_hex(8)}",
+            )
+        except (RedisError, OSError):
+            _redis_unavailable_until = time.monotonic() + settings.RATE_LIMIT_REDIS_RETRY_SECONDS
+            return self._local_hit(identifier)
+        return RateLimitResult(bool(allowed), int(retry_after_ms) / 1000)
+
+    def reset(self):
+        """Forget all in-process state (Redis windows expire on their own)."""
+        self._buckets.clear()
+
+
+class ConcurrencyLimiter:
+    """Allow at most `limit` in-flight requests per identifier."""
+
+    def __init__(self, name: str, limit: int, lease_seconds: float):
+        self.name = name
+        self.limit = limit
+        self.lease_seconds = lease_seconds
+        self._local: Dict[str, int] = {}
+
+    def _key(self, identifier: str) -> str:
+        return f"concurrency:{self.name}:{identifier}"
+
+    def _local_acquire(self, identifier: str) -> Optional[str]:
+        if self._local.get(identifier, 0) >= self.limit:
+            return None
+        self._local[identifier] = self._local.get(identifier, 0) + 1
+        return "local"
+
+    async def acquire(self, identifier: str) -> Optional[str]:
+        """Take a slot; returns a lease id to pass to release(), or None if all slots are busy."""
+        global _redis_unavailable_until
+        if time.monotonic() < _redis_unavailable_until:
+            return self._local_acquire(identifier)
+
+        lease_id = secrets.token_hex(8)
+        try:
+            redis = await get_redis()
+            acquired = await redis.eval(
+                ACQUIRE_LEASE_SCRIPT,
+                1,
+                self._key(identifier),
+                int(time.time() * 1000),
+                int(self.lease_seconds * 1000),
+                self.limit,
+                lease_id,
+            )
+        except (RedisError, OSError):
+            _redis_unavailable_until = time.monotonic() + settings.RATE_LIMIT_REDIS_RETRY_SECONDS
+            return self._local_acquire(identifier)
+        return lease_id if acquired else None
+
+    async def release(self, identifier: str, lease_id: str) -> None:
+        """Give back a slot taken by acquire()."""
+        if lease_id == "local":
+            remaining = self._local.get(identifier, 0) - 1
+            if remaining > 0:
+                self._local[identifier] = remaining
+            else:
+                self._local.pop(identifier, None)
+            return
+        try:
+            redis = await get_redis()
+            await redis.zrem(self._key(identifier), lease_id)
+        except (RedisError, OSError):
+            pass  # the lease expires on its own
+
+    def reset(self):
+        """Forget all in-process state (Redis leases expire on their own)."""
+        self._local.clear()
+
+
+def too_many_requests(retry_after: float, detail: str = "Too many requests") -> HTTPException:
+    """Build a 429 response telling the client when to retry."""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+calculation_rate_limiter = SlidingWindowLimiter(
+    "calculations",
+    settings.CALCULATION_RATE_LIMIT,
+    settings.CALCULATION_RATE_LIMIT_WINDOW_SECONDS,
+)
+calculation_concurrency_limiter = ConcurrencyLimiter(
+    "calculations",
+    settings.CALCULATION_MAX_CONCURRENT,
+    settings.CALCULATION_LEASE_SECONDS,
+)
+login_username_limiter = SlidingWindowLimiter(
+    "login:user",
+    settings.LOGIN_RATE_LIMIT_PER_USERNAME,
+    settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+)
+login_ip_limiter = SlidingWindowLimiter(
+    "login:ip",
+    settings.LOGIN_RATE_LIMIT_PER_IP,
+    settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+)
+
+
+async def _login_username(request: Request) -> Optional[str]:
+    """Read the submitted username from a JSON or form login body."""
+    try:
+        if request.headers.get("content-type", "").startswith("application/json"):
+            body = await request.json()
+            username = body.get("username") if isinstance(body, dict) else None
+        else:
+            username = (await request.form()).get("username")
+    except Exception:
+        return None
+    return username.strip().lower() if isinstance(username, str) and username.strip() else None
+
+
+async def login_rate_limit(request: Request) -> None:
+    """
+    Dependency that rejects login attempts over the per-IP or per-username limit.
+
+    It runs before the route body, so throttled attempts never reach
+    User.authenticate and its bcrypt verification.
+    """
+    checks: Tuple[Tuple[SlidingWindowLimiter, Optional[str]], ...] = (
+        (login_ip_limiter, request.client.host if request.client else None),
+        (login_username_limiter, await _login_username(request)),
+    )
+    for limiter, identifier in checks:
+        if identifier is None:
+            continue
+        result = await limiter.hit(identifier)
+        if not result.allowed:
+            raise too_many_requests(result.retry_after, "Too many login attempts, try again later")
+
+
+async def calculation_quota(current_user=Depends(get_current_active_user)):
+    """
+    Dependency enforcing per-user request rate and concurrency on calculation routes.
+
+    Both quotas are keyed by the authenticated user's id. The concurrency
+    slot is held until the route finishes, so one account cannot tie up
+    the database pool with parallel requests.
+    """
+    user_id = str(current_user.id)
+    result = await calculation_rate_limiter.hit(user_id)
+    if not result.allowed:
+        raise too_many_requests(result.retry_after, "Request rate limit exceeded")
+
+    lease_id = await calculation_concurrency_limiter.acquire(user_id)
+    if lease_id is None:
+        raise too_many_requests(1, "Too many concurrent requests")
+    try:
+        yield
+    finally:
+        await calculation_concurrency_limiter.release(user_id, lease_id)
@@ -1,19 +1,64 @@
 # app/auth/redis.py
-from redis.asyncio import Redis
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Mapping, Tuple
+
+from redis.asyncio import ConnectionPool, Redis
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
 from app.core.config import get_settings
 
 settings = get_settings()
 
+# Raises a user's token generation to "now" (epoch milliseconds) but never lowers
+# it, so concurrent logout-all calls from several workers cannot move it backwards.
+BUMP_TOKEN_GENERATION_SCRIPT = """
+local now = tonumber(ARGV[1])
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+if now > current then
+    redis.call('SET', KEYS[1], now, 'EX', ARGV[2])
+    current = now
+end
+return current
+"""
+
+# user_id -> (generation, monotonic deadline after which it must be re-read),
+# least recently used first and bounded by TOKEN_GENERATION_CACHE_MAX_ENTRIES
+_generation_cache: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+
+def create_connection_pool() -> ConnectionPool:
+    """Build a connection pool from the Redis settings"""
+    retry = Retry(
+        ExponentialBackoff(
+            cap=settings.REDIS_RETRY_BACKOFF_CAP,
+            base=settings.REDIS_RETRY_BACKOFF_BASE
+        ),
+        settings.REDIS_RETRY_ATTEMPTS
+    )
+    return ConnectionPool.from_url(
+        settings.REDIS_URL or "redis://localhost:6379/0",
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+        health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+        retry=retry,
+        encoding="utf-8",
+        decode_responses=True
+    )
+
 async def get_redis():
     """Get or create Redis connection"""
     if not hasattr(get_redis, "redis"):
-        get_redis.redis = Redis.from_url(
-            settings.REDIS_URL or "redis://localhost:6379/0",
-            encoding="utf-8",
-            decode_responses=True
-        )
+        get_redis.redis = Redis(connection_pool=create_connection_pool())
     return get_redis.redis
 
+async def close_redis():
+    """Close the Redis connection and release its pool"""
+    if hasattr(get_redis, "redis"):
+        redis = get_redis.redis
+        del get_redis.redis
+        await redis.aclose()
+
 async def add_to_blacklist(jti: str, exp: int):
     """Add a token's JTI to the blacklist"""
     redis = await get_redis()
@@ -22,4 +67,66 @@ async def add_to_blacklist(jti: str, exp: int):
 async def is_blacklisted(jti: str) -> bool:
     """Check if a token's JTI is blacklisted"""
     redis = await get_redis()
-    return await redis.exists(f"blacklist:{jti}")
\ No newline at end of file
+    return await redis.exists(f"blacklist:{jti}")
+
+async def add_many_to_blacklist(entries: Mapping[str, int]):
+    """Blacklist several JTIs (mapped to their TTL in seconds) in one round trip"""
+    if not entries:
+        return
+    redis = await get_redis()
+    async with redis.pipeline(transaction=False) as pipe:
+        for jti, exp in entries.items():
+            pipe.set(f"blacklist:{jti}", "1", ex=exp)
+        await pipe.execute()
+
+async def are_blacklisted(jtis: Iterable[str]) -> Dict[str, bool]:
+    """Check several JTIs against the blacklist in one round trip"""
+    jtis = list(jtis)
+    if not jtis:
+        return {}
+    redis = await get_redis()
+    values = await redis.mget([f"blacklist:{jti}" for jti in jtis])
+    return {jti: value is not None for jti, value in zip(jtis, values)}
+
+def _cache_generation(user_id: str, generation: int):
+    _generation_cache[user_id] = (
+        generation, time.monotonic() + settings.TOKEN_GENERATION_CACHE_SECONDS
+    )
+    _generation_cache.move_to_end(user_id)
+    while len(_generation_cache) > settings.TOKEN_GENERATION_CACHE_MAX_ENTRIES:
+        _generation_cache.popitem(last=False)
+
+async def get_token_generation(user_id: str) -> int:
+    """
+    Get a user's token generation: tokens issued at or before this epoch millisecond are revoked.
+    Values are cached in-process for TOKEN_GENERATION_CACHE_SECONDS.
+    """
+    cached = _generation_cache.get(user_id)
+    if cached is not None and cached[1] > time.monotonic():
+        _generation_cache.move_to_end(user_id)
+        return cached[0]
+    redis = await get_redis()
+    generation = int(await redis.get(f"token_generation:{user_id}") or 0)
+    _cache_generation(user_id, generation)
+    return generation
+
+async def bump_token_generation(user_id: str) -> int:
+    """Revoke every token issued to a user so far with a single O(1) write"""
+    redis = await get_redis()
+    generation = int(await redis.eval(
+        BUMP_TOKEN_GENERATION_SCRIPT,
+        1,
+        f"token_generation:{user_id}",
+        int(time.time() * 1000),
+        settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+    ))
+    _cache_generation(user_id, generation)
+    return generation
+
+async def mark_refresh_token_used(jti: str, exp: int) -> bool:
+    """
+    Record a refresh token's JTI as spent for `exp` seconds.
+    Returns False if it had already been used (i.e. the token is being replayed).
+    """
+    redis = await get_redis()
+    return bool(await redis.set(f"refresh_used:{jti}", "1", ex=exp, nx=True))
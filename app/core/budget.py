@@ -0,0 +1,134 @@
+# app/core/budget.py
+"""
+Bounded-cost evaluation.
+
+Two guards keep one calculation from monopolising a worker:
+
+1. A cost model. An exponentiation chain is estimated in log space before
+   anything is computed: log10|b ** e| = e * log10|b|, applied left to
+   right. If the estimate leaves the float range the chain is rejected as an
+   overflow immediately, instead of first building a Python int with
+   millions of digits (integer inputs never overflow on their own) or
+   spending the CPU to find out.
+
+2. A hard budget for worker processes. evaluation_budget() arms a CPU-time
+   timer (SIGPROF) and lowers the address-space limit for the duration of
+   one evaluation, so a runaway job fails with BudgetExceeded instead of
+   pinning a pool process after its HTTP-level timeout has given up on it.
+   Signals and rlimits are per process, so the budget is only armed in the
+   main thread of a process that evaluates one calculation at a time (the
+   job pool); in-request evaluation relies on the cost model, which leaves
+   only O(len(inputs)) float operations to run.
+"""
+
+import math
+import signal
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional, Sequence
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+# log10 of the largest finite float; anything above overflows the result column
+MAX_RESULT_LOG10 = math.log10(sys.float_info.max)
+
+
+class BudgetExceeded(ValueError):
+    """An evaluation ran past its CPU-time or memory budget."""
+
+
+def power_log10(base_log10: float, exponent: float) -> float:
+    """log10|b ** e| given log10|b|; -inf stands for a zero result."""
+    if exponent == 0:
+        return 0.0  # x ** 0 == 1
+    if base_log10 == -math.inf:
+        return -math.inf if exponent > 0 else math.inf  # 0 ** -e diverges
+    return base_log10 * exponent
+
+
+def power_chain_log10(inputs: Sequence[float]) -> float:
+    """
+    Estimated log10 of |((a ** b) ** c) ...| without evaluating it.
+
+    Stops at the first intermediate result past MAX_RESULT_LOG10: left-to-right
+    evaluation would have to build that value even if a later exponent of 0
+    collapsed it to 1.
+    """
+    base = inputs[0]
+    magnitude = math.log10(abs(base)) if base != 0 else -math.inf
+    for exponent in inputs[1:]:
+        magnitude = power_log10(magnitude, exponent)
+        if magnitude > MAX_RESULT_LOG10:
+            break
+    return magnitude
+
+
+def check_power_chain(inputs: Sequence[float]) -> None:
+    """Reject an exponentiation chain whose result would not fit in a float."""
+    if len(inputs) >= 2 and power_chain_log10(inputs) > MAX_RESULT_LOG10:
+        raise ValueError("Result too large (overflow)")
+
+
+def _address_space_bytes() -> Optional[int]:
+    """Current virtual memory size of this process (Linux only)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * resource.getpagesize()
+
+
+def _raise_cpu_exceeded(signum, frame):
+    raise BudgetExceeded("Calculation exceeded its CPU time budget")
+
+
+@contextmanager
+def evaluation_budget(cpu_seconds: Optional[float], memory_bytes: Optional[int]) -> Iterator[None]:
+    """
+    Enforce a CPU-time and memory budget on the enclosed evaluation.
+
+    CPU time is measured with ITIMER_PROF (user + system time of this
+    process). Memory is capped by setting RLIMIT_AS to the current size plus
+    `memory_bytes`; an allocation past it raises MemoryError, reported as
+    BudgetExceeded. Both limits are restored on exit. Outside the main
+    thread, or without setitimer/rlimits, this is a no-op.
+    """
+    armed = (
+        resource is not None
+        and hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+    )
+    if not armed:
+        yield
+        return
+
+    previous_handler, timer_armed = None, False
+    previous_limit = None
+    if cpu_seconds:
+        previous_handler = signal.signal(signal.SIGPROF, _raise_cpu_exceeded)
+        timer_armed = True
+        signal.setitimer(signal.ITIMER_PROF, cpu_seconds)
+    if memory_bytes:
+        current = _address_space_bytes()
+        if current is not None:
+            previous_limit = resource.getrlimit(resource.RLIMIT_AS)
+            hard = previous_limit[1]
+            soft = current + memory_bytes
+            if hard != resource.RLIM_INFINITY:
+                soft = min(soft, hard)
+            resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+    try:
+        yield
+    except MemoryError:
+        raise BudgetExceeded("Calculation exceeded its memory budget") from None
+    finally:
+        if previous_limit is not None:
+            resource.setrlimit(resource.RLIMIT_AS, previous_limit)
+        if timer_armed:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, previous_handler or signal.SIG_DFL)
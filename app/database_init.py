@@ -1,12 +1,103 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from sqlalchemy import Column, Integer, MetaData, Table, inspect, select, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from app.core.config import get_settings
 from app.database import engine
 from app.models.user import Base
+from app.models.archive import ArchivedCalculation  # noqa: F401  registers the archive table
+from app.partitions import create_partitions
+
+# Bump whenever the models change in a way create_all cannot apply to an
+# existing database, so fast-start workers refuse to run against it. Each
+# bump needs a matching entry in app.migrations.MIGRATIONS.
+SCHEMA_VERSION = 4
+
+# Key of the PostgreSQL advisory lock that serializes schema changes, so
+# workers starting together do not create, migrate or stamp concurrently
+SCHEMA_LOCK_KEY = 7_262_626_001
+
+settings = get_settings()
+
+_schema_lock = threading.local()
+
+schema_metadata = MetaData()
+schema_version_table = Table(
+    "schema_version",
+    schema_metadata,
+    Column("version", Integer, nullable=False),
+)
+
+
+def get_schema_version(bind=engine) -> Optional[int]:
+    """The version stamped by init_db(), or None if the database was never initialised."""
+    try:
+        with bind.connect() as conn:
+            return conn.execute(select(schema_version_table.c.version)).scalar()
+    except (OperationalError, ProgrammingError):  # table does not exist yet
+        return None
+
+@contextmanager
+def schema_lock(bind=engine):
+    """
+    Hold the schema advisory lock for the duration of the block (PostgreSQL only).
+
+    Other workers poll until it is released and then find the schema already
+    current. Re-entering in the same thread does not take the lock again.
+    """
+    if bind.dialect.name != "postgresql" or getattr(_schema_lock, "depth", 0):
+        _schema_lock.depth = getattr(_schema_lock, "depth", 0) + 1
+        try:
+            yield
+        finally:
+            _schema_lock.depth -= 1
+        return
+    # A session-level lock, polled with pg_try_advisory_lock on an autocommit
+    # connection. A waiter blocked inside pg_advisory_lock would hold a
+    # snapshot that the holder's CREATE INDEX CONCURRENTLY waits on, a
+    # deadlock PostgreSQL cannot detect; between polls a waiter holds none.
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        while not conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": SCHEMA_LOCK_KEY}
+        ).scalar():
+            time.sleep(settings.MIGRATION_LOCK_POLL_SECONDS)
+        _schema_lock.depth = 1
+        try:
+            yield
+        finally:
+            _schema_lock.depth = 0
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SCHEMA_LOCK_KEY})
+
+def stamp_schema_version(bind=engine, version: int = SCHEMA_VERSION):
+    schema_metadata.create_all(bind=bind)
+    with bind.begin() as conn:
+        conn.execute(schema_version_table.delete())
+        conn.execute(schema_version_table.insert().values(version=version))
 
+def init_db(bind=engine):
+    """Create missing tables; a fresh database is stamped current, an older one is migrated."""
+    from app.migrations import BASELINE_VERSION, migrate
 
-def init_db():
-    Base.metadata.create_all(bind=engine)
+    with schema_lock(bind):
+        version = get_schema_version(bind)
+        if version is None and inspect(bind).has_table("calculations"):
+            version = BASELINE_VERSION  # created by create_all before versioning existed
+        Base.metadata.create_all(bind=bind)
+        create_partitions(bind)
+        if version is None:
+            stamp_schema_version(bind)
+            return
+        if get_schema_version(bind) is None:
+            stamp_schema_version(bind, version)
+        migrate(bind)
 
-def drop_db():
-    Base.metadata.drop_all(bind=engine)
+def drop_db(bind=engine):
+    Base.metadata.drop_all(bind=bind)
+    schema_metadata.drop_all(bind=bind)
 
 if __name__ == "__main__":
-    init_db() # pragma: no cover
\ No newline at end of file
+    init_db() # pragma: no cover
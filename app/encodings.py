@@ -0,0 +1,276 @@
+# app/encodings.py
+"""
+Binary Request/Response Encodings for Calculations
+
+Besides JSON, calculation bodies can be sent and received as:
+
+- application/msgpack: the same document as the JSON API, MessagePack
+  encoded. Floats travel as 9-byte binary values instead of decimal text.
+- application/octet-stream: the inputs as a raw array of little-endian
+  float64 values, with the calculation type in the X-Calculation-Type
+  header. The body is viewed in place as a memoryview of doubles: no text
+  parsing and no per-element Pydantic validation. The type, arity and
+  operation constraints are still checked by the schema validators. The
+  only copy is the single list the JSON `inputs` column needs for storage.
+  Responses in this encoding carry the result as one float64 (NaN while it
+  is pending) and the id and type in headers. A list of calculations has
+  no single result, so the list endpoint offers JSON and MessagePack only.
+
+Every calculation response negotiates its encoding from the Accept header
+before the route runs: JSON is the default when Accept is absent or allows
+anything, and an Accept header that allows none of the offered encodings
+gets 406. MessagePack support needs the optional `msgpack` package: without
+it msgpack request bodies get 415 and msgpack-only Accept headers get 406.
+"""
+
+import math
+import sys
+from array import array
+from functools import lru_cache
+from typing import Optional, Sequence, Type
+
+from fastapi import HTTPException, Request, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, ValidationError
+
+from app.schemas.calculation import (
+    CalculationAppend,
+    CalculationBase,
+    CalculationResponse,
+    CalculationType,
+    CalculationUpdate,
+)
+
+MEDIA_JSON = "application/json"
+MEDIA_MSGPACK = "application/msgpack"
+MEDIA_FLOAT64 = "application/octet-stream"
+MSGPACK_MEDIA_TYPES = {MEDIA_MSGPACK, "application/x-msgpack"}
+
+CALCULATION_ENCODINGS = (MEDIA_JSON, MEDIA_MSGPACK, MEDIA_FLOAT64)
+CALCULATION_LIST_ENCODINGS = (MEDIA_JSON, MEDIA_MSGPACK)
+
+CALCULATION_TYPE_HEADER = "X-Calculation-Type"
+CALCULATION_ID_HEADER = "X-Calculation-Id"
+
+
+@lru_cache(maxsize=None)
+def get_msgpack():
+    """The msgpack module, imported on first use; None when it is not installed."""
+    try:
+        import msgpack
+    except ImportError:  # optional dependency
+        return None
+    return msgpack
+
+
+def media_type(header: Optional[str]) -> str:
+    return (header or "").split(";", 1)[0].strip().lower()
+
+
+def float64_view(body: bytes) -> memoryview:
+    """View a little-endian float64 body as doubles without copying it."""
+    if not body or len(body) % 8:
+        raise ValueError("Body must be a non-empty array of 8-byte little-endian floats")
+    if sys.byteorder == "little":
+        return memoryview(body).cast("d")
+    values = array("d", body)
+    values.byteswap()
+    return memoryview(values)
+
+
+def pack_float64(values) -> bytes:
+    packed = array("d", values)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _invalid(message: str) -> RequestValidationError:
+    return RequestValidationError([
+        {"type": "value_error", "loc": ("body",), "msg": f"Value error, {message}", "input": None}
+    ])
+
+
+def _validation_error(error: ValidationError) -> RequestValidationError:
+    return RequestValidationError([
+        {**detail, "loc": ("body", *detail["loc"])} for detail in error.errors(include_url=False)
+    ])
+
+
+def _float64_inputs(body: bytes) -> list:
+    try:
+        view = float64_view(body)
+    except ValueError as e:
+        raise _invalid(str(e))
+    if not all(map(math.isfinite, view)):
+        raise _invalid("Inputs must be finite numbers")
+    return view.tolist()
+
+
+def _construct(model: Type[BaseModel], **fields) -> BaseModel:
+    """Build a schema object from pre-typed fields, running only its model validator."""
+    try:
+        return model.model_construct(**fields).validate_inputs()
+    except ValueError as e:
+        raise _invalid(str(e))
+
+
+async def _decode(request: Request, model: Type[BaseModel]) -> BaseModel:
+    content_type = media_type(request.headers.get("content-type")) or MEDIA_JSON
+    body = await request.body()
+
+    if content_type == MEDIA_JSON or content_type.endswith("+json"):
+        try:
+            return model.model_validate_json(body)
+        except ValidationError as e:
+            raise _validation_error(e)
+
+    if content_type in MSGPACK_MEDIA_TYPES:
+        msgpack = get_msgpack()
+        if msgpack is None:
+            raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                                detail="MessagePack support is not installed")
+        try:
+            data = msgpack.unpackb(body)
+        except Exception:
+            raise _invalid("Body is not valid MessagePack")
+        try:
+            return model.model_validate(data)
+        except ValidationError as e:
+            raise _validation_error(e)
+
+    if content_type == MEDIA_FLOAT64:
+        inputs = _float64_inputs(body)
+        if model is CalculationUpdate or model is CalculationAppend:
+            return _construct(model, inputs=inputs)
+        try:
+            calculation_type = CalculationType(
+                CalculationBase.validate_type(request.headers.get(CALCULATION_TYPE_HEADER))
+            )
+        except ValueError as e:
+            raise _invalid(f"{CALCULATION_TYPE_HEADER} header: {e}")
+        return _construct(CalculationBase, type=calculation_type, inputs=inputs)
+
+    raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                        detail=f"Unsupported content type: {content_type}")
+
+
+async def read_calculation(request: Request) -> CalculationBase:
+    """Dependency: the new calculation, decoded from any supported encoding."""
+    return await _decode(request, CalculationBase)
+
+
+async def read_calculation_update(request: Request) -> CalculationUpdate:
+    """Dependency: a calculation update, decoded from any supported encoding."""
+    return await _decode(request, CalculationUpdate)
+
+
+async def read_calculation_append(request: Request) -> CalculationAppend:
+    """Dependency: values to append, decoded from any supported encoding."""
+    return await _decode(request, CalculationAppend)
+
+
+def preferred_encoding(request: Request, offered: Sequence[str] = CALCULATION_ENCODINGS) -> Optional[str]:
+    """
+    The best of the `offered` media types in the Accept header.
+
+    JSON when there is no Accept header or it allows any type; None when
+    it allows none of the offered ones.
+    """
+    header = request.headers.get("accept") or ""
+    if not header.strip():
+        return MEDIA_JSON
+    offers = []
+    for position, item in enumerate(header.split(",")):
+        kind, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        offers.append((-quality, position, kind.strip().lower()))
+    for negative_quality, _, kind in sorted(offers):
+        if negative_quality == 0:
+            break
+        if kind in ("*/*", "application/*"):
+            return MEDIA_JSON
+        if kind in MSGPACK_MEDIA_TYPES:
+            if get_msgpack() is None:
+                continue
+            kind = MEDIA_MSGPACK
+        if kind in offered:
+            return kind
+    return None
+
+
+def _negotiate(request: Request, offered: Sequence[str]) -> str:
+    encoding = preferred_encoding(request, offered)
+    if encoding is None:
+        available = [kind for kind in offered if kind != MEDIA_MSGPACK or get_msgpack() is not None]
+        raise HTTPException(status_code=status.HTTP_406_NOT_ACCEPTABLE,
+                            detail=f"Acceptable encodings: {', '.join(available)}")
+    return encoding
+
+
+def calculation_encoding(request: Request) -> str:
+    """Dependency: the response encoding for one calculation (406 if Accept allows none)."""
+    return _negotiate(request, CALCULATION_ENCODINGS)
+
+
+def calculation_list_encoding(request: Request) -> str:
+    """Dependency: the response encoding for a list of calculations (406 if Accept allows none)."""
+    return _negotiate(request, CALCULATION_LIST_ENCODINGS)
+
+
+def encode_calculation(
+    calculation,
+    encoding: str,
+    status_code: int = status.HTTP_200_OK,
+    model: Type[BaseModel] = CalculationResponse,
+):
+    """
+    Encode a calculation in the negotiated `encoding`.
+
+    JSON returns `calculation` unchanged, so the route's response_model
+    serializes it as before; other encodings return a ready Response.
+    `model` is the route's response model (CalculationAppendResponse for
+    appends).
+    """
+    if encoding == MEDIA_JSON:
+        return calculation
+    response = model.model_validate(calculation)
+    if encoding == MEDIA_MSGPACK:
+        return Response(
+            content=get_msgpack().packb(response.model_dump(mode="json")),
+            media_type=MEDIA_MSGPACK,
+            status_code=status_code,
+        )
+    result = math.nan if response.result is None else response.result
+    return Response(
+        content=pack_float64([result]),
+        media_type=MEDIA_FLOAT64,
+        status_code=status_code,
+        headers={CALCULATION_ID_HEADER: str(response.id), CALCULATION_TYPE_HEADER: response.type.value},
+    )
+
+
+def encode_calculation_list(rows: list, encoding: str) -> Response:
+    """Encode already serialized calculation rows in the negotiated `encoding`."""
+    if encoding == MEDIA_MSGPACK:
+        return Response(content=get_msgpack().packb(rows), media_type=MEDIA_MSGPACK)
+    return JSONResponse(content=rows)
+
+
+def calculation_request_body(model: Type[BaseModel]) -> dict:
+    """OpenAPI requestBody listing every accepted encoding of `model`."""
+    schema = model.model_json_schema(ref_template="#/components/schemas/{model}")
+    schema.pop("$defs", None)
+    return {"requestBody": {"required": True, "content": {
+        MEDIA_JSON: {"schema": schema},
+        MEDIA_MSGPACK: {"schema": schema},
+        MEDIA_FLOAT64: {"schema": {"type": "string", "format": "binary"}},
+    }}}
@@ -0,0 +1,191 @@
+# app/events.py
+"""
+Live Calculation Updates
+
+Every open dashboard holds a server-sent-events stream on
+GET /calculations/events. Routes publish created/updated/deleted deltas for a
+user; each worker keeps the streams it serves in per-user queues.
+
+A delta is handed to this worker's own streams directly and published on
+the Redis channel `calc_events:{user_id}` for the others. Each worker's
+listener subscribes only to the channels of users with a live stream on
+that worker, so a worker does not receive every user's deltas. Messages
+carry the publishing worker's id, so a worker skips its own. While the
+listener is down, deltas reach this worker's own streams only.
+"""
+
+import asyncio
+import json
+import logging
+import secrets
+from typing import Any, Dict, Optional, Set
+
+from redis.exceptions import RedisError
+
+from app.auth.redis import get_redis
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "calc_events:"
+# How long the listener waits for a message before applying (un)subscriptions
+PUBSUB_POLL_SECONDS = 0.25
+
+EVENT_CREATED = "created"
+EVENT_UPDATED = "updated"
+EVENT_DELETED = "deleted"
+# Sent when a slow client's queue overflowed; it should re-fetch the full list
+EVENT_RESYNC = "resync"
+
+
+def format_event(event: str, data: Any) -> str:
+    """Encode one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class CalculationEventBroker:
+    """Fans calculation deltas out to the SSE streams of each user."""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._listening = False
+        # Identifies this worker's messages, which it has already delivered
+        self.origin = secrets.token_hex(8)
+        # Channels subscribed on the listener's connection
+        self._channels: Set[str] = set()
+        self._users_changed = asyncio.Event()
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        if user_id not in self._subscribers:
+            self._users_changed.set()
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+            self._users_changed.set()
+
+    def deliver(self, user_id: str, event: str, data: Any) -> None:
+        """Hand an event to this worker's streams for `user_id`."""
+        for queue in self._subscribers.get(user_id, ()):
+            try:
+                queue.put_nowait((event, data))
+            except asyncio.QueueFull:
+                # The client fell behind; drop its backlog and make it reload
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait((EVENT_RESYNC, None))
+
+    async def publish(self, user_id: str, event: str, data: Any) -> None:
+        """Send a delta to every stream of `user_id`, on all workers when Redis is up."""
+        user_id = str(user_id)
+        self.deliver(user_id, event, data)
+        if self._listening:
+            try:
+                redis = await get_redis()
+                await redis.publish(
+                    f"{CHANNEL_PREFIX}{user_id}",
+                    json.dumps({"origin": self.origin, "event": event, "data": data})
+                )
+            except (RedisError, OSError):
+                logger.warning("Redis publish failed, %s event delivered on this worker only", event)
+
+    def dispatch(self, message: dict) -> None:
+        """Deliver a pub/sub message received from Redis."""
+        if message.get("type") != "message":
+            return
+        payload = json.loads(message["data"])
+        if payload.get("origin") == self.origin:
+            return  # delivered when it was published
+        channel = message["channel"]
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        self.deliver(channel[len(CHANNEL_PREFIX):], payload["event"], payload["data"])
+
+    async def sync_channels(self, pubsub) -> None:
+        """Subscribe to the channels of users streaming from this worker, and only those."""
+        self._users_changed.clear()
+        wanted = {f"{CHANNEL_PREFIX}{user_id}" for user_id in self._subscribers}
+        added, removed = wanted - self._channels, self._channels - wanted
+        if added:
+            await pubsub.subscribe(*added)
+        if removed:
+            await pubsub.unsubscribe(*removed)
+        self._channels = wanted
+
+    async def listen(self) -> None:
+        """Relay Redis pub/sub messages to local streams until cancelled."""
+        while True:
+            try:
+                redis = await get_redis()
+                await redis.ping()  # publish through Redis only while it answers
+                pubsub = redis.pubsub()
+                self._channels = set()
+                self._listening = True
+                try:
+                    while True:
+                        await self.sync_channels(pubsub)
+                        if not self._channels:
+                            await self._users_changed.wait()
+                            continue
+                        message = await pubsub.get_message(
+                            ignore_subscribe_messages=True, timeout=PUBSUB_POLL_SECONDS
+                        )
+                        if message is not None:
+                            self.dispatch(message)
+                finally:
+                    self._listening = False
+                    self._channels = set()
+                    await pubsub.aclose()
+            except (RedisError, OSError):
+                await asyncio.sleep(settings.LIVE_UPDATES_REDIS_RETRY_SECONDS)
+
+    def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self.listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+calculation_events = CalculationEventBroker()
+
+
+async def event_stream(request, user_id: str):
+    """
+    Server-sent-event body for one dashboard connection.
+
+    A comment line is sent every SSE_KEEPALIVE_SECONDS so proxies keep the
+    connection open and disconnected clients are noticed.
+    """
+    queue = calculation_events.subscribe(user_id)
+    try:
+        yield "retry: 3000\n: connected\n\n"
+        while True:
+            try:
+                event, data = await asyncio.wait_for(
+                    queue.get(), timeout=settings.SSE_KEEPALIVE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+                continue
+            yield format_event(event, data)
+    finally:
+        calculation_events.unsubscribe(user_id, queue)
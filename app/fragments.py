@@ -0,0 +1,71 @@
+# app/fragments.py
+"""
+Cached HTML Fragments
+
+The server-rendered dashboard draws each calculation row from
+templates/partials/calculation_row.html. A row only changes when its
+calculation does, and every change bumps `updated_at`, so rendered rows are
+cached under (id, updated_at) and reused across requests.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+def format_number(value) -> str:
+    """Render a result the way the client-side table does (6.0 -> "6")."""
+    if value is None:
+        return "…"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e21:
+        return str(int(value))
+    return str(value)
+
+
+class FragmentCache:
+    """Bounded LRU cache of rendered HTML fragments."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._fragments: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._lock = threading.Lock()  # sync routes render from the threadpool
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key: Hashable, render: Callable[[], str]) -> str:
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is not None:
+                self._fragments.move_to_end(key)
+                self.hits += 1
+                return fragment
+        fragment = render()
+        with self._lock:
+            self.misses += 1
+            self._fragments[key] = fragment
+            if len(self._fragments) > self.max_entries:
+                self._fragments.popitem(last=False)
+        return fragment
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fragments.clear()
+            self.hits = self.misses = 0
+
+
+row_fragments = FragmentCache(settings.DASHBOARD_FRAGMENT_CACHE_SIZE)
+
+
+def render_calculation_rows(template, rows) -> list:
+    """Render (or reuse) the table row fragment for each calculation row."""
+    return [
+        row_fragments.get_or_render(
+            (row.id, row.updated_at),
+            lambda row=row: template.render(calc=row),
+        )
+        for row in rows
+    ]
@@ -0,0 +1,119 @@
+# app/health.py
+"""
+Dependency Health Probes
+
+GET /health?deep=true reports whether this worker can actually serve
+requests: the database answers `SELECT 1` through the connection pool, Redis
+answers PING, and the pool is not saturated. Only the database and pool are
+required: Redis is optional (rate limits and token revocation fall back to
+in-process state), so a Redis failure reports the worker as "degraded"
+rather than failing it; a shared Redis outage must not take every worker out
+of the load balancer at once. A probe result is reused for
+HEALTH_CHECK_CACHE_SECONDS and concurrent callers share one in-flight probe,
+so frequent load-balancer polling costs at most one round of probes per
+interval per worker.
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.auth.redis import get_redis
+from app.core.config import get_settings
+
+settings = get_settings()
+
+STATUS_OK = "ok"
+STATUS_FAIL = "fail"
+STATUS_DEGRADED = "degraded"
+
+# Checks whose failure makes the worker unable to serve requests
+REQUIRED_CHECKS = ("database", "pool")
+
+
+def pool_status(engine) -> dict:
+    """Checked-out connections against the pool's capacity (pool_size + max_overflow)."""
+    pool = engine.pool
+    if not hasattr(pool, "checkedout") or not hasattr(pool, "size"):
+        return {"status": STATUS_OK, "detail": f"{type(pool).__name__} has no fixed capacity"}
+    capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+    checked_out = pool.checkedout()
+    saturation = checked_out / capacity if capacity else 0.0
+    return {
+        "status": STATUS_OK if saturation < settings.HEALTH_POOL_MAX_SATURATION else STATUS_FAIL,
+        "checked_out": checked_out,
+        "capacity": capacity,
+        "saturation": round(saturation, 3),
+    }
+
+
+def _select_one(engine) -> None:
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+async def _timed(probe) -> dict:
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(probe, timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        return {"status": STATUS_FAIL, "error": "timed out"}
+    except Exception as e:
+        return {"status": STATUS_FAIL, "error": type(e).__name__}
+    return {"status": STATUS_OK, "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+
+async def check_database(engine) -> dict:
+    return await _timed(asyncio.to_thread(_select_one, engine))
+
+
+async def check_redis() -> dict:
+    async def ping():
+        redis = await get_redis()
+        await redis.ping()
+    return await _timed(ping())
+
+
+class HealthChecker:
+    """Runs the dependency probes and caches the combined report briefly."""
+
+    def __init__(self, engine, ttl: float):
+        self.engine = engine
+        self.ttl = ttl
+        self._report: Optional[dict] = None
+        self._expires = 0.0
+        self._lock = asyncio.Lock()
+
+    async def probe(self) -> dict:
+        pool = pool_status(self.engine)
+        if pool["status"] == STATUS_OK:
+            database, redis = await asyncio.gather(check_database(self.engine), check_redis())
+        else:
+            # Every connection is taken: SELECT 1 would just queue behind them
+            database = {"status": STATUS_FAIL, "error": "pool saturated"}
+            redis = await check_redis()
+        checks = {"database": database, "redis": redis, "pool": pool}
+        if any(checks[name]["status"] != STATUS_OK for name in REQUIRED_CHECKS):
+            overall = STATUS_FAIL
+        elif any(check["status"] != STATUS_OK for check in checks.values()):
+            overall = STATUS_DEGRADED
+        else:
+            overall = STATUS_OK
+        return {"status": overall, "checks": checks}
+
+    async def report(self) -> dict:
+        """The cached report, re-probing if it is older than `ttl`."""
+        if self._report is not None and time.monotonic() < self._expires:
+            return self._report
+        async with self._lock:
+            # Another request may have refreshed it while we waited
+            if self._report is None or time.monotonic() >= self._expires:
+                self._report = await self.probe()
+                self._expires = time.monotonic() + self.ttl
+        return self._report
+
+    def reset(self) -> None:
+        self._report = None
+        self._expires = 0.0
@@ -16,29 +16,76 @@ The application follows a RESTful API design with proper separation of concerns:
 """
 
 from contextlib import asynccontextmanager  # Used for startup/shutdown events
+from functools import lru_cache
 from datetime import datetime, timezone, timedelta
+import time
 from uuid import UUID  # For type validation of UUIDs in path parameters
-from typing import List
+from typing import List, Optional
+
+import anyio.from_thread  # Run async auth checks from sync routes
 
 # FastAPI imports
-from fastapi import Body, FastAPI, Depends, HTTPException, status, Request, Form
+from fastapi import BackgroundTasks, Body, FastAPI, Depends, HTTPException, Query, status, Request, Form
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
-from fastapi.staticfiles import StaticFiles  # For serving static files (CSS, JS)
-from fastapi.templating import Jinja2Templates  # For HTML templates
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, StreamingResponse
 
+from redis.exceptions import RedisError  # Token store outages
 from sqlalchemy.orm import Session  # SQLAlchemy database session
 
-import uvicorn  # ASGI server for running FastAPI apps
-
 # Application imports
-from app.auth.dependencies import get_current_active_user  # Authentication dependency
+from app.auth.dependencies import get_current_active_user, get_current_user, oauth2_scheme  # Authentication dependency
+from app.auth.keys import get_keyring  # Cached asymmetric signing keys
+from app.auth.last_login import last_login_buffer  # Batched, write-behind last_login updates
+from app.auth.rate_limit import calculation_quota, login_rate_limit  # Login throttling and per-user quotas
+from app.auth.jwt import (  # Token minting/verification and password hashing
+    create_token,
+    decode_token,
+    rehash_user_password,
+)
+from app.auth.redis import (  # Token revocation and refresh-token reuse detection
+    add_many_to_blacklist,
+    bump_token_generation,
+    close_redis,
+    mark_refresh_token_used,
+)
+from app.models.archive import ArchivedCalculation  # Cold-storage copies of old calculations
 from app.models.calculation import Calculation  # Database model for calculations
 from app.models.user import User  # Database model for users
-from app.schemas.calculation import CalculationBase, CalculationResponse, CalculationUpdate  # API request/response schemas
-from app.schemas.token import TokenResponse  # API token schema
+from app.schemas.calculation import (  # API request/response schemas
+    CalculationAppend,
+    CalculationAppendResponse,
+    CalculationBase,
+    CalculationJobResponse,
+    CalculationResponse,
+    CalculationUpdate,
+    calculation_row_to_json,
+)
+from app.schemas.token import LogoutRequest, RefreshRequest, Token, TokenResponse, TokenType  # API token schemas
 from app.schemas.user import UserCreate, UserResponse, UserLogin  # User schemas
 from app.database import Base, get_db, engine  # Database connection
+from app.database_init import SCHEMA_VERSION, get_schema_version, init_db  # Schema setup and version check
+from app.health import STATUS_FAIL, HealthChecker  # Dependency probes for deep health checks
+from app.tasks import JOB_COMPLETED, JOB_FAILED, JOB_PENDING, calculation_jobs  # Deferred calculation jobs
+from app.fragments import format_number, render_calculation_rows  # Cached dashboard row fragments
+from app.static_assets import FingerprintedStaticFiles, static_manifest  # Fingerprinted, cacheable assets
+from app.encodings import (  # MessagePack and raw float64 bodies
+    calculation_encoding,
+    calculation_list_encoding,
+    calculation_request_body,
+    encode_calculation,
+    encode_calculation_list,
+    read_calculation,
+    read_calculation_append,
+    read_calculation_update,
+)
+from app.events import (  # Live dashboard updates
+    EVENT_CREATED,
+    EVENT_DELETED,
+    EVENT_UPDATED,
+    calculation_events,
+    event_stream,
+)
+from app.core.config import settings  # Application settings
 
 
 # ------------------------------------------------------------------------------
@@ -53,14 +100,40 @@ async def lifespan(app: FastAPI):
     defined in SQLAlchemy models. It's an alternative to using Alembic
     for simpler applications.
     
+    With FAST_START the tables are assumed to exist (created by
+    `python -m app.database_init` before the workers start), and startup
+    only checks the stamped schema version: one indexed read instead of a
+    catalog lookup per table in every worker.
+    
+    /ready reports 503 until this setup has finished.
+    
     Args:
         app: FastAPI application instance
     """
-    print("Creating tables...")
-    Base.metadata.create_all(bind=engine)
-    print("Tables created successfully!")
+    if settings.FAST_START:
+        version = get_schema_version(engine)
+        if version is None or version < SCHEMA_VERSION:
+            raise RuntimeError(
+                f"Database schema version is {version}, expected {SCHEMA_VERSION}; "
+                "run `python -m app.database_init` first"
+            )
+    else:
+        print("Creating tables...")
+        init_db(engine)
+        print("Tables created successfully!")
+    # Parse JWT signing keys once, so a bad key fails startup instead of a request
+    get_keyring()
+    calculation_jobs.start(engine)
+    calculation_events.start()
+    last_login_buffer.start(engine)
+    app.state.ready = True
     yield  # This is where application runs
-    # Cleanup code would go here (after yield), but we don't need any
+    app.state.ready = False
+    # Stop background listeners/workers and release pooled Redis connections on shutdown
+    await calculation_events.stop()
+    await calculation_jobs.stop()
+    await last_login_buffer.stop()
+    await close_redis()
 
 # Initialize the FastAPI application with metadata and lifespan
 app = FastAPI(
@@ -69,15 +142,29 @@ app = FastAPI(
     version="1.0.0",
     lifespan=lifespan  # Pass our lifespan context manager
 )
+app.state.ready = False  # flipped by lifespan once startup work is done
 
 # ------------------------------------------------------------------------------
 # Static Files and Templates Configuration
 # ------------------------------------------------------------------------------
-# Mount the static files directory for serving CSS, JS, and images
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Mount the static files directory for serving CSS, JS, and images.
+# Fingerprinted URLs (see asset_url) are served as immutable.
+app.mount(
+    "/static",
+    FingerprintedStaticFiles(directory="static", manifest=static_manifest),
+    name="static"
+)
+
+# Set up Jinja2 templates directory for HTML rendering. Built on the first
+# page request, so workers that only serve the API never import Jinja.
+@lru_cache()
+def get_templates():
+    from fastapi.templating import Jinja2Templates  # For HTML templates
 
-# Set up Jinja2 templates directory for HTML rendering
-templates = Jinja2Templates(directory="templates")
+    templates = Jinja2Templates(directory="templates")
+    templates.env.filters["number"] = format_number
+    templates.env.globals["asset_url"] = static_manifest.url
+    return templates
 
 
 # ------------------------------------------------------------------------------
@@ -93,7 +180,7 @@ def read_index(request: Request):
     
     Displays the welcome page with links to register and login.
     """
-    return templates.TemplateResponse("index.html", {"request": request})
+    return get_templates().TemplateResponse("index.html", {"request": request})
 
 @app.get("/login", response_class=HTMLResponse, tags=["web"])
 def login_page(request: Request):
@@ -102,7 +189,7 @@ def login_page(request: Request):
     
     Displays a form for users to enter credentials and log in.
     """
-    return templates.TemplateResponse("login.html", {"request": request})
+    return get_templates().TemplateResponse("login.html", {"request": request})
 
 @app.get("/register", response_class=HTMLResponse, tags=["web"])
 def register_page(request: Request):
@@ -111,10 +198,15 @@ def register_page(request: Request):
     
     Displays a form for new users to create an account.
     """
-    return templates.TemplateResponse("register.html", {"request": request})
+    return get_templates().TemplateResponse("register.html", {"request": request})
 
 @app.get("/dashboard", response_class=HTMLResponse, tags=["web"])
-def dashboard_page(request: Request):
+def dashboard_page(
+    request: Request,
+    render: Optional[str] = Query(None, description='"server" to render the table on the server'),
+    page: int = Query(1, ge=1),
+    db: Session = Depends(get_db)
+):
     """
     Dashboard page, listing calculations & new calculation form.
     
@@ -123,9 +215,39 @@ def dashboard_page(request: Request):
     - Create a new calculation
     - Access links to view/edit/delete calculations
     
-    JavaScript in this page calls the API endpoints to fetch and display data.
+    By default JavaScript in this page calls the API endpoints to fetch and
+    display data. In server-rendered mode (?render=server, or
+    DASHBOARD_RENDER_MODE=server) the user is identified by the access_token
+    cookie set at login, and one page of rows is rendered into the HTML
+    from cached per-row fragments. Without a valid cookie the page falls
+    back to client rendering.
     """
-    return templates.TemplateResponse("dashboard.html", {"request": request})
+    context = {"request": request, "server_rendered": False}
+    token = request.cookies.get("access_token")
+    if token and (render or settings.DASHBOARD_RENDER_MODE) == "server":
+        try:
+            # This sync route runs in the threadpool; hop to the event loop
+            # for the async revocation check
+            current_user = get_current_active_user(anyio.from_thread.run(get_current_user, token))
+        except HTTPException:
+            current_user = None
+        if current_user is not None:
+            page_size = settings.DASHBOARD_PAGE_SIZE
+            # Fetch one extra row to learn whether an older page exists
+            rows = Calculation.list_rows(
+                db, current_user.id, limit=page_size + 1, offset=(page - 1) * page_size
+            )
+            rows, has_next = rows[:page_size], len(rows) > page_size
+            context.update(
+                server_rendered=True,
+                page=page,
+                has_next=has_next,
+                rows=render_calculation_rows(
+                    get_templates().get_template("partials/calculation_row.html"), rows
+                ),
+                calculations=[calculation_row_to_json(row) for row in rows],
+            )
+    return get_templates().TemplateResponse("dashboard.html", context)
 
 @app.get("/dashboard/view/{calc_id}", response_class=HTMLResponse, tags=["web"])
 def view_calculation_page(request: Request, calc_id: str):
@@ -142,7 +264,7 @@ def view_calculation_page(request: Request, calc_id: str):
     Returns:
         HTMLResponse: Rendered template with calculation ID passed to frontend
     """
-    return templates.TemplateResponse("view_calculation.html", {"request": request, "calc_id": calc_id})
+    return get_templates().TemplateResponse("view_calculation.html", {"request": request, "calc_id": calc_id})
 
 @app.get("/dashboard/edit/{calc_id}", response_class=HTMLResponse, tags=["web"])
 def edit_calculation_page(request: Request, calc_id: str):
@@ -159,16 +281,62 @@ def edit_calculation_page(request: Request, calc_id: str):
     Returns:
         HTMLResponse: Rendered template with calculation ID passed to frontend
     """
-    return templates.TemplateResponse("edit_calculation.html", {"request": request, "calc_id": calc_id})
+    return get_templates().TemplateResponse("edit_calculation.html", {"request": request, "calc_id": calc_id})
 
 
 # ------------------------------------------------------------------------------
 # Health Endpoint
 # ------------------------------------------------------------------------------
+health_checker = HealthChecker(engine, settings.HEALTH_CHECK_CACHE_SECONDS)
+
 @app.get("/health", tags=["health"])
-def read_health():
-    """Health check."""
-    return {"status": "ok"}
+async def read_health(
+    deep: bool = Query(False, description="Probe the database, Redis and connection pool")
+):
+    """
+    Health check.
+
+    The default is a liveness check. With ?deep=true the database (SELECT 1),
+    Redis (PING) and pool saturation are probed, results cached for
+    HEALTH_CHECK_CACHE_SECONDS. A database or pool failure returns 503 so a
+    load balancer stops routing to this worker; Redis is optional, so its
+    failure is reported as "degraded" with a 200.
+    """
+    if not deep:
+        return {"status": "ok"}
+    report = await health_checker.report()
+    if report["status"] == STATUS_FAIL:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=report)
+    return report
+
+@app.get("/ready", tags=["health"])
+def read_ready():
+    """
+    Readiness check.
+
+    Unlike /health (the process is up), this returns 503 until startup has
+    finished and again once shutdown begins, so a load balancer only routes
+    traffic to workers that can serve it.
+    """
+    if not app.state.ready:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"status": "starting"})
+    return {"status": "ready"}
+
+
+# ------------------------------------------------------------------------------
+# JWKS Endpoint
+# ------------------------------------------------------------------------------
+@app.get("/.well-known/jwks.json", tags=["auth"])
+def read_jwks():
+    """
+    Public keys for verifying our tokens, as a JSON Web Key Set.
+
+    Other services can verify access tokens locally by matching the token's
+    `kid` header against these keys. The set is empty when tokens are
+    signed with a shared secret (HS256).
+    """
+    keyring = get_keyring()
+    return keyring.jwks() if keyring is not None else {"keys": []}
 
 
 # ------------------------------------------------------------------------------
@@ -187,9 +355,12 @@ def register(user_create: UserCreate, db: Session = Depends(get_db)):
     user_data = user_create.dict(exclude={"confirm_password"})
     try:
         user = User.register(db, user_data)
+        # All column values are generated client-side and known after the INSERT,
+        # so build the response before commit instead of re-SELECTing the row.
+        db.flush()
+        response = UserResponse.model_validate(user)
         db.commit()
-        db.refresh(user)
-        return user
+        return response
     except ValueError as e:
         db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -198,8 +369,17 @@ def register(user_create: UserCreate, db: Session = Depends(get_db)):
 # ------------------------------------------------------------------------------
 # User Login Endpoints
 # ------------------------------------------------------------------------------
-@app.post("/auth/login", response_model=TokenResponse, tags=["auth"])
-def login_json(user_login: UserLogin, db: Session = Depends(get_db)):
+@app.post(
+    "/auth/login",
+    response_model=TokenResponse,
+    dependencies=[Depends(login_rate_limit)],
+    tags=["auth"]
+)
+def login_json(
+    user_login: UserLogin,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
     """
     Login with JSON payload (username & password).
     Returns an access token, refresh token, and user info.
@@ -213,7 +393,10 @@ def login_json(user_login: UserLogin, db: Session = Depends(get_db)):
         )
 
     user = auth_result["user"]
-    db.commit()  # commit the last_login update
+    db.commit()  # commit the last_login update when it is written through
+    if auth_result["needs_rehash"]:
+        # Upgrade the stored hash to the current cost after the response is sent
+        background_tasks.add_task(rehash_user_password, db.get_bind(), user.id, user_login.password)
 
     # Ensure expires_at is timezone-aware
     expires_at = auth_result.get("expires_at")
@@ -236,8 +419,12 @@ def login_json(user_login: UserLogin, db: Session = Depends(get_db)):
         is_verified=user.is_verified
     )
 
-@app.post("/auth/token", tags=["auth"])
-def login_form(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+@app.post("/auth/token", dependencies=[Depends(login_rate_limit)], tags=["auth"])
+def login_form(
+    background_tasks: BackgroundTasks,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db)
+):
     """
     Login with form data (Swagger/UI).
     Returns an access token.
@@ -250,12 +437,110 @@ def login_form(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = D
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    if auth_result["needs_rehash"]:
+        background_tasks.add_task(
+            rehash_user_password, db.get_bind(), auth_result["user"].id, form_data.password
+        )
+
     return {
         "access_token": auth_result["access_token"],
         "token_type": "bearer"
     }
 
 
+# ------------------------------------------------------------------------------
+# Token Refresh and Logout Endpoints
+# ------------------------------------------------------------------------------
+def _remaining_lifetime(payload: dict) -> int:
+    """Seconds until a decoded token expires (at least 1, as Redis TTLs must be positive)."""
+    return max(int(payload["exp"]) - int(time.time()), 1)
+
+def _token_store_unavailable() -> HTTPException:
+    """503 for token operations that cannot be done safely while Redis is down."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Token store unavailable, try again shortly",
+        headers={"Retry-After": str(int(settings.TOKEN_REVOCATION_REDIS_RETRY_SECONDS))},
+    )
+
+@app.post("/auth/refresh", response_model=Token, tags=["auth"])
+async def refresh_tokens(refresh_request: RefreshRequest):
+    """
+    Exchange a refresh token for a new access/refresh token pair.
+
+    Refresh tokens are single-use: each one is rotated and its JTI recorded.
+    Presenting a spent token again is treated as theft, and every token
+    issued to that user is revoked. No password check or database query
+    is needed, which keeps token renewal off the bcrypt login path.
+
+    Reuse detection needs Redis, so while it is down refreshing returns 503
+    rather than rotating tokens unchecked; access tokens keep working.
+    """
+    payload = await decode_token(refresh_request.refresh_token, TokenType.REFRESH)
+    user_id = payload["sub"]
+
+    try:
+        first_use = await mark_refresh_token_used(payload["jti"], _remaining_lifetime(payload))
+        if not first_use:
+            await bump_token_generation(user_id)
+    except (RedisError, OSError):
+        raise _token_store_unavailable()
+    if not first_use:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token reuse detected",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return Token(
+        access_token=create_token(user_id, TokenType.ACCESS),
+        refresh_token=create_token(user_id, TokenType.REFRESH),
+        token_type="bearer",
+        expires_at=datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+
+@app.post("/auth/logout", status_code=status.HTTP_204_NO_CONTENT, tags=["auth"])
+async def logout(
+    logout_request: Optional[LogoutRequest] = None,
+    token: str = Depends(oauth2_scheme)
+):
+    """
+    Revoke the presented access token (and the refresh token, if supplied).
+    """
+    payload = await decode_token(token, TokenType.ACCESS)
+    revoked = {payload["jti"]: _remaining_lifetime(payload)}
+
+    if logout_request is not None and logout_request.refresh_token:
+        refresh_payload = await decode_token(logout_request.refresh_token, TokenType.REFRESH)
+        if refresh_payload["sub"] != payload["sub"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Refresh token does not belong to this user"
+            )
+        revoked[refresh_payload["jti"]] = _remaining_lifetime(refresh_payload)
+
+    try:
+        await add_many_to_blacklist(revoked)
+    except (RedisError, OSError):
+        raise _token_store_unavailable()
+    return None
+
+@app.post("/auth/logout-all", status_code=status.HTTP_204_NO_CONTENT, tags=["auth"])
+async def logout_all(token: str = Depends(oauth2_scheme)):
+    """
+    Revoke every access and refresh token issued to the current user so far.
+
+    Bumps the user's token generation instead of blacklisting each token,
+    so the cost does not depend on how many sessions are open.
+    """
+    payload = await decode_token(token, TokenType.ACCESS)
+    try:
+        await bump_token_generation(payload["sub"])
+    except (RedisError, OSError):
+        raise _token_store_unavailable()
+    return None
+
+
 # ------------------------------------------------------------------------------
 # Calculations Endpoints (BREAD)
 # ------------------------------------------------------------------------------
@@ -264,29 +549,76 @@ def login_form(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = D
     "/calculations",
     response_model=CalculationResponse,
     status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(calculation_quota)],
     tags=["calculations"],
+    openapi_extra=calculation_request_body(CalculationBase),
 )
 def create_calculation(
-    calculation_data: CalculationBase,
+    background_tasks: BackgroundTasks,
+    calculation_data: CalculationBase = Depends(read_calculation),
+    encoding: str = Depends(calculation_encoding),
+    async_mode: bool = Query(
+        False,
+        alias="async",
+        description="Defer evaluation to a worker and return 202 with a job id"
+    ),
     current_user = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
     Create a new calculation for the authenticated user.
     Automatically computes the 'result'.
+
+    The body may be JSON, MessagePack or raw little-endian float64 inputs
+    (with the type in X-Calculation-Type); the response encoding follows
+    the Accept header (406 if it allows none of them).
+
+    With ?async=true the calculation is stored without a result and
+    evaluated by a background worker; poll GET /calculations/{id}/job
+    for completion.
     """
     try:
         new_calculation = Calculation.create(
             calculation_type=calculation_data.type,
             user_id=current_user.id,
             inputs=calculation_data.inputs,
+            validated=True,  # checked by the request schema
         )
+        if async_mode:
+            db.add(new_calculation)
+            db.flush()
+            job_id = str(new_calculation.id)
+            created = CalculationResponse.model_validate(new_calculation)
+            db.commit()
+            background_tasks.add_task(
+                calculation_events.publish, current_user.id, EVENT_CREATED, created.model_dump(mode="json")
+            )
+            background_tasks.add_task(
+                calculation_jobs.submit,
+                job_id,
+                calculation_data.type.value,
+                calculation_data.inputs,
+                db.get_bind(),
+                str(current_user.id),
+            )
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content=CalculationJobResponse(job_id=job_id, status=JOB_PENDING).model_dump(mode="json"),
+                headers={"Location": f"/calculations/{job_id}/job"},
+            )
+
         new_calculation.result = new_calculation.get_result()
 
         db.add(new_calculation)
+        # Serialize from the flushed object: committing expires it, and a
+        # refresh would cost a second round trip for values we already have.
+        db.flush()
+        response = CalculationResponse.model_validate(new_calculation)
         db.commit()
-        db.refresh(new_calculation)
-        return new_calculation
+        background_tasks.add_task(
+            calculation_events.publish, current_user.id, EVENT_CREATED, response.model_dump(mode="json")
+        )
+        return encode_calculation(response, encoding, status.HTTP_201_CREATED)
 
     except ValueError as e:
         db.rollback()
@@ -297,27 +629,112 @@ def create_calculation(
 
 
 # Browse / List Calculations
-@app.get("/calculations", response_model=List[CalculationResponse], tags=["calculations"])
+@app.get(
+    "/calculations",
+    response_model=List[CalculationResponse],
+    dependencies=[Depends(calculation_quota)],
+    tags=["calculations"]
+)
 def list_calculations(
+    encoding: str = Depends(calculation_list_encoding),
     current_user = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
     List all calculations belonging to the current authenticated user.
+
+    Rows are fetched as column tuples and encoded directly, skipping ORM
+    entity loading and per-row response-model validation. Lists are sent
+    as JSON or MessagePack; there is no float64 form of a list.
+    """
+    rows = [calculation_row_to_json(row) for row in Calculation.list_rows(db, current_user.id)]
+    return encode_calculation_list(rows, encoding)
+
+
+# Live Updates Stream
+@app.get("/calculations/events", tags=["calculations"])
+async def stream_calculation_events(request: Request):
+    """
+    Server-sent events with created/updated/deleted deltas for the current user's
+    calculations, so the dashboard can patch its table instead of re-fetching it.
+
+    EventSource cannot send headers, so the user is identified by the
+    access_token cookie set at login, as on /dashboard?render=server. A
+    token in the URL would end up in access logs, proxy logs and history.
+    """
+    token = request.cookies.get("access_token")
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    current_user = get_current_active_user(await get_current_user(token))
+    return StreamingResponse(
+        event_stream(request, str(current_user.id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Poll a Deferred Calculation
+@app.get(
+    "/calculations/{calc_id}/job",
+    response_model=CalculationJobResponse,
+    dependencies=[Depends(calculation_quota)],
+    tags=["calculations"]
+)
+async def get_calculation_job(
+    calc_id: str,
+    current_user = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Report the status of a calculation submitted with ?async=true.
     """
-    calculations = db.query(Calculation).filter(Calculation.user_id == current_user.id).all()
-    return calculations
+    try:
+        calc_uuid = UUID(calc_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid calculation id format.")
+
+    calculation = db.query(Calculation.result, Calculation.error).filter(
+        *Calculation.lookup_criteria(calc_uuid, current_user.id)
+    ).first()
+    if not calculation:
+        raise HTTPException(status_code=404, detail="Calculation not found.")
+
+    job = await calculation_jobs.get_status(str(calc_uuid))
+    if job is not None:
+        return job
+    # No worker recorded this job (or its status expired): the row is authoritative
+    if calculation.error is not None:
+        job_status = JOB_FAILED
+    else:
+        job_status = JOB_COMPLETED if calculation.result is not None else JOB_PENDING
+    return CalculationJobResponse(
+        job_id=calc_uuid,
+        status=job_status,
+        result=calculation.result,
+        error=calculation.error,
+    )
 
 
 # Read / Retrieve a Specific Calculation by ID
-@app.get("/calculations/{calc_id}", response_model=CalculationResponse, tags=["calculations"])
+@app.get(
+    "/calculations/{calc_id}",
+    response_model=CalculationResponse,
+    dependencies=[Depends(calculation_quota)],
+    tags=["calculations"]
+)
 def get_calculation(
     calc_id: str,
+    encoding: str = Depends(calculation_encoding),
     current_user = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
     Retrieve a single calculation by its UUID, if it belongs to the current user.
+    Calculations moved to cold storage are served from the archive.
     """
     try:
         calc_uuid = UUID(calc_id)
@@ -325,25 +742,46 @@ def get_calculation(
         raise HTTPException(status_code=400, detail="Invalid calculation id format.")
 
     calculation = db.query(Calculation).filter(
-        Calculation.id == calc_uuid,
-        Calculation.user_id == current_user.id
+        *Calculation.lookup_criteria(calc_uuid, current_user.id)
     ).first()
-    if not calculation:
+    if calculation:
+        return encode_calculation(calculation, encoding)
+
+    archived = ArchivedCalculation.find(db, calc_uuid, current_user.id)
+    if not archived:
         raise HTTPException(status_code=404, detail="Calculation not found.")
+    return encode_calculation(archived.to_dict(), encoding)
+
 
-    return calculation
+def _raise_if_archived(db: Session, calc_id: UUID, user_id: UUID) -> None:
+    """Reject a write to a calculation that was moved to the read-only archive."""
+    if ArchivedCalculation.find(db, calc_id, user_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Calculation is archived and read-only.",
+        )
 
 
 # Edit / Update a Calculation
-@app.put("/calculations/{calc_id}", response_model=CalculationResponse, tags=["calculations"])
+@app.put(
+    "/calculations/{calc_id}",
+    response_model=CalculationResponse,
+    dependencies=[Depends(calculation_quota)],
+    tags=["calculations"],
+    openapi_extra=calculation_request_body(CalculationUpdate),
+)
 def update_calculation(
     calc_id: str,
-    calculation_update: CalculationUpdate,
+    background_tasks: BackgroundTasks,
+    calculation_update: CalculationUpdate = Depends(read_calculation_update),
+    encoding: str = Depends(calculation_encoding),
     current_user = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
     Update the inputs (and thus the result) of a specific calculation.
+
+    Archived calculations are read-only: updating one returns 409.
     """
     try:
         calc_uuid = UUID(calc_id)
@@ -351,26 +789,86 @@ def update_calculation(
         raise HTTPException(status_code=400, detail="Invalid calculation id format.")
 
     calculation = db.query(Calculation).filter(
-        Calculation.id == calc_uuid,
-        Calculation.user_id == current_user.id
+        *Calculation.lookup_criteria(calc_uuid, current_user.id)
     ).first()
     if not calculation:
+        _raise_if_archived(db, calc_uuid, current_user.id)
         raise HTTPException(status_code=404, detail="Calculation not found.")
 
     if calculation_update.inputs is not None:
         calculation.inputs = calculation_update.inputs
         calculation.result = calculation.get_result()
+        calculation.error = None
 
     calculation.updated_at = datetime.utcnow()
+    db.flush()
+    response = CalculationResponse.model_validate(calculation)
+    db.commit()
+    background_tasks.add_task(
+        calculation_events.publish, current_user.id, EVENT_UPDATED, response.model_dump(mode="json")
+    )
+    return encode_calculation(response, encoding)
+
+
+# Append Inputs to a Calculation
+@app.patch(
+    "/calculations/{calc_id}/inputs:append",
+    response_model=CalculationAppendResponse,
+    dependencies=[Depends(calculation_quota)],
+    tags=["calculations"],
+    openapi_extra=calculation_request_body(CalculationAppend),
+)
+def append_calculation_inputs(
+    calc_id: str,
+    background_tasks: BackgroundTasks,
+    calculation_append: CalculationAppend = Depends(read_calculation_append),
+    encoding: str = Depends(calculation_encoding),
+    current_user = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Append numbers to the inputs of a left-fold calculation (addition,
+    subtraction, multiplication, division, modulus, exponentiation).
+
+    The result is updated from the stored result and the new values only,
+    so an append costs the same however long the calculation's history is;
+    the response carries the new result rather than the whole input list,
+    in the encoding the Accept header asks for.
+    Archived calculations are read-only: appending to one returns 409.
+    """
+    try:
+        calc_uuid = UUID(calc_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid calculation id format.")
+
+    try:
+        appended = Calculation.append_inputs(db, calc_uuid, current_user.id, calculation_append.inputs)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if appended is None:
+        _raise_if_archived(db, calc_uuid, current_user.id)
+        raise HTTPException(status_code=404, detail="Calculation not found.")
     db.commit()
-    db.refresh(calculation)
-    return calculation
+
+    response = CalculationAppendResponse.model_validate(appended)
+    # The dashboard extends the inputs it already shows with `appended`
+    background_tasks.add_task(
+        calculation_events.publish, current_user.id, EVENT_UPDATED, response.model_dump(mode="json")
+    )
+    return encode_calculation(response, encoding, model=CalculationAppendResponse)
 
 
 # Delete a Calculation
-@app.delete("/calculations/{calc_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["calculations"])
+@app.delete(
+    "/calculations/{calc_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(calculation_quota)],
+    tags=["calculations"]
+)
 def delete_calculation(
     calc_id: str,
+    background_tasks: BackgroundTasks,
     current_user = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -383,14 +881,18 @@ def delete_calculation(
         raise HTTPException(status_code=400, detail="Invalid calculation id format.")
 
     calculation = db.query(Calculation).filter(
-        Calculation.id == calc_uuid,
-        Calculation.user_id == current_user.id
+        *Calculation.lookup_criteria(calc_uuid, current_user.id)
     ).first()
+    if not calculation:
+        calculation = ArchivedCalculation.find(db, calc_uuid, current_user.id)
     if not calculation:
         raise HTTPException(status_code=404, detail="Calculation not found.")
 
     db.delete(calculation)
     db.commit()
+    background_tasks.add_task(
+        calculation_events.publish, current_user.id, EVENT_DELETED, {"id": str(calc_uuid)}
+    )
     return None
 
 
@@ -0,0 +1,318 @@
+# app/migrations.py
+"""
+Versioned Online Schema Migrations
+
+`Base.metadata.create_all` only creates missing tables, so once a table
+exists it cannot add an index or a column to it. Each Migration here moves
+the database from version N-1 to N (the number stamped in `schema_version`)
+through steps written to keep the table available while they run:
+
+- CreateIndex: CREATE INDEX CONCURRENTLY on PostgreSQL, which takes a
+  SHARE UPDATE EXCLUSIVE lock, so reads and writes continue during the
+  build. A partitioned table cannot be indexed concurrently, so the index
+  is created ON ONLY the parent, then built concurrently on each partition
+  and attached. An INVALID index left by an interrupted build is dropped
+  and rebuilt.
+- AddColumn: a nullable column without a default is a catalog-only change;
+  the brief ACCESS EXCLUSIVE lock is bounded by MIGRATION_LOCK_TIMEOUT_SECONDS
+  so it fails fast rather than queueing every query behind a long transaction.
+- Backfill: fills a new column MIGRATION_BATCH_SIZE rows per transaction,
+  pausing between batches, so row locks are short-lived and replicas keep up.
+
+`--dry-run` applies nothing; it prints every pending statement with the
+lock it takes and an estimate of the rows it touches.
+
+Migrations run under a PostgreSQL advisory lock (see
+app.database_init.schema_lock): when several workers start at once, one
+migrates while the others wait, then find nothing pending.
+
+init_db() applies pending migrations on startup (without FAST_START);
+the new version's models already describe the final schema, so a fresh
+database is simply created and stamped at the latest version.
+
+Usage:
+    python -m app.migrations status
+    python -m app.migrations upgrade [--dry-run]
+"""
+
+import argparse
+import time
+from typing import Iterable, List, Optional, Sequence
+
+from sqlalchemy import func, inspect, select, table, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from app.core.config import get_settings
+from app.database_init import SCHEMA_VERSION, get_schema_version, schema_lock, stamp_schema_version
+
+settings = get_settings()
+
+# Version stamped by create_all before any migration existed
+BASELINE_VERSION = 1
+
+
+def estimate_rows(bind, table_name: str) -> int:
+    """Planner estimate on PostgreSQL (no table scan), exact count elsewhere."""
+    with bind.connect() as conn:
+        if bind.dialect.name == "postgresql":
+            # A partitioned parent has no rows of its own; sum its partitions
+            return int(conn.execute(text(
+                "SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0) FROM pg_class c "
+                "WHERE c.relname = :table OR c.oid IN ("
+                "  SELECT i.inhrelid FROM pg_inherits i JOIN pg_class p ON p.oid = i.inhparent "
+                "  WHERE p.relname = :table)"
+            ), {"table": table_name}).scalar())
+        return conn.execute(select(func.count()).select_from(table(table_name))).scalar()
+
+
+def child_relations(conn, parent: str) -> List[str]:
+    """Partitions of a table, or indexes attached to a partitioned index."""
+    return list(conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :parent ORDER BY c.relname"
+    ), {"parent": parent}).scalars())
+
+
+class Step:
+    """One schema change inside a migration."""
+
+    lock = ""
+    # Whether the table stops accepting writes for the duration of the step
+    blocking = False
+
+    def statements(self, dialect: str, partitions: Sequence[str] = ()) -> List[str]:
+        raise NotImplementedError
+
+    def describe(self, bind) -> dict:
+        """Dry-run report: SQL, lock taken and estimated rows touched."""
+        partitions = self._partitions(bind)
+        return {
+            "step": type(self).__name__,
+            "table": self.table,
+            "sql": self.statements(bind.dialect.name, partitions),
+            "lock": self.lock_for(bind.dialect.name),
+            "blocking": self.blocking_for(bind.dialect.name),
+            "estimated_rows": estimate_rows(bind, self.table),
+        }
+
+    def lock_for(self, dialect: str) -> str:
+        return self.lock
+
+    def blocking_for(self, dialect: str) -> bool:
+        return self.blocking
+
+    def apply(self, bind) -> None:
+        with bind.begin() as conn:
+            if bind.dialect.name == "postgresql":
+                conn.execute(text(
+                    f"SET LOCAL lock_timeout = '{int(settings.MIGRATION_LOCK_TIMEOUT_SECONDS * 1000)}ms'"
+                ))
+            for statement in self.statements(bind.dialect.name, self._partitions(bind)):
+                conn.execute(text(statement))
+
+    def _partitions(self, bind) -> List[str]:
+        if bind.dialect.name != "postgresql":
+            return []
+        with bind.connect() as conn:
+            return child_relations(conn, self.table)
+
+
+class CreateIndex(Step):
+    def __init__(self, name: str, table: str, columns: Iterable[str], unique: bool = False):
+        self.name = name
+        self.table = table
+        self.columns = list(columns)
+        self.unique = unique
+
+    def lock_for(self, dialect: str) -> str:
+        if dialect == "postgresql":
+            return "SHARE UPDATE EXCLUSIVE (reads and writes continue; other DDL and VACUUM wait)"
+        return "write lock on the table for the whole build"
+
+    def blocking_for(self, dialect: str) -> bool:
+        return dialect != "postgresql"
+
+    def partition_index_name(self, partition: str) -> str:
+        return f"{partition}_{'_'.join(self.columns)}_idx"
+
+    def statements(self, dialect: str, partitions: Sequence[str] = ()) -> List[str]:
+        unique = "UNIQUE " if self.unique else ""
+        columns = ", ".join(self.columns)
+        if dialect != "postgresql":
+            return [f"CREATE {unique}INDEX IF NOT EXISTS {self.name} ON {self.table} ({columns})"]
+        if not partitions:
+            return [f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {self.name} ON {self.table} ({columns})"]
+        statements = [f"CREATE {unique}INDEX IF NOT EXISTS {self.name} ON ONLY {self.table} ({columns})"]
+        for partition in partitions:
+            index = self.partition_index_name(partition)
+            statements.append(
+                f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {index} ON {partition} ({columns})"
+            )
+            statements.append(f"ALTER INDEX {self.name} ATTACH PARTITION {index}")
+        return statements
+
+    def apply(self, bind) -> None:
+        if bind.dialect.name != "postgresql":
+            return super().apply(bind)
+        partitions = self._partitions(bind)
+        # CONCURRENTLY cannot run inside a transaction block
+        with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for index in [self.name] + [self.partition_index_name(p) for p in partitions]:
+                invalid = conn.execute(text(
+                    "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE c.relname = :name AND NOT i.indisvalid"
+                ), {"name": index}).first()
+                # A parent ON ONLY index stays invalid until every partition is attached
+                if invalid and (index != self.name or not partitions):
+                    conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index}"))
+            attached = set(child_relations(conn, self.name)) if partitions else set()
+            for statement in self.statements("postgresql", partitions):
+                if statement.startswith("ALTER INDEX") and statement.rsplit(" ", 1)[1] in attached:
+                    continue
+                conn.execute(text(statement))
+
+
+class AddColumn(Step):
+    lock = "ACCESS EXCLUSIVE, catalog-only (no table rewrite), bounded by lock_timeout"
+
+    def __init__(self, table: str, column: str, ddl_type: str):
+        self.table = table
+        self.column = column
+        self.ddl_type = ddl_type
+
+    def statements(self, dialect: str, partitions: Sequence[str] = ()) -> List[str]:
+        # Nullable and without a default, so existing rows are not rewritten
+        return [f"ALTER TABLE {self.table} ADD COLUMN {self.column} {self.ddl_type}"]
+
+    def apply(self, bind) -> None:
+        columns = {column["name"] for column in inspect(bind).get_columns(self.table)}
+        if self.column not in columns:
+            super().apply(bind)
+
+
+class Backfill(Step):
+    lock = "ROW EXCLUSIVE; each batch locks only its own rows"
+
+    def __init__(self, table: str, assignments: str, where: str, batch_size: Optional[int] = None):
+        """
+        `where` must stop matching a row once it is updated (e.g. "col IS NULL"),
+        which is what lets the backfill resume after an interruption.
+        """
+        self.table = table
+        self.assignments = assignments
+        self.where = where
+        self.batch_size = batch_size
+
+    @property
+    def size(self) -> int:
+        return self.batch_size or settings.MIGRATION_BATCH_SIZE
+
+    def statements(self, dialect: str, partitions: Sequence[str] = ()) -> List[str]:
+        return [
+            f"UPDATE {self.table} SET {self.assignments} WHERE id IN "
+            f"(SELECT id FROM {self.table} WHERE {self.where} LIMIT {self.size})"
+        ]
+
+    def describe(self, bind) -> dict:
+        report = super().describe(bind)
+        try:
+            with bind.connect() as conn:
+                pending = conn.execute(text(f"SELECT COUNT(*) FROM {self.table} WHERE {self.where}")).scalar()
+        except (OperationalError, ProgrammingError):
+            # The column is added earlier in the same plan: every row needs filling
+            pending = report["estimated_rows"]
+        report["estimated_rows"] = pending
+        report["batches"] = -(-pending // self.size)
+        return report
+
+    def apply(self, bind) -> None:
+        (statement,) = self.statements(bind.dialect.name)
+        while True:
+            with bind.begin() as conn:
+                updated = conn.execute(text(statement)).rowcount
+            if updated < self.size:
+                return
+            if settings.MIGRATION_BATCH_PAUSE_SECONDS:
+                time.sleep(settings.MIGRATION_BATCH_PAUSE_SECONDS)
+
+
+class Migration:
+    def __init__(self, version: int, description: str, steps: List[Step]):
+        self.version = version
+        self.description = description
+        self.steps = steps
+
+    def __repr__(self):
+        return f"<Migration(version={self.version}, description={self.description!r})>"
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(2, "Index calculations by owner and creation time for paginated lists", [
+        CreateIndex("ix_calculations_user_id_created_at", "calculations", ["user_id", "created_at"]),
+    ]),
+    Migration(3, "Index calculations by last update for the archive job", [
+        CreateIndex("ix_calculations_updated_at", "calculations", ["updated_at"]),
+    ]),
+    Migration(4, "Record why a deferred calculation failed", [
+        AddColumn("calculations", "error", "VARCHAR(255)"),
+    ]),
+]
+
+
+def pending_migrations(current: int, migrations: Sequence[Migration] = MIGRATIONS) -> List[Migration]:
+    return [migration for migration in migrations if migration.version > current]
+
+
+def migrate(bind, dry_run: bool = False, migrations: Sequence[Migration] = MIGRATIONS) -> List[dict]:
+    """
+    Apply pending migrations in order, stamping the version after each one.
+
+    Returns one report per step; with `dry_run` nothing is changed. Runs
+    under the schema advisory lock, so concurrent callers apply each
+    migration once: the version is read only after the lock is held.
+    """
+    with schema_lock(bind):
+        current = get_schema_version(bind)
+        if current is None:
+            raise RuntimeError("Database is not initialised; run `python -m app.database_init` first")
+
+        reports = []
+        for migration in pending_migrations(current, migrations):
+            for step in migration.steps:
+                report = step.describe(bind)
+                report["version"] = migration.version
+                reports.append(report)
+                if not dry_run:
+                    start = time.perf_counter()
+                    step.apply(bind)
+                    report["seconds"] = round(time.perf_counter() - start, 3)
+            if not dry_run:
+                stamp_schema_version(bind, migration.version)
+        return reports
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Apply versioned schema migrations")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="show the current and latest schema version")
+    upgrade = commands.add_parser("upgrade", help="apply pending migrations")
+    upgrade.add_argument("--dry-run", action="store_true", help="report statements and lock impact only")
+    args = parser.parse_args(argv)
+
+    from app.database import engine
+    if args.command == "status":
+        print(f"Schema version {get_schema_version(engine)}, latest {SCHEMA_VERSION}")
+        return
+
+    for report in migrate(engine, dry_run=args.dry_run):
+        print(f"[{report['version']}] {report['step']} on {report['table']}: "
+              f"~{report['estimated_rows']} rows, lock: {report['lock']}"
+              f"{' (BLOCKS WRITES)' if report['blocking'] else ''}")
+        for statement in report["sql"]:
+            print(f"    {statement};")
+
+
+if __name__ == "__main__":
+    main()
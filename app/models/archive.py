@@ -0,0 +1,71 @@
+# app/models/archive.py
+"""
+Archived Calculation Model
+
+Calculations that have not changed for ARCHIVE_AFTER_DAYS are moved out of
+the hot `calculations` table into `archived_calculations` (see app.archive).
+The archive keeps only what a read needs: the inputs are stored as
+zlib-compressed JSON and there are no indexes beyond the primary key and
+the owner, so old rows stop costing cache and index space in the hot table.
+"""
+
+import json
+import uuid
+import zlib
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, LargeBinary, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.database import Base
+
+COMPRESSION_LEVEL = 6
+
+
+def pack_inputs(inputs: List[float]) -> bytes:
+    """Compact JSON of the inputs, zlib-compressed."""
+    return zlib.compress(json.dumps(inputs, separators=(",", ":")).encode(), COMPRESSION_LEVEL)
+
+
+def unpack_inputs(payload: bytes) -> List[float]:
+    return json.loads(zlib.decompress(payload))
+
+
+class ArchivedCalculation(Base):
+    """A calculation moved to cold storage. Read-only apart from deletion."""
+
+    __tablename__ = "archived_calculations"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    type = Column(String(50), nullable=False)
+    inputs_packed = Column(LargeBinary, nullable=False)
+    result = Column(Float, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    @classmethod
+    def find(cls, db, calc_id: uuid.UUID, user_id: uuid.UUID) -> Optional["ArchivedCalculation"]:
+        return db.query(cls).filter(cls.id == calc_id, cls.user_id == user_id).first()
+
+    def to_dict(self) -> dict:
+        """The calculation in the shape of CalculationResponse."""
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "type": self.type,
+            "inputs": unpack_inputs(self.inputs_packed),
+            "result": self.result,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+    def __repr__(self):
+        return f"<ArchivedCalculation(id={self.id}, type={self.type})>"
@@ -7,7 +7,8 @@ It demonstrates several advanced patterns:
 
 1. Polymorphic inheritance - One table for all calculation types
 2. Factory pattern - Using create() to instantiate the right calculation subclass
-3. Strategy pattern - Each calculation type implements its own business logic
+3. Strategy pattern - Each calculation type's kernel and input rules are
+   declared once in the operation registry (app.operations.registry)
 4. Single Responsibility Principle - Each calculation type does one thing
 
 These models are designed for a calculator application that supports
@@ -16,14 +17,26 @@ exponentiation, modulus, square root, and logarithm.
 """
 
 from datetime import datetime
+from itertools import chain
+import json
 import uuid
-import math
-from typing import List
-from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Float
-from sqlalchemy.dialects.postgresql import UUID
+from typing import List, Optional
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, JSON, Float, cast, func, literal, select, update
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship, declared_attr
 from sqlalchemy.ext.declarative import declared_attr
+from app.core.config import get_settings
+from app.core.ids import uuid7
 from app.database import Base
+from app.operations.registry import OPERATIONS, get_operation
+from app.partitions import (
+    PARTITION_HASH,
+    PARTITION_MONTH,
+    id_time_window,
+    partition_table_kwargs,
+)
+
+settings = get_settings()
 
 class AbstractCalculation:
     """
@@ -56,11 +69,14 @@ class AbstractCalculation:
         - Hides record count
         - Allows for distributed systems
         - Improves security (not guessable)
+        
+        New ids are UUIDv7, so they sort by creation time and inserts append
+        to the primary-key index; older uuid4 ids remain valid.
         """
         return Column(
             UUID(as_uuid=True), 
             primary_key=True, 
-            default=uuid.uuid4,  # Auto-generate UUIDs
+            default=uuid7,  # Auto-generate time-ordered UUIDs
             nullable=False
         )
 
@@ -71,11 +87,15 @@ class AbstractCalculation:
         
         The 'ondelete=CASCADE' means if a user is deleted, all their
         calculations will also be deleted (referential integrity).
+        
+        With hash partitioning it is the partition key, so it joins the
+        primary key (PostgreSQL requires the key in every unique index).
         """
         return Column(
             UUID(as_uuid=True), 
             ForeignKey('users.id', ondelete='CASCADE'),
             nullable=False,
+            primary_key=settings.CALCULATION_PARTITIONING == PARTITION_HASH,
             index=True  # Index for faster queries filtering by user_id
         )
 
@@ -118,16 +138,31 @@ class AbstractCalculation:
             nullable=True
         )
 
+    @declared_attr
+    def error(cls):
+        """
+        Why an async calculation failed, or NULL.
+
+        Set when a deferred job cannot compute a result, so the row (not only
+        the job status, which expires) says the calculation will not complete.
+        """
+        return Column(
+            String(255),
+            nullable=True
+        )
+
     @declared_attr
     def created_at(cls):
         """
         Timestamp when the calculation was created.
         
-        Automatically set to the current time when inserted.
+        Automatically set to the current time when inserted. With month
+        partitioning it is the partition key and part of the primary key.
         """
         return Column(
             DateTime, 
             default=datetime.utcnow,
+            primary_key=settings.CALCULATION_PARTITIONING == PARTITION_MONTH,
             nullable=False
         )
 
@@ -156,7 +191,8 @@ class AbstractCalculation:
         return relationship("User", back_populates="calculations")
 
     @classmethod
-    def create(cls, calculation_type: str, user_id: uuid.UUID, inputs: List[float]) -> "Calculation":
+    def create(cls, calculation_type: str, user_id: uuid.UUID, inputs: List[float],
+               validated: bool = False) -> "Calculation":
         """
         Factory method to create calculation instances of the appropriate type.
         
@@ -168,6 +204,8 @@ class AbstractCalculation:
             calculation_type: The type of calculation to create (e.g., "addition")
             user_id: The UUID of the user who owns this calculation
             inputs: List of numeric inputs for the calculation
+            validated: The inputs already passed the operation's checks (e.g. in
+                the request schema), so get_result() can skip them
             
         Returns:
             An instance of the appropriate Calculation subclass
@@ -175,35 +213,162 @@ class AbstractCalculation:
         Raises:
             ValueError: If the calculation_type is not supported
         """
-        calculation_classes = {
-            'addition': Addition,
-            'subtraction': Subtraction,
-            'multiplication': Multiplication,
-            'division': Division,
-            'exponentiation': Exponentiation,
-            'modulus': Modulus,
-            'square_root': SquareRoot,
-            'logarithm': Logarithm,
-        }
-        calculation_class = calculation_classes.get(calculation_type.lower())
-        if not calculation_class:
-            raise ValueError(f"Unsupported calculation type: {calculation_type}")
-        return calculation_class(user_id=user_id, inputs=inputs)
+        operation = get_operation(calculation_type)
+        calculation_class = cls.__mapper__.polymorphic_map[operation.name].class_
+        calculation = calculation_class(user_id=user_id, inputs=inputs)
+        if validated:
+            calculation._validated_inputs = inputs
+        return calculation
+
+    @classmethod
+    def lookup_criteria(cls, calc_id: uuid.UUID, user_id: Optional[uuid.UUID] = None) -> list:
+        """
+        Filter criteria selecting one calculation by id (and owner).
+        
+        Beyond the id, the criteria carry the partition key so PostgreSQL
+        prunes the scan to a single partition: user_id under hash
+        partitioning, and under month partitioning a created_at window
+        derived from the timestamp inside a UUIDv7 id.
+        
+        Args:
+            calc_id: The calculation's UUID
+            user_id: The owner's UUID; omit only for trusted internal updates
+            
+        Returns:
+            list: Criteria for Query.filter() or Select.where()
+        """
+        criteria = [Calculation.id == calc_id]
+        if user_id is not None:
+            criteria.append(Calculation.user_id == user_id)
+        if settings.CALCULATION_PARTITIONING == PARTITION_MONTH:
+            window = id_time_window(calc_id)
+            if window is not None:
+                criteria.append(Calculation.created_at.between(*window))
+        return criteria
+
+    @classmethod
+    def list_rows(cls, db, user_id: uuid.UUID, limit: Optional[int] = None, offset: int = 0) -> list:
+        """
+        Fetch a user's calculations as plain column tuples for list views.
+        
+        Selecting only the response columns skips what loading full entities
+        costs per row: identity-map bookkeeping, change tracking and picking
+        the polymorphic subclass. Use it when the rows are only serialized.
+        
+        Args:
+            db: SQLAlchemy database session
+            user_id: The UUID of the user whose calculations to list
+            limit: Page size; when given, rows are returned newest first
+            offset: Number of rows to skip before the page
+            
+        Returns:
+            list: Rows with id, user_id, type, inputs, result, created_at, updated_at
+        """
+        query = select(
+            Calculation.id,
+            Calculation.user_id,
+            Calculation.type,
+            Calculation.inputs,
+            Calculation.result,
+            Calculation.created_at,
+            Calculation.updated_at,
+        ).where(Calculation.user_id == user_id)
+        if limit is not None:
+            # UUIDv7 ids are time-ordered, so id breaks created_at ties in creation order
+            query = query.order_by(
+                Calculation.created_at.desc(), Calculation.id.desc()
+            ).limit(limit).offset(offset)
+        return db.execute(query).all()
+
+    @classmethod
+    def appended_inputs(cls, dialect_name: str, values: List[float]):
+        """
+        SQL expression for the inputs column with `values` appended in place.
+        
+        The database extends the stored JSON array itself, so the history is
+        never loaded, parsed or re-serialized in Python. Returns None for
+        dialects without a JSON append, where callers rewrite the list.
+        """
+        if dialect_name == "postgresql":
+            appended = cast(literal(json.dumps(values)), JSONB)
+            return cast(cast(cls.inputs, JSONB).op("||")(appended), JSON)
+        if dialect_name == "sqlite":
+            # '$[#]' appends; chunked to stay under SQLite's function argument limit
+            expression = cls.inputs
+            for start in range(0, len(values), 50):
+                pairs = chain.from_iterable(("$[#]", value) for value in values[start:start + 50])
+                expression = func.json_insert(expression, *pairs)
+            return expression
+        return None
+
+    @classmethod
+    def append_inputs(cls, db, calc_id: uuid.UUID, user_id: uuid.UUID, values: List[float]):
+        """
+        Append `values` to a calculation's inputs and fold them into its result.
+        
+        Only the type and the stored result are read (under a row lock, so
+        concurrent appends serialize), and the new result is computed from
+        them and the appended values alone: O(len(values)), however long the
+        history is. The caller commits.
+        
+        Args:
+            db: SQLAlchemy database session
+            calc_id: The calculation's UUID
+            user_id: The owner's UUID
+            values: The numbers to append
+            
+        Returns:
+            dict: id, type, appended, result and updated_at after the append,
+            or None if the calculation does not exist
+            
+        Raises:
+            ValueError: If the type cannot be appended to, the result is
+                still pending or failed, or the new values are invalid
+        """
+        criteria = Calculation.lookup_criteria(calc_id, user_id)
+        row = db.execute(
+            select(Calculation.type, Calculation.result, Calculation.error).where(*criteria).with_for_update()
+        ).first()
+        if row is None:
+            return None
+        if row.error is not None:
+            raise ValueError(f"Calculation failed: {row.error}")
+        if row.result is None:
+            raise ValueError("Calculation result is still pending.")
+        result = get_operation(row.type).append(row.result, values)
+
+        updated_at = datetime.utcnow()
+        inputs = Calculation.appended_inputs(db.get_bind().dialect.name, values)
+        if inputs is None:
+            inputs = db.execute(select(Calculation.inputs).where(*criteria)).scalar_one() + values
+        db.execute(
+            update(Calculation)
+            .where(*criteria)
+            .values(inputs=inputs, result=result, updated_at=updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        return {"id": calc_id, "type": row.type, "appended": values, "result": result, "updated_at": updated_at}
 
     def get_result(self) -> float:
         """
-        Method to compute calculation result.
+        Compute the calculation's result with its registered operation.
         
-        This is an abstract method that must be implemented by subclasses.
-        It defines the interface that all calculation types must implement.
+        Inputs are validated first (arity and constraints, with the model's
+        error messages) unless they are the very list create() was given as
+        already validated; inputs assigned later are always checked.
         
         Returns:
             float: The result of the calculation
             
         Raises:
-            NotImplementedError: If not implemented by a subclass
+            ValueError: If the inputs are invalid for the operation
+            NotImplementedError: If no operation is registered for this class
         """
-        raise NotImplementedError
+        operation = OPERATIONS.get(type(self).__mapper__.polymorphic_identity)
+        if operation is None:
+            raise NotImplementedError
+        validated = getattr(self, "_validated_inputs", None) is self.inputs
+        return operation.evaluate(self.inputs, validated=validated)
 
     def __repr__(self):
         """
@@ -225,6 +390,13 @@ class Calculation(Base, AbstractCalculation):
     The concrete calculation subclasses (Addition, Subtraction, etc.) will
     inherit from this class and specify their own polymorphic identities.
     """
+    __table_args__ = (
+        # Serves paginated, newest-first lists (added to existing databases by migration 2)
+        Index("ix_calculations_user_id_created_at", "user_id", "created_at"),
+        # Serves the archive job's updated_at cutoff scan (added by migration 3)
+        Index("ix_calculations_updated_at", "updated_at"),
+        partition_table_kwargs(settings.CALCULATION_PARTITIONING),
+    )
     __mapper_args__ = {
         "polymorphic_on": "type",
         "polymorphic_identity": "calculation",
@@ -241,24 +413,6 @@ class Addition(Calculation):
     """
     __mapper_args__ = {"polymorphic_identity": "addition"}
 
-    def get_result(self) -> float:
-        """
-        Calculate the sum of all input values.
-        
-        Validates inputs and returns the sum using Python's built-in sum() function.
-        
-        Returns:
-            float: The sum of all input values
-            
-        Raises:
-            ValueError: If inputs are not a list or if fewer than 2 numbers provided
-        """
-        if not isinstance(self.inputs, list):
-            raise ValueError("Inputs must be a list of numbers.")
-        if len(self.inputs) < 2:
-            raise ValueError("Inputs must be a list with at least two numbers.")
-        return sum(self.inputs)
-
 class Subtraction(Calculation):
     """
     Subtraction calculation subclass.
@@ -270,27 +424,6 @@ class Subtraction(Calculation):
     """
     __mapper_args__ = {"polymorphic_identity": "subtraction"}
 
-    def get_result(self) -> float:
-        """
-        Calculate the result of subtracting subsequent values from the first value.
-        
-        Takes the first number and subtracts all remaining numbers sequentially.
-        
-        Returns:
-            float: The result of the subtraction sequence
-            
-        Raises:
-            ValueError: If inputs are not a list or if fewer than 2 numbers provided
-        """
-        if not isinstance(self.inputs, list):
-            raise ValueError("Inputs must be a list of numbers.")
-        if len(self.inputs) < 2:
-            raise ValueError("Inputs must be a list with at least two numbers.")
-        result = self.inputs[0]
-        for value in self.inputs[1:]:
-            result -= value
-        return result
-
 class Multiplication(Calculation):
     """
     Multiplication calculation subclass.
@@ -302,25 +435,6 @@ class Multiplication(Calculation):
     """
     __mapper_args__ = {"polymorphic_identity": "multiplication"}
 
-    def get_result(self) -> float:
-        """
-        Calculate the product of all input values.
-        
-        Returns:
-            float: The product of all input values
-            
-        Raises:
-            ValueError: If inputs are not a list or if fewer than 2 numbers provided
-        """
-        if not isinstance(self.inputs, list):
-            raise ValueError("Inputs must be a list of numbers.")
-        if len(self.inputs) < 2:
-            raise ValueError("Inputs must be a list with at least two numbers.")
-        result = 1
-        for value in self.inputs:
-            result *= value
-        return result
-
 class Division(Calculation):
     """
     Division calculation subclass.
@@ -335,31 +449,6 @@ class Division(Calculation):
     """
     __mapper_args__ = {"polymorphic_identity": "division"}
 
-    def get_result(self) -> float:
-        """
-        Calculate the result of dividing the first value by all subsequent values.
-        
-        Takes the first number and divides by all remaining numbers sequentially.
-        Includes validation to prevent division by zero.
-        
-        Returns:
-            float: The result of the division sequence
-            
-        Raises:
-            ValueError: If inputs are not a list, if fewer than 2 numbers provided,
-                        or if attempting to divide by zero
-        """
-        if not isinstance(self.inputs, list):
-            raise ValueError("Inputs must be a list of numbers.")
-        if len(self.inputs) < 2:
-            raise ValueError("Inputs must be a list with at least two numbers.")
-        result = self.inputs[0]
-        for value in self.inputs[1:]:
-            if value == 0:
-                raise ValueError("Cannot divide by zero.")
-            result /= value
-        return result
-
 class Exponentiation(Calculation):
     """
     Exponentiation calculation subclass.
@@ -377,34 +466,6 @@ class Exponentiation(Calculation):
     """
     __mapper_args__ = {"polymorphic_identity": "exponentiation"}
 
-    def get_result(self) -> float:
-        """
-        Calculate the result of raising the first value to the power of subsequent values.
-        
-        Takes the first number and raises it to the power of each remaining number
-        sequentially (left-to-right evaluation).
-        
-        Returns:
-            float: The result of the exponentiation sequence
-            
-        Raises:
-            ValueError: If inputs are not a list or if fewer than 2 numbers provided
-            OverflowError: If the result is too large to represent
-        """
-        if not isinstance(self.inputs, list):
-            raise ValueError("Inputs must be a list of numbers.")
-        if len(self.inputs) < 2:
-            raise ValueError("Inputs must be a list with at least two numbers.")
-        
-        result = self.inputs[0]
-        for value in self.inputs[1:]:
-            try:
-                result = result ** value
-            except OverflowError:
-                raise ValueError("Result too large (overflow)")
-        
-        return result
-
 class Modulus(Calculation):
     """
     Modulus calculation subclass.
@@ -421,33 +482,6 @@ class Modulus(Calculation):
     """
     __mapper_args__ = {"polymorphic_identity": "modulus"}
 
-    def get_result(self) -> float:
-        """
-        Calculate the modulus of the first value with all subsequent values.
-        
-        Takes the first number and applies modulus operation with each
-        remaining number sequentially.
-        
-        Returns:
-            float: The result of the modulus sequence
-            
-        Raises:
-            ValueError: If inputs are not a list, if fewer than 2 numbers provided,
-                        or if attempting modulus with zero
-        """
-        if not isinstance(self.inputs, list):
-            raise ValueError("Inputs must be a list of numbers.")
-        if len(self.inputs) < 2:
-            raise ValueError("Inputs must be a list with at least two numbers.")
-        
-        result = self.inputs[0]
-        for value in self.inputs[1:]:
-            if value == 0:
-                raise ValueError("Cannot perform modulus with zero.")
-            result = result % value
-        
-        return result
-
 class SquareRoot(Calculation):
     """
     Square Root calculation subclass.
@@ -464,31 +498,6 @@ class SquareRoot(Calculation):
     """
     __mapper_args__ = {"polymorphic_identity": "square_root"}
 
-    def get_result(self) -> float:
-        """
-        Calculate the square root of the input value.
-        
-        Takes a single number and returns its square root using Python's
-        math.sqrt() function.
-        
-        Returns:
-            float: The square root of the input value
-            
-        Raises:
-            ValueError: If inputs are not a list, if not exactly 1 number provided,
-                        or if the number is negative
-        """
-        if not isinstance(self.inputs, list):
-            raise ValueError("Inputs must be a list of numbers.")
-        if len(self.inputs) != 1:
-            raise ValueError("Square root requires exactly one number.")
-        
-        value = self.inputs[0]
-        if value < 0:
-            raise ValueError("Cannot calculate square root of negative number.")
-        
-        return math.sqrt(value)
-
 class Logarithm(Calculation):
     """
     Logarithm calculation subclass.
@@ -506,31 +515,3 @@ class Logarithm(Calculation):
         - Base must be positive and not equal to 1
     """
     __mapper_args__ = {"polymorphic_identity": "logarithm"}
-
-    def get_result(self) -> float:
-        """
-        Calculate the logarithm of the first value with the second value as base.
-        
-        Format: log_base(value) where inputs = [value, base]
-        Uses Python's math.log() function which accepts (value, base) parameters.
-        
-        Returns:
-            float: The logarithm result
-            
-        Raises:
-            ValueError: If inputs are not a list, if not exactly 2 numbers provided,
-                        if value is not positive, or if base is invalid
-        """
-        if not isinstance(self.inputs, list):
-            raise ValueError("Inputs must be a list of numbers.")
-        if len(self.inputs) != 2:
-            raise ValueError("Logarithm requires exactly two numbers: [value, base].")
-        
-        value, base = self.inputs[0], self.inputs[1]
-        
-        if value <= 0:
-            raise ValueError("Logarithm value must be positive.")
-        if base <= 0 or base == 1:
-            raise ValueError("Logarithm base must be positive and not equal to 1.")
-        
-        return math.log(value, base)
\ No newline at end of file
@@ -20,7 +20,9 @@ from datetime import datetime, timezone, timedelta
 from sqlalchemy import Column, String, Boolean, DateTime, or_
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import relationship
+from app.auth.last_login import last_login_buffer
 from app.core.config import get_settings
+from app.core.ids import uuid7
 from app.database import Base
 from app.models.calculation import Calculation
 
@@ -57,7 +59,7 @@ class User(Base):
     # Primary key and identifying fields
     id = Column(PG_UUID(as_uuid=True), 
                 primary_key=True, 
-                default=uuid.uuid4,  # Auto-generate UUIDs
+                default=uuid7,       # Auto-generate time-ordered UUIDs
                 unique=True, 
                 index=True)          # Index for faster lookups
     
@@ -146,6 +148,16 @@ class User(Base):
         from app.auth.jwt import verify_password
         return verify_password(plain_password, self.password)
 
+    def password_needs_rehash(self) -> bool:
+        """
+        Check whether the stored hash was created with an outdated cost.
+        
+        Returns:
+            bool: True if the password should be re-hashed
+        """
+        from app.auth.jwt import password_needs_rehash
+        return password_needs_rehash(self.password)
+
     @classmethod
     def hash_password(cls, password: str) -> str:
         """
@@ -220,9 +232,8 @@ class User(Base):
         if not user or not user.verify_password(password):
             return None
 
-        # Update the last_login timestamp
-        user.last_login = utcnow()
-        db.flush()
+        # Record the login; last_login is written behind in batches (app.auth.last_login)
+        last_login_buffer.record(db, user, utcnow())
 
         # Generate tokens
         access_token = cls.create_access_token({"sub": str(user.id)})
@@ -234,7 +245,8 @@ class User(Base):
             "refresh_token": refresh_token,
             "token_type": "bearer",
             "expires_at": expires_at,
-            "user": user
+            "user": user,
+            "needs_rehash": user.password_needs_rehash()
         }
 
     @classmethod
@@ -268,26 +280,48 @@ class User(Base):
         return create_token(data["sub"], TokenType.REFRESH)
 
     @classmethod
-    def verify_token(cls, token: str):
+    def verify_token_payload(cls, token: str):
         """
-        Verify a JWT token and return the user identifier.
+        Verify a JWT access token and return its claims.
+        
+        Refresh tokens are rejected: with an asymmetric algorithm both kinds
+        are signed by the same key, so the signature alone does not tell a
+        7-day refresh token from a short-lived access token.
         
         Args:
             token: JWT token to verify
             
         Returns:
-            UUID: User ID if token is valid, None otherwise
+            dict: The token's claims if it is a valid access token, None otherwise
         """
         from app.core.config import settings
+        from app.auth.jwt import get_verification_key
+        from app.schemas.token import TokenType
         from jose import jwt, JWTError
         try:
-            payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.ALGORITHM])
-            sub = payload.get("sub")
-            if sub is None:
-                return None
-            try:
-                return uuid.UUID(sub)
-            except (ValueError, TypeError):
-                return None
+            key = get_verification_key(token, TokenType.ACCESS)
+            payload = jwt.decode(token, key, algorithms=[settings.ALGORITHM])
         except JWTError:
+            return None
+        if payload.get("type") != TokenType.ACCESS.value:
+            return None
+        return payload
+
+    @classmethod
+    def verify_token(cls, token: str):
+        """
+        Verify a JWT access token and return the user identifier.
+        
+        Args:
+            token: JWT token to verify
+            
+        Returns:
+            UUID: User ID if token is a valid access token, None otherwise
+        """
+        payload = cls.verify_token_payload(token)
+        if payload is None:
+            return None
+        try:
+            return uuid.UUID(payload.get("sub"))
+        except (ValueError, TypeError, AttributeError):
             return None
\ No newline at end of file
@@ -28,6 +28,8 @@ to perform mathematical operations based on user input.
 from typing import Union
 import math
 
+from app.core.budget import check_power_chain
+
 # Define a type alias for numbers that can be either int or float
 Number = Union[int, float]
 
@@ -145,6 +147,7 @@ def exponentiate(base: Number, exponent: Number) -> Number:
     >>> exponentiate(10, -2)
     0.01
     """
+    check_power_chain([base, exponent])
     try:
         result = base ** exponent
     except OverflowError:
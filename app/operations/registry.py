@@ -0,0 +1,172 @@
+# app/operations/registry.py
+"""
+Operation Registry
+
+Every calculation type is described once, here: how many inputs it takes,
+which constraints the inputs must satisfy and a kernel that computes the
+result. The
+request schema, the model factory and Calculation.get_result all dispatch
+through the registry, so an input list is checked once when it enters the
+API instead of again in every layer.
+
+Operations that are left folds over their inputs (f(xs + ys) equals
+f([f(xs)] + ys)) can also be extended in place: append() continues the fold
+from a stored result over only the new values, so appending costs O(k) in
+the number of new values rather than O(n) in the history.
+
+Validation messages come in two registers, kept from the layers they used to
+live in: the request schema's ("Cannot divide by zero") and the models'
+("Cannot divide by zero."), which callers and clients already match on.
+"""
+
+import math
+from functools import reduce
+from operator import mod, pow, sub, truediv
+from typing import Callable, Dict, Optional, Sequence
+
+from app.core.budget import MAX_RESULT_LOG10, power_chain_log10
+
+Kernel = Callable[[Sequence[float]], float]
+
+NUMBER_WORDS = {1: "one", 2: "two"}
+
+
+class Constraint:
+    """A rule on an operation's inputs, with its schema- and model-layer messages."""
+
+    def __init__(self, violated: Callable[[Sequence[float]], bool], message: str,
+                 model_message: Optional[str] = None):
+        self.violated = violated
+        self.message = message
+        self.model_message = model_message or f"{message}."
+
+
+class Operation:
+    def __init__(
+        self,
+        name: str,
+        kernel: Kernel,
+        min_inputs: int = 2,
+        max_inputs: Optional[int] = None,
+        constraints: Sequence[Constraint] = (),
+        arity_message: str = "Inputs must be a list with at least two numbers.",
+        left_fold: bool = False,
+    ):
+        self.name = name
+        self.kernel = kernel
+        self.min_inputs = min_inputs
+        self.max_inputs = max_inputs
+        self.constraints = list(constraints)
+        self.arity_message = arity_message
+        self.left_fold = left_fold
+
+    def arity_error(self) -> str:
+        """The schema-layer message for a wrong number of inputs."""
+        if self.max_inputs is None:
+            return f"{self.name} requires at least {NUMBER_WORDS[self.min_inputs]} numbers"
+        count = NUMBER_WORDS[self.max_inputs]
+        return f"{self.name} requires exactly {count} number{'s' if self.max_inputs > 1 else ''}"
+
+    def check(self, inputs: Sequence[float], model: bool = False) -> None:
+        """Raise ValueError if `inputs` are not valid for this operation."""
+        count = len(inputs)
+        if count < self.min_inputs or (self.max_inputs is not None and count > self.max_inputs):
+            raise ValueError(self.arity_message if model else self.arity_error())
+        for constraint in self.constraints:
+            if constraint.violated(inputs):
+                raise ValueError(constraint.model_message if model else constraint.message)
+
+    def evaluate(self, inputs: Sequence[float], validated: bool = False) -> float:
+        """Compute the result, validating first unless the caller already has."""
+        if not validated:
+            if not isinstance(inputs, list):
+                raise ValueError("Inputs must be a list of numbers.")
+            self.check(inputs, model=True)
+        return self.kernel(inputs)
+
+    def append(self, result: float, values: Sequence[float]) -> float:
+        """
+        The result after appending `values` to inputs that produced `result`.
+
+        Folding from the stored result puts it in the first position, where
+        no constraint applies (it is never a divisor or an exponent), so the
+        constraints only see the appended values plus the running magnitude.
+        """
+        if not self.left_fold:
+            raise ValueError(f"{self.name} does not support appending inputs")
+        if not values:
+            raise ValueError("At least one number is required to append")
+        return self.evaluate([result, *values])
+
+
+def _power(inputs: Sequence[float]) -> float:
+    try:
+        return reduce(pow, inputs)
+    except OverflowError:
+        raise ValueError("Result too large (overflow)")
+
+
+def _zero_divisor(inputs: Sequence[float]) -> bool:
+    # index() scans in C from position 1 without copying a slice
+    try:
+        inputs.index(0, 1)
+    except ValueError:
+        return False
+    return True
+
+
+OPERATIONS: Dict[str, Operation] = {
+    operation.name: operation
+    for operation in (
+        Operation("addition", sum, left_fold=True),
+        Operation("subtraction", lambda inputs: reduce(sub, inputs), left_fold=True),
+        Operation("multiplication", math.prod, left_fold=True),
+        Operation(
+            "division", lambda inputs: reduce(truediv, inputs),
+            constraints=[Constraint(_zero_divisor, "Cannot divide by zero")],
+            left_fold=True,
+        ),
+        Operation(
+            "exponentiation", _power,
+            constraints=[Constraint(
+                lambda inputs: power_chain_log10(inputs) > MAX_RESULT_LOG10,
+                "Exponent too large, may cause overflow",
+                model_message="Result too large (overflow)",
+            )],
+            left_fold=True,
+        ),
+        Operation(
+            "modulus", lambda inputs: reduce(mod, inputs),
+            constraints=[Constraint(_zero_divisor, "Cannot perform modulus with zero")],
+            left_fold=True,
+        ),
+        Operation(
+            "square_root", lambda inputs: math.sqrt(inputs[0]),
+            min_inputs=1, max_inputs=1,
+            constraints=[Constraint(
+                lambda inputs: inputs[0] < 0, "Cannot calculate square root of negative number"
+            )],
+            arity_message="Square root requires exactly one number.",
+        ),
+        Operation(
+            "logarithm", lambda inputs: math.log(inputs[0], inputs[1]),
+            min_inputs=2, max_inputs=2,
+            constraints=[
+                Constraint(lambda inputs: inputs[0] <= 0, "Logarithm value must be positive"),
+                Constraint(
+                    lambda inputs: inputs[1] <= 0 or inputs[1] == 1,
+                    "Logarithm base must be positive and not equal to 1",
+                ),
+            ],
+            arity_message="Logarithm requires exactly two numbers: [value, base].",
+        ),
+    )
+}
+
+
+def get_operation(name: str) -> Operation:
+    """The registered operation, or ValueError for an unknown type."""
+    operation = OPERATIONS.get(name.lower())
+    if operation is None:
+        raise ValueError(f"Unsupported calculation type: {name}")
+    return operation
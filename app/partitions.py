@@ -0,0 +1,189 @@
+# app/partitions.py
+"""
+Declarative Partitioning of the calculations table (PostgreSQL)
+
+CALCULATION_PARTITIONING selects the layout:
+
+- "none"  (default): one plain table.
+- "hash":  PARTITION BY HASH (user_id) into CALCULATION_HASH_PARTITIONS
+           partitions. Every per-user query already filters on user_id,
+           so each one touches a single partition.
+- "month": PARTITION BY RANGE (created_at), one partition per calendar
+           month. Old months can be detached (and archived or dropped)
+           without a bulk DELETE. Lookups by id prune to one partition
+           through the creation time embedded in UUIDv7 ids.
+
+PostgreSQL requires the partition key in the primary key, so the key
+becomes (id, user_id) or (id, created_at) in those modes. The layout must be
+chosen before the table is created; converting an existing table means
+creating the partitioned table alongside and copying rows over.
+
+Usage:
+    python -m app.partitions create                # missing partitions (+ months ahead)
+    python -m app.partitions detach --older-than 12 [--concurrently]
+    python -m app.partitions ddl                   # print the statements only
+"""
+
+import argparse
+import re
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.core.config import get_settings
+from app.core.ids import uuid7_timestamp_ms
+
+settings = get_settings()
+
+PARTITION_NONE = "none"
+PARTITION_HASH = "hash"
+PARTITION_MONTH = "month"
+
+TABLE_NAME = "calculations"
+MONTH_PARTITION_PATTERN = re.compile(rf"^{TABLE_NAME}_y(\d{{4}})m(\d{{2}})$")
+
+# created_at is stamped at flush, a moment after the id's timestamp; the
+# lookup window absorbs that gap (and clock skew) while staying inside one
+# partition except for rows created within a minute of a month boundary.
+ID_TIME_WINDOW = timedelta(minutes=1)
+
+
+def partition_key(mode: str) -> Optional[str]:
+    """Column the table is partitioned on, or None when it is not partitioned."""
+    keys = {PARTITION_NONE: None, PARTITION_HASH: "user_id", PARTITION_MONTH: "created_at"}
+    if mode not in keys:
+        raise ValueError(f"Unknown partitioning mode: {mode}")
+    return keys[mode]
+
+
+def partition_table_kwargs(mode: str) -> Dict[str, str]:
+    """Table keyword arguments for the calculations table under `mode`."""
+    if mode == PARTITION_HASH:
+        return {"postgresql_partition_by": "HASH (user_id)"}
+    if mode == PARTITION_MONTH:
+        return {"postgresql_partition_by": "RANGE (created_at)"}
+    partition_key(mode)  # validates the mode
+    return {}
+
+
+def id_time_window(calc_id: uuid.UUID) -> Optional[Tuple[datetime, datetime]]:
+    """created_at bounds implied by a UUIDv7 id, or None for ids without a timestamp."""
+    if calc_id.version != 7:
+        return None
+    created = datetime.utcfromtimestamp(uuid7_timestamp_ms(calc_id) / 1000)
+    return created - ID_TIME_WINDOW, created + ID_TIME_WINDOW
+
+
+def add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_partition_name(month: date) -> str:
+    return f"{TABLE_NAME}_y{month.year:04d}m{month.month:02d}"
+
+
+def month_partition_ddl(month: date) -> str:
+    start = date(month.year, month.month, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {month_partition_name(start)} PARTITION OF {TABLE_NAME} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{add_months(start, 1).isoformat()}')"
+    )
+
+
+def hash_partition_ddl(modulus: int) -> List[str]:
+    return [
+        f"CREATE TABLE IF NOT EXISTS {TABLE_NAME}_p{remainder:02d} PARTITION OF {TABLE_NAME} "
+        f"FOR VALUES WITH (MODULUS {modulus}, REMAINDER {remainder})"
+        for remainder in range(modulus)
+    ]
+
+
+def partition_ddl(mode: str, today: Optional[date] = None, months_ahead: Optional[int] = None) -> List[str]:
+    """Statements creating every partition `mode` needs now (idempotent)."""
+    if mode == PARTITION_HASH:
+        return hash_partition_ddl(settings.CALCULATION_HASH_PARTITIONS)
+    if mode == PARTITION_MONTH:
+        today = today or datetime.utcnow().date()
+        ahead = settings.CALCULATION_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+        return [month_partition_ddl(add_months(today, offset)) for offset in range(ahead + 1)]
+    partition_key(mode)
+    return []
+
+
+def existing_partitions(conn) -> List[str]:
+    return list(conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :table ORDER BY c.relname"
+    ), {"table": TABLE_NAME}).scalars())
+
+
+def partitions_to_detach(names: List[str], older_than_months: int, today: Optional[date] = None) -> List[str]:
+    """Month partitions that end before the retention window starts."""
+    today = today or datetime.utcnow().date()
+    cutoff = add_months(date(today.year, today.month, 1), -older_than_months)
+    expired = []
+    for name in names:
+        match = MONTH_PARTITION_PATTERN.match(name)
+        if match and date(int(match.group(1)), int(match.group(2)), 1) < cutoff:
+            expired.append(name)
+    return expired
+
+
+def create_partitions(bind, mode: Optional[str] = None) -> List[str]:
+    """Create the partitions `mode` needs; returns the statements executed."""
+    statements = partition_ddl(mode or settings.CALCULATION_PARTITIONING)
+    if statements and bind.dialect.name == "postgresql":
+        with bind.begin() as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+    return statements
+
+
+def detach_partitions(bind, older_than_months: int, concurrently: bool = False) -> List[str]:
+    """
+    Detach month partitions older than the retention window.
+
+    Detached tables keep their rows; archive or drop them afterwards.
+    CONCURRENTLY avoids blocking queries on the parent but cannot run
+    inside a transaction block, so each statement autocommits.
+    """
+    with bind.connect() as conn:
+        expired = partitions_to_detach(existing_partitions(conn), older_than_months)
+    suffix = " CONCURRENTLY" if concurrently else ""
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for name in expired:
+            conn.execute(text(f"ALTER TABLE {TABLE_NAME} DETACH PARTITION {name}{suffix}"))
+    return expired
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Manage calculations table partitions")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("create", help="create missing partitions")
+    commands.add_parser("ddl", help="print partition DDL without running it")
+    detach = commands.add_parser("detach", help="detach month partitions past retention")
+    detach.add_argument("--older-than", type=int, required=True, metavar="MONTHS")
+    detach.add_argument("--concurrently", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.command == "ddl":
+        for statement in partition_ddl(settings.CALCULATION_PARTITIONING):
+            print(f"{statement};")
+        return
+
+    from app.database import engine
+    if args.command == "create":
+        for statement in create_partitions(engine):
+            print(statement)
+    else:
+        for name in detach_partitions(engine, args.older_than, args.concurrently):
+            print(f"Detached {name}")
+
+
+if __name__ == "__main__":
+    main()
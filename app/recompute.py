@@ -0,0 +1,231 @@
+# app/recompute.py
+"""
+Bulk Recompute of Stored Results
+
+After a fix to an operation's numeric behaviour, the stored `result` of
+every existing calculation of that type may be stale. This job walks the
+calculations table type by type, in id order, and rewrites the results
+that changed:
+
+- Streaming: rows are read by keyset pagination, RECOMPUTE_BATCH_SIZE at
+  a time (WHERE id > last id ORDER BY id LIMIT n), so memory stays flat
+  however many rows there are. Each page is its own short read, so a
+  throttled run lasting hours never holds one snapshot open, which on
+  PostgreSQL would hold back vacuum on the table being recomputed.
+- Per-row evaluation: each row is evaluated with the operation's kernel
+  from the registry, so a single bad row is counted as failed and left
+  untouched instead of stopping the job.
+- Bulk writes: changed results are written with one executemany UPDATE
+  per batch, in its own short transaction.
+- Resumable: with --checkpoint, the last id written for each type is saved
+  (atomically) after every batch; re-running with the same file resumes
+  from there. A type that finished is skipped.
+- Throttled: RECOMPUTE_ROWS_PER_SECOND caps the scan rate so a production
+  run leaves headroom for live traffic (0 disables the limit).
+
+Usage:
+    python -m app.recompute [--type TYPE ...] [--batch-size N]
+                            [--rows-per-second N] [--checkpoint PATH] [--dry-run]
+"""
+
+import argparse
+import json
+import os
+import time
+import uuid
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import bindparam, select, update
+
+from app.core.config import get_settings
+from app.models.calculation import Calculation
+from app.operations.registry import OPERATIONS, get_operation
+
+settings = get_settings()
+
+
+class RecomputeProgress:
+    """Running totals for a recompute job, reported after every batch."""
+
+    def __init__(self, scanned: int = 0, changed: int = 0, failed: int = 0):
+        self.scanned = scanned
+        self.changed = changed
+        self.failed = failed
+        self.started = time.monotonic()
+        self.scanned_at_start = scanned
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = self.elapsed
+        return (self.scanned - self.scanned_at_start) / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {"scanned": self.scanned, "changed": self.changed, "failed": self.failed}
+
+    def __str__(self) -> str:
+        return (
+            f"scanned={self.scanned} changed={self.changed} failed={self.failed} "
+            f"rate={self.rows_per_second:.0f} rows/s elapsed={self.elapsed:.1f}s"
+        )
+
+
+def load_checkpoint(path: Optional[str]) -> dict:
+    """The saved checkpoint, or an empty one when there is none yet."""
+    if path is None or not os.path.exists(path):
+        return {"types": {}, "totals": {}}
+    with open(path) as checkpoint:
+        return json.load(checkpoint)
+
+
+def save_checkpoint(path: Optional[str], checkpoint: dict) -> None:
+    """Write the checkpoint atomically, so a crash never leaves a torn file."""
+    if path is None:
+        return
+    partial = f"{path}.tmp"
+    with open(partial, "w") as out:
+        json.dump(checkpoint, out)
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(partial, path)
+
+
+def iter_batches(bind, calculation_type: str, after: Optional[uuid.UUID],
+                 batch_size: int) -> Iterator[Sequence]:
+    """Yield (id, user_id, inputs, result) rows of one type in id order, a batch at a time."""
+    query = select(
+        Calculation.id, Calculation.user_id, Calculation.inputs, Calculation.result
+    ).where(Calculation.type == calculation_type).order_by(Calculation.id)
+
+    while True:
+        page = query if after is None else query.where(Calculation.id > after)
+        with bind.connect() as conn:
+            batch = conn.execute(page.limit(batch_size)).all()
+        if not batch:
+            return
+        yield batch
+        after = batch[-1].id
+
+
+def evaluate_batch(calculation_type: str, rows: Sequence) -> List[Optional[float]]:
+    """New results for `rows`; None where a row's inputs no longer evaluate."""
+    operation = get_operation(calculation_type)
+    results = []
+    for row in rows:
+        try:
+            results.append(operation.evaluate(row.inputs))
+        except (ValueError, ArithmeticError, TypeError):
+            results.append(None)
+    return results
+
+
+def write_results(bind, changes: List[dict]) -> None:
+    """Write new results with one executemany UPDATE in a single transaction."""
+    if not changes:
+        return
+    statement = (
+        update(Calculation)
+        # user_id lets PostgreSQL prune to one partition under hash partitioning
+        .where(Calculation.id == bindparam("row_id"), Calculation.user_id == bindparam("row_user_id"))
+        .values(result=bindparam("new_result"))
+    )
+    with bind.begin() as conn:
+        conn.execute(statement, changes)
+
+
+def recompute_results(
+    bind,
+    types: Optional[Sequence[str]] = None,
+    batch_size: Optional[int] = None,
+    rows_per_second: Optional[float] = None,
+    checkpoint_path: Optional[str] = None,
+    dry_run: bool = False,
+    on_batch: Optional[Callable[[str, RecomputeProgress], None]] = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> RecomputeProgress:
+    """
+    Recompute stored results for the given calculation types (all by default).
+
+    Returns the progress totals, including those of earlier runs resumed
+    from the checkpoint. With dry_run nothing is written, not even the
+    checkpoint, and `changed` counts the results that would be rewritten.
+    """
+    size = batch_size or settings.RECOMPUTE_BATCH_SIZE
+    rate = settings.RECOMPUTE_ROWS_PER_SECOND if rows_per_second is None else rows_per_second
+    names = [get_operation(name).name for name in types] if types else list(OPERATIONS)
+
+    checkpoint = load_checkpoint(checkpoint_path)
+    progress = RecomputeProgress(**checkpoint.get("totals", {}))
+    positions: Dict[str, dict] = checkpoint.setdefault("types", {})
+
+    for name in names:
+        position = positions.setdefault(name, {"after": None, "done": False})
+        if position["done"]:
+            continue
+        after = uuid.UUID(position["after"]) if position["after"] else None
+
+        for rows in iter_batches(bind, name, after, size):
+            results = evaluate_batch(name, rows)
+            changes = []
+            for row, result in zip(rows, results):
+                if result is None:
+                    progress.failed += 1
+                elif result != row.result:
+                    changes.append({"row_id": row.id, "row_user_id": row.user_id, "new_result": result})
+            progress.scanned += len(rows)
+            progress.changed += len(changes)
+
+            if not dry_run:
+                write_results(bind, changes)
+                position["after"] = str(rows[-1].id)
+                checkpoint["totals"] = progress.to_dict()
+                save_checkpoint(checkpoint_path, checkpoint)
+
+            if on_batch is not None:
+                on_batch(name, progress)
+            if rate:
+                # Pace the whole run, not each batch, so short batches don't drift
+                ahead = (progress.scanned - progress.scanned_at_start) / rate - progress.elapsed
+                if ahead > 0:
+                    sleep(ahead)
+
+        if not dry_run:
+            position["done"] = True
+            save_checkpoint(checkpoint_path, checkpoint)
+    return progress
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Recompute stored calculation results")
+    parser.add_argument("--type", dest="types", action="append", default=None,
+                        help="Calculation type to recompute (repeatable; default all)")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--rows-per-second", type=float, default=None,
+                        help="Scan rate limit; 0 for unlimited")
+    parser.add_argument("--checkpoint", default=None, help="File to save progress to and resume from")
+    parser.add_argument("--dry-run", action="store_true", help="Count changed results without writing")
+    args = parser.parse_args(argv)
+
+    from app.database import engine
+
+    def report(name: str, progress: RecomputeProgress) -> None:
+        print(f"{name}: {progress}", flush=True)
+
+    progress = recompute_results(
+        engine,
+        types=args.types,
+        batch_size=args.batch_size,
+        rows_per_second=args.rows_per_second,
+        checkpoint_path=args.checkpoint,
+        dry_run=args.dry_run,
+        on_batch=report,
+    )
+    verb = "Would rewrite" if args.dry_run else "Rewrote"
+    print(f"{verb} {progress.changed} of {progress.scanned} results ({progress.failed} failed to evaluate)")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,13 +8,14 @@ from .user import (
     PasswordUpdate
 )
 
-from .token import Token, TokenData, TokenResponse
+from .token import Token, TokenData, TokenResponse, LogoutRequest, RefreshRequest
 from .calculation import (
     CalculationType,
     CalculationBase,
     CalculationCreate,
     CalculationUpdate,
-    CalculationResponse
+    CalculationResponse,
+    CalculationJobResponse
 )
 
 __all__ = [
@@ -27,9 +28,12 @@ __all__ = [
     'Token',
     'TokenData',
     'TokenResponse',
+    'LogoutRequest',
+    'RefreshRequest',
     'CalculationType',
     'CalculationBase',
     'CalculationCreate',
     'CalculationUpdate',
     'CalculationResponse',
+    'CalculationJobResponse',
 ]
\ No newline at end of file
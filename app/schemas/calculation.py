@@ -6,6 +6,7 @@ It includes schemas for:
 - Base calculation data (common fields)
 - Creating new calculations
 - Updating existing calculations
+- Appending inputs to existing calculations
 - Returning calculation responses
 
 The schemas use Pydantic's validation system to ensure data integrity and provide
@@ -18,6 +19,8 @@ from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
 
+from app.operations.registry import get_operation
+
 class CalculationType(str, Enum):
     """
     Enumeration of valid calculation types.
@@ -117,10 +120,10 @@ class CalculationBase(BaseModel):
         """
         Validates the inputs based on calculation type.
         
-        This validator runs after the model is created and performs
-        business logic validation:
-        1. Ensures correct number of inputs for each operation type
-        2. Validates operation-specific constraints (e.g., no division by zero)
+        The operation registry (app.operations.registry) declares each
+        operation's arity and constraints, e.g. no division by zero or an
+        exponentiation chain that would overflow. Inputs that pass here are
+        not checked again when the calculation is evaluated.
         
         Returns:
             CalculationBase: The validated model
@@ -128,68 +131,7 @@ class CalculationBase(BaseModel):
         Raises:
             ValueError: If validation fails
         """
-        # Operations that require at least 2 inputs
-        multi_input_ops = {
-            CalculationType.ADDITION,
-            CalculationType.SUBTRACTION,
-            CalculationType.MULTIPLICATION,
-            CalculationType.DIVISION,
-            CalculationType.EXPONENTIATION,
-            CalculationType.MODULUS
-        }
-        
-        # Operations that require exactly 1 input
-        single_input_ops = {
-            CalculationType.SQUARE_ROOT
-        }
-        
-        # Operations that require exactly 2 inputs
-        two_input_ops = {
-            CalculationType.LOGARITHM
-        }
-        
-        # Validate input count based on operation type
-        if self.type in multi_input_ops and len(self.inputs) < 2:
-            raise ValueError(f"{self.type.value} requires at least two numbers")
-        
-        if self.type in single_input_ops and len(self.inputs) != 1:
-            raise ValueError(f"{self.type.value} requires exactly one number")
-        
-        if self.type in two_input_ops and len(self.inputs) != 2:
-            raise ValueError(f"{self.type.value} requires exactly two numbers")
-        
-        # Specific validation for each operation type
-        if self.type == CalculationType.DIVISION:
-            # Prevent division by zero (skip the first value as numerator)
-            if any(x == 0 for x in self.inputs[1:]):
-                raise ValueError("Cannot divide by zero")
-        
-        elif self.type == CalculationType.MODULUS:
-            # Prevent modulus by zero (skip the first value)
-            if any(x == 0 for x in self.inputs[1:]):
-                raise ValueError("Cannot perform modulus with zero")
-        
-        elif self.type == CalculationType.SQUARE_ROOT:
-            # Prevent square root of negative numbers
-            if self.inputs[0] < 0:
-                raise ValueError("Cannot calculate square root of negative number")
-        
-        elif self.type == CalculationType.LOGARITHM:
-            # Validate logarithm inputs: log(value, base)
-            value, base = self.inputs[0], self.inputs[1]
-            if value <= 0:
-                raise ValueError("Logarithm value must be positive")
-            if base <= 0 or base == 1:
-                raise ValueError("Logarithm base must be positive and not equal to 1")
-        
-        elif self.type == CalculationType.EXPONENTIATION:
-            # Check for potential overflow with large exponents
-            if len(self.inputs) >= 2:
-                base, exponent = self.inputs[0], self.inputs[1]
-                # Warn about potential overflow for very large exponents
-                if abs(exponent) > 1000:
-                    raise ValueError("Exponent too large, may cause overflow")
-        
+        get_operation(self.type.value).check(self.inputs)
         return self
 
     model_config = ConfigDict(
@@ -278,6 +220,70 @@ class CalculationUpdate(BaseModel):
         json_schema_extra={"example": {"inputs": [42, 7]}}
     )
 
+class CalculationAppend(BaseModel):
+    """
+    Schema for appending inputs to an existing Calculation.
+    
+    Used by PATCH /calculations/{id}/inputs:append. Only the new values are
+    sent; the stored inputs are extended and the result is updated from the
+    stored result, so the request does not need to repeat the history.
+    """
+    inputs: List[float] = Field(
+        ...,
+        description="Numbers to append to the calculation's inputs",
+        example=[2, 3],
+        min_items=1
+    )
+
+    @model_validator(mode='after')
+    def validate_inputs(self) -> "CalculationAppend":
+        """
+        Ensures at least one number is appended.
+        
+        Operation-specific checks (zero divisors, overflow) run against the
+        stored result when the append is applied.
+        
+        Raises:
+            ValueError: If no numbers are given
+        """
+        if len(self.inputs) < 1:
+            raise ValueError("At least one number is required to append")
+        return self
+
+    model_config = ConfigDict(json_schema_extra={"example": {"inputs": [2, 3]}})
+
+class CalculationAppendResponse(BaseModel):
+    """
+    Schema for the outcome of an append.
+    
+    Deliberately omits the full inputs list: echoing it back would make
+    every append cost O(history) again on the wire.
+    """
+    id: UUID = Field(
+        ...,
+        description="Unique UUID of the calculation",
+        example="123e4567-e89b-12d3-a456-426614174999"
+    )
+    type: CalculationType = Field(
+        ...,
+        description="Type of the calculation",
+        example="addition"
+    )
+    appended: List[float] = Field(
+        ...,
+        description="The numbers that were appended",
+        example=[2, 3]
+    )
+    result: float = Field(
+        ...,
+        description="Result of the calculation after the append",
+        example=15.5
+    )
+    updated_at: datetime = Field(
+        ...,
+        description="Time when the calculation was last updated"
+    )
+
 class CalculationResponse(CalculationBase):
     """
     Schema for reading a Calculation from the database.
@@ -312,9 +318,9 @@ class CalculationResponse(CalculationBase):
         ..., 
         description="Time when the calculation was last updated"
     )
-    result: float = Field(
+    result: Optional[float] = Field(
         ...,
-        description="Result of the calculation",
+        description="Result of the calculation (null while an async calculation is pending)",
         example=15.5
     )
 
@@ -334,4 +340,54 @@ class CalculationResponse(CalculationBase):
                 "updated_at": "2025-01-01T00:00:00"
             }
         }
-    )
\ No newline at end of file
+    )
+
+class CalculationJobResponse(BaseModel):
+    """
+    Schema for the status of a deferred (async) calculation.
+    
+    Returned with 202 Accepted by POST /calculations?async=true and by
+    GET /calculations/{id}/job while clients poll for completion. The
+    job id is the id of the calculation row that receives the result.
+    """
+    job_id: UUID = Field(
+        ...,
+        description="UUID of the job (same as the calculation id)",
+        example="123e4567-e89b-12d3-a456-426614174999"
+    )
+    status: str = Field(
+        ...,
+        description="One of: pending, running, completed, failed",
+        example="pending"
+    )
+    result: Optional[float] = Field(
+        None,
+        description="Result of the calculation, once completed",
+        example=8.0
+    )
+    error: Optional[str] = Field(
+        None,
+        description="Why the calculation failed, if it did",
+        example=None
+    )
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+def calculation_row_to_json(row) -> dict:
+    """
+    Encode a projected calculation row (see Calculation.list_rows) as a
+    JSON-ready dict with the same shape as CalculationResponse.
+    
+    This bypasses model validation, so it is only meant for rows read back
+    from the database, which were validated when they were written.
+    """
+    return {
+        "type": row.type,
+        "inputs": row.inputs,
+        "id": str(row.id),
+        "user_id": str(row.user_id),
+        "created_at": row.created_at.isoformat(),
+        "updated_at": row.updated_at.isoformat(),
+        "result": row.result,
+    }
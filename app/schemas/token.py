@@ -2,6 +2,7 @@
 from enum import Enum
 from uuid import UUID
 from datetime import datetime
+from typing import Optional
 from pydantic import BaseModel, ConfigDict, Field
 
 class TokenType(str, Enum):
@@ -69,3 +70,27 @@ class TokenResponse(BaseModel):
             }
         }
     )
+
+class LogoutRequest(BaseModel):
+    """Schema for an optional logout body carrying the refresh token to revoke."""
+    refresh_token: Optional[str] = Field(None, description="JWT refresh token to revoke")
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "refresh_token": "eyJ0eXAiOiJKV1QiLCJhbGciOiJIUzI1NiJ9..."
+            }
+        }
+    )
+
+class RefreshRequest(BaseModel):
+    """Schema for exchanging a refresh token for a new token pair."""
+    refresh_token: str = Field(..., description="JWT refresh token")
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "refresh_token": "eyJ0eXAiOiJKV1QiLCJhbGciOiJIUzI1NiJ9..."
+            }
+        }
+    )
@@ -0,0 +1,180 @@
+# app/static_assets.py
+"""
+Static Asset Pipeline
+
+Templates reference static files through the `asset_url()` Jinja global,
+which returns a content-fingerprinted URL such as
+/static/js/dashboard.3f2a9c1b7e.js. Because the name changes whenever the
+content does, fingerprinted URLs are served with a one-year immutable
+Cache-Control and browsers never revalidate them. Plain /static/... URLs
+keep Starlette's default (ETag/Last-Modified revalidation).
+
+Fingerprints are computed from the files on disk when the manifest is first
+used, so there is no build step or renamed copies to keep in sync. Running
+
+    python -m app.static_assets
+
+writes precompressed .gz (and .br, when the optional `brotli` package is
+installed) siblings next to compressible assets; they are served in place
+of the original to clients that accept that encoding.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import stat
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+STATIC_URL_PREFIX = "/static"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+HASH_LENGTH = 10
+
+# Preference order when the client accepts several encodings
+PRECOMPRESSED_SUFFIXES = (("br", ".br"), ("gzip", ".gz"))
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".json", ".svg", ".html", ".txt", ".map", ".ico"}
+MIN_COMPRESS_BYTES = 512
+
+
+def file_digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:HASH_LENGTH]
+
+
+def fingerprinted_name(relative_path: str, digest: str) -> str:
+    """css/style.css -> css/style.<digest>.css"""
+    stem, dot, suffix = relative_path.rpartition(".")
+    if not dot or "/" in suffix:
+        return f"{relative_path}.{digest}"
+    return f"{stem}.{digest}.{suffix}"
+
+
+class AssetManifest:
+    """Maps logical asset paths to their fingerprinted names and back."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self._hashed: Optional[Dict[str, str]] = None
+        self._logical: Dict[str, str] = {}
+
+    def build(self) -> None:
+        hashed = {}
+        for path in sorted(self.directory.rglob("*")):
+            if not path.is_file() or path.suffix in (".gz", ".br"):
+                continue
+            relative = path.relative_to(self.directory).as_posix()
+            hashed[relative] = fingerprinted_name(relative, file_digest(path))
+        self._logical = {name: relative for relative, name in hashed.items()}
+        self._hashed = hashed
+
+    @property
+    def hashed(self) -> Dict[str, str]:
+        if self._hashed is None:
+            self.build()
+        return self._hashed
+
+    def url(self, path: str) -> str:
+        """URL for a static asset; fingerprinted when the file exists."""
+        path = path.lstrip("/")
+        return f"{STATIC_URL_PREFIX}/{self.hashed.get(path, path)}"
+
+    def logical_path(self, requested: str) -> Optional[str]:
+        """The real file behind a fingerprinted name, or None for plain paths."""
+        self.hashed  # make sure the manifest is built
+        return self._logical.get(requested.replace(os.sep, "/"))
+
+
+def accepted_encodings(scope: Scope) -> set:
+    accept = Headers(scope=scope).get("accept-encoding", "")
+    encodings = set()
+    for part in accept.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        encodings.add(name.strip().lower())
+    return encodings
+
+
+class FingerprintedStaticFiles(StaticFiles):
+    """
+    StaticFiles that understands fingerprinted names and precompressed variants.
+
+    Fingerprinted requests map back to the underlying file and are marked
+    immutable. For any request, a .br/.gz sibling is served with the matching
+    Content-Encoding when the client accepts it.
+    """
+
+    def __init__(self, *, manifest: AssetManifest, **kwargs):
+        super().__init__(**kwargs)
+        self.manifest = manifest
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        logical = self.manifest.logical_path(path)
+        target = logical or path
+
+        response = None
+        encodings = accepted_encodings(scope)
+        if encodings and scope["method"] in ("GET", "HEAD"):
+            _, original = await anyio.to_thread.run_sync(self.lookup_path, target)
+        else:
+            original = None
+        for encoding, suffix in PRECOMPRESSED_SUFFIXES:
+            if original is None or encoding not in encodings:
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, target + suffix)
+            # A variant older than its source is stale; fall through to the original
+            if (stat_result and stat.S_ISREG(stat_result.st_mode)
+                    and stat_result.st_mtime >= original.st_mtime):
+                response = self.file_response(full_path, stat_result, scope)
+                response.headers["content-type"] = (
+                    mimetypes.guess_type(target)[0] or "application/octet-stream"
+                )
+                response.headers["content-encoding"] = encoding
+                break
+
+        if response is None:
+            response = await super().get_response(target, scope)
+        if Path(target).suffix in COMPRESSIBLE_SUFFIXES:
+            response.headers["vary"] = "Accept-Encoding"
+        if logical is not None:
+            response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+
+def precompress(directory: str) -> int:
+    """Write .gz/.br siblings for compressible assets; returns how many were written."""
+    try:
+        import brotli
+    except ImportError:  # optional dependency
+        brotli = None
+
+    written = 0
+    for path in sorted(Path(directory).rglob("*")):
+        if not path.is_file() or path.suffix not in COMPRESSIBLE_SUFFIXES:
+            continue
+        data = path.read_bytes()
+        if len(data) < MIN_COMPRESS_BYTES:
+            continue
+        variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants[".br"] = brotli.compress(data, quality=11)
+        for suffix, compressed in variants.items():
+            if len(compressed) < len(data):
+                path.with_name(path.name + suffix).write_bytes(compressed)
+                written += 1
+    return written
+
+
+static_manifest = AssetManifest("static")
+
+
+if __name__ == "__main__":
+    directory = sys.argv[1] if len(sys.argv) > 1 else "static"
+    print(f"Wrote {precompress(directory)} precompressed files under {directory}/")
@@ -0,0 +1,319 @@
+# app/tasks.py
+"""
+Deferred Calculation Jobs
+
+Expensive calculations (very long input lists, large exponentiation chains)
+can be submitted with POST /calculations?async=true. The row is stored with a
+NULL result and a job is queued under the calculation's id. Results are
+computed off the request path:
+
+- "local" backend: the API worker evaluates the job on a process pool as
+  soon as the response has been sent.
+- "redis" backend: jobs are pushed onto a Redis list and any worker running
+  the consumer loop (started in the app lifespan) picks them up, running up
+  to CALCULATION_WORKERS at a time. A job is claimed with BLMOVE into a
+  processing list and holds a lease while it runs; when a worker dies
+  mid-job the lease expires and the reaper puts the job back on the queue.
+
+Job status (pending, running, completed, failed) is kept in-process and, when
+Redis is reachable, in a Redis hash so that every worker can answer polls.
+Only the latest CALCULATION_FINISHED_JOBS_KEPT finished statuses stay in
+memory; older ones are answered from Redis or the calculation row.
+"""
+
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+from uuid import UUID
+
+from redis.exceptions import RedisError
+from sqlalchemy.orm import Session
+
+from app.auth.redis import get_redis
+from app.core.budget import evaluation_budget
+from app.core.config import get_settings
+from app.events import EVENT_UPDATED, calculation_events
+from app.models.calculation import Calculation
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+QUEUE_KEY = "calc_jobs"
+PROCESSING_KEY = "calc_jobs:processing"
+JOB_STATUS_TTL_SECONDS = 24 * 60 * 60
+
+# Moves a claimed job whose lease has expired from the processing list back
+# to the consuming end of the queue. LREM makes it safe for several reapers
+# to race on the same job: only one of them finds it to move.
+REQUEUE_JOB_SCRIPT = """
+if redis.call('EXISTS', KEYS[3]) == 1 then
+    return 0
+end
+if redis.call('LREM', KEYS[1], 1, ARGV[1]) == 0 then
+    return 0
+end
+redis.call('RPUSH', KEYS[2], ARGV[1])
+return 1
+"""
+
+
+def lease_key(job_id: str) -> str:
+    return f"calc_job_lease:{job_id}"
+
+
+def evaluate(calculation_type: str, inputs: List[float]) -> float:
+    """Compute a calculation's result within the CPU/memory budget. Runs inside a worker process."""
+    with evaluation_budget(
+        settings.CALCULATION_CPU_BUDGET_SECONDS,
+        settings.CALCULATION_MEMORY_BUDGET_MB * 1024 * 1024,
+    ):
+        return Calculation.create(calculation_type, None, inputs).get_result()
+
+
+def store_result(bind, calc_id: str, result: Optional[float], user_id: Optional[str] = None,
+                 error: Optional[str] = None) -> datetime:
+    """
+    Write a finished job's result, or why it failed, onto its calculation row;
+    returns the new updated_at.
+    """
+    updated_at = datetime.utcnow()
+    owner = UUID(user_id) if user_id is not None else None
+    with Session(bind=bind) as db:
+        db.query(Calculation).filter(*Calculation.lookup_criteria(UUID(calc_id), owner)).update(
+            {
+                Calculation.result: result,
+                Calculation.error: error[:255] if error is not None else None,
+                Calculation.updated_at: updated_at,
+            },
+            synchronize_session=False
+        )
+        db.commit()
+    return updated_at
+
+
+class CalculationJobQueue:
+    """Runs deferred calculations on a process pool and tracks their status."""
+
+    def __init__(self, max_workers: int, backend: str = "local"):
+        self.max_workers = max_workers
+        self.backend = backend
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Pending and running jobs; finished ones move to _finished, oldest first
+        self._statuses: Dict[str, dict] = {}
+        self._finished: "OrderedDict[str, dict]" = OrderedDict()
+        self._consumer: Optional[asyncio.Task] = None
+        self._reaper: Optional[asyncio.Task] = None
+        # Claimed jobs seen without a lease on the last sweep
+        self._orphans: Set[str] = set()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """Process pool, created on first use so idle workers cost nothing."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def set_status(self, job_id: str, status: str, result: Optional[float] = None,
+                         error: Optional[str] = None) -> None:
+        job = {"job_id": job_id, "status": status, "result": result, "error": error}
+        if status in (JOB_COMPLETED, JOB_FAILED):
+            self._statuses.pop(job_id, None)
+            self._finished[job_id] = job
+            self._finished.move_to_end(job_id)
+            while len(self._finished) > settings.CALCULATION_FINISHED_JOBS_KEPT:
+                self._finished.popitem(last=False)
+        else:
+            self._statuses[job_id] = job
+        try:
+            redis = await get_redis()
+            await redis.set(f"calc_job:{job_id}", json.dumps(job), ex=JOB_STATUS_TTL_SECONDS)
+        except (RedisError, OSError):
+            pass  # this worker still knows the status; others fall back to the row
+
+    async def get_status(self, job_id: str) -> Optional[dict]:
+        """Latest known status of a job, or None if no worker has recorded one."""
+        job = self._statuses.get(job_id) or self._finished.get(job_id)
+        if job is not None:
+            return job
+        try:
+            redis = await get_redis()
+            data = await redis.get(f"calc_job:{job_id}")
+        except (RedisError, OSError):
+            return None
+        return json.loads(data) if data else None
+
+    async def submit(self, job_id: str, calculation_type: str, inputs: List[float], bind,
+                     user_id: Optional[str] = None) -> None:
+        """Queue a job on the configured backend."""
+        if self.backend == "redis":
+            try:
+                redis = await get_redis()
+                await redis.lpush(QUEUE_KEY, json.dumps({
+                    "job_id": job_id, "type": calculation_type, "inputs": inputs, "user_id": user_id
+                }))
+                await self.set_status(job_id, JOB_PENDING)
+                return
+            except (RedisError, OSError):
+                logger.warning("Redis queue unavailable, running job %s locally", job_id)
+        await self.run(job_id, calculation_type, inputs, bind, user_id)
+
+    async def run(self, job_id: str, calculation_type: str, inputs: List[float], bind,
+                  user_id: Optional[str] = None) -> None:
+        """Evaluate a job on the process pool, store its result and notify the owner's dashboards."""
+        await self.set_status(job_id, JOB_RUNNING)
+        loop = asyncio.get_running_loop()
+        result, error = None, None
+        try:
+            result = await asyncio.wait_for(
+                loop.run_in_executor(self.executor, evaluate, calculation_type, inputs),
+                timeout=settings.CALCULATION_JOB_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            error = "Calculation timed out"
+        except (ValueError, OverflowError, ZeroDivisionError) as e:
+            error = str(e)
+        except Exception:
+            logger.exception("Calculation job %s crashed", job_id)
+            error = "Internal error"
+        # A failure is stored on the row too, so polls still report it once
+        # the job status has expired or on a worker that never saw it
+        try:
+            updated_at = await asyncio.to_thread(store_result, bind, job_id, result, user_id, error)
+        except Exception:
+            logger.exception("Storing the outcome of calculation job %s failed", job_id)
+            await self.set_status(job_id, JOB_FAILED, error="Internal error")
+            return
+        if error is not None:
+            await self.set_status(job_id, JOB_FAILED, error=error)
+        else:
+            await self.set_status(job_id, JOB_COMPLETED, result=result)
+            if user_id is not None:
+                await calculation_events.publish(user_id, EVENT_UPDATED, {
+                    "id": job_id, "result": result, "updated_at": updated_at.isoformat()
+                })
+
+    async def run_claimed(self, item: str, bind) -> None:
+        """Run a job claimed from the Redis queue, then drop it from the processing list."""
+        job = json.loads(item)
+        lease = lease_key(job["job_id"])
+        try:
+            redis = await get_redis()
+            await redis.set(lease, "1", ex=int(
+                settings.CALCULATION_JOB_TIMEOUT_SECONDS + settings.CALCULATION_REAPER_INTERVAL_SECONDS
+            ))
+        except (RedisError, OSError):
+            pass  # without a lease the job may be requeued and run twice; its result is the same
+        await self.run(job["job_id"], job["type"], job["inputs"], bind, job.get("user_id"))
+        try:
+            redis = await get_redis()
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.lrem(PROCESSING_KEY, 1, item)
+                pipe.delete(lease)
+                await pipe.execute()
+        except (RedisError, OSError):
+            logger.warning("Could not acknowledge job %s; the reaper may run it again", job["job_id"])
+
+    async def consume(self, bind) -> None:
+        """
+        Worker loop for the Redis backend: claim jobs and run up to max_workers
+        of them at a time until cancelled.
+
+        A job is only claimed once a slot is free, so jobs this worker cannot
+        start yet stay on the queue for other workers. Jobs still running when
+        the loop is cancelled keep their place in the processing list and are
+        requeued by the reaper once their lease expires.
+        """
+        slots = asyncio.Semaphore(self.max_workers)
+        running: Set[asyncio.Task] = set()
+
+        def finished(task: asyncio.Task) -> None:
+            running.discard(task)
+            slots.release()
+
+        try:
+            while True:
+                await slots.acquire()
+                try:
+                    redis = await get_redis()
+                    item = await redis.blmove(QUEUE_KEY, PROCESSING_KEY, 5, "RIGHT", "LEFT")
+                except (RedisError, OSError):
+                    slots.release()
+                    await asyncio.sleep(settings.CALCULATION_QUEUE_REDIS_RETRY_SECONDS)
+                    continue
+                if item is None:
+                    slots.release()
+                    continue
+                task = asyncio.create_task(self.run_claimed(item, bind))
+                running.add(task)
+                task.add_done_callback(finished)
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def reap(self) -> int:
+        """
+        Requeue claimed jobs whose lease has expired; returns how many.
+
+        A job is requeued only after two sweeps in a row find it without a
+        lease, so one that was claimed an instant before its lease was set
+        is left alone.
+        """
+        redis = await get_redis()
+        items = await redis.lrange(PROCESSING_KEY, 0, -1)
+        if not items:
+            self._orphans = set()
+            return 0
+        leases = await redis.mget([lease_key(json.loads(item)["job_id"]) for item in items])
+        orphans = {item for item, lease in zip(items, leases) if lease is None}
+        requeued = 0
+        for item in orphans & self._orphans:
+            job_id = json.loads(item)["job_id"]
+            if await redis.eval(REQUEUE_JOB_SCRIPT, 3, PROCESSING_KEY, QUEUE_KEY, lease_key(job_id), item):
+                logger.warning("Requeued calculation job %s after its worker stopped", job_id)
+                requeued += 1
+        self._orphans = orphans
+        return requeued
+
+    async def reap_forever(self) -> None:
+        """Sweep the processing list every CALCULATION_REAPER_INTERVAL_SECONDS until cancelled."""
+        while True:
+            await asyncio.sleep(settings.CALCULATION_REAPER_INTERVAL_SECONDS)
+            try:
+                await self.reap()
+            except (RedisError, OSError):
+                pass  # retried on the next sweep
+
+    def start(self, bind) -> None:
+        """Start consuming and reaping the Redis queue (no-op for the local backend)."""
+        if self.backend == "redis" and self._consumer is None:
+            self._consumer = asyncio.create_task(self.consume(bind))
+            self._reaper = asyncio.create_task(self.reap_forever())
+
+    async def stop(self) -> None:
+        """Stop the consumer and reaper and shut down the process pool."""
+        for task in (self._consumer, self._reaper):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._consumer = self._reaper = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+calculation_jobs = CalculationJobQueue(
+    settings.CALCULATION_WORKERS,
+    settings.CALCULATION_QUEUE_BACKEND
+)
@@ -0,0 +1,462 @@
+// static/js/dashboard.js
+document.addEventListener('DOMContentLoaded', function() {
+  // Check if user is logged in
+  const token = localStorage.getItem('access_token');
+  if (!token) {
+    window.location.href = '/login';
+    return;
+  }
+
+  // Display welcome message in layout nav
+  const username = localStorage.getItem('username') || "User";
+  const layoutWelcome = document.getElementById('layoutUserWelcome');
+  if (layoutWelcome) layoutWelcome.textContent = `Welcome, ${username}!`;
+
+  // Attach logout logic
+  const layoutLogoutBtn = document.getElementById('layoutLogoutBtn');
+  if (layoutLogoutBtn) {
+    layoutLogoutBtn.addEventListener('click', () => {
+      if (confirm('Are you sure you want to logout?')) {
+        localStorage.clear();
+        document.cookie = 'access_token=; path=/; max-age=0; SameSite=Strict';
+        window.location.href = '/login';
+      }
+    });
+  }
+
+  // Alert helper functions
+  function showError(msg) {
+    const errorAlert = document.getElementById('errorAlert');
+    const errorMessage = document.getElementById('errorMessage');
+    errorMessage.textContent = msg;
+    errorAlert.classList.remove('hidden');
+    
+    setTimeout(() => {
+      errorAlert.classList.add('opacity-0');
+      setTimeout(() => {
+        errorAlert.classList.add('hidden');
+        errorAlert.classList.remove('opacity-0');
+      }, 300);
+    }, 5000);
+    
+    errorAlert.scrollIntoView({ behavior: 'smooth', block: 'center' });
+  }
+  
+  function showSuccess(msg) {
+    const successAlert = document.getElementById('successAlert');
+    const successMessage = document.getElementById('successMessage');
+    successMessage.textContent = msg;
+    successAlert.classList.remove('hidden');
+    
+    setTimeout(() => {
+      successAlert.classList.add('opacity-0');
+      setTimeout(() => {
+        successAlert.classList.add('hidden');
+        successAlert.classList.remove('opacity-0');
+      }, 300);
+    }, 5000);
+    
+    successAlert.scrollIntoView({ behavior: 'smooth', block: 'center' });
+  }
+
+  // Update input field placeholder and help text based on operation type
+  const calcTypeSelect = document.getElementById('calcType');
+  const calcInputsField = document.getElementById('calcInputs');
+  const inputLabel = document.getElementById('inputLabel');
+  const inputHelp = document.getElementById('inputHelp');
+  
+  function updateInputGuidance() {
+    const type = calcTypeSelect.value;
+    
+    switch(type) {
+      case 'square_root':
+        inputLabel.textContent = 'Number';
+        calcInputsField.placeholder = 'e.g. 16';
+        inputHelp.textContent = 'Enter a single positive number';
+        break;
+      case 'logarithm':
+        inputLabel.textContent = 'Value and Base';
+        calcInputsField.placeholder = 'e.g. 100, 10';
+        inputHelp.textContent = 'Enter value and base (e.g., log₁₀(100) = "100, 10")';
+        break;
+      case 'exponentiation':
+        inputLabel.textContent = 'Base and Exponent(s)';
+        calcInputsField.placeholder = 'e.g. 2, 3';
+        inputHelp.textContent = 'Enter base and exponent(s) (e.g., 2³ = "2, 3")';
+        break;
+      case 'modulus':
+        inputLabel.textContent = 'Dividend and Divisor(s)';
+        calcInputsField.placeholder = 'e.g. 10, 3';
+        inputHelp.textContent = 'Enter dividend and divisor(s) for remainder calculation';
+        break;
+      default:
+        inputLabel.textContent = 'Numbers (comma-separated)';
+        calcInputsField.placeholder = 'e.g. 5, 10, 15';
+        inputHelp.textContent = 'Enter at least two numbers separated by commas';
+    }
+  }
+  
+  calcTypeSelect.addEventListener('change', updateInputGuidance);
+
+  // Rows currently shown in the table, keyed by calculation id
+  const calculationsById = new Map();
+
+  function renderEmptyState() {
+    const tableBody = document.getElementById('calculationsTable');
+    tableBody.innerHTML = '';
+    const noDataRow = document.createElement('tr');
+    noDataRow.id = 'emptyRow';
+    noDataRow.innerHTML = `
+      <td colspan="5" class="px-6 py-10 text-center">
+        <div class="flex flex-col items-center justify-center text-gray-500">
+          <svg class="w-12 h-12 mb-3 text-gray-300" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M9 5H7a2 2 0 00-2 2v12a2 2 0 002 2h10a2 2 0 002-2V7a2 2 0 00-2-2h-2M9 5a2 2 0 002 2h2a2 2 0 002-2M9 5a2 2 0 012-2h2a2 2 0 012 2"></path>
+          </svg>
+          <p class="text-lg font-medium">No calculations found</p>
+          <p class="text-sm mt-1">Create your first calculation above!</p>
+        </div>
+      </td>
+    `;
+    tableBody.appendChild(noDataRow);
+  }
+
+  // Build the table row for one calculation
+  function renderRow(calc) {
+    const row = document.createElement('tr');
+    row.dataset.id = calc.id;
+    row.classList.add('hover:bg-gray-50', 'transition-colors');
+    
+    const calcDate = new Date(calc.created_at);
+    const dateOptions = { year: 'numeric', month: 'short', day: 'numeric' };
+    const formattedDate = calcDate.toLocaleDateString(undefined, dateOptions);
+    const formattedTime = calcDate.toLocaleTimeString(undefined, { hour: '2-digit', minute: '2-digit' });
+    
+    // Get operation symbol
+    let operationSymbol = '';
+    switch(calc.type) {
+      case 'addition': operationSymbol = '+'; break;
+      case 'subtraction': operationSymbol = '-'; break;
+      case 'multiplication': operationSymbol = '×'; break;
+      case 'division': operationSymbol = '÷'; break;
+      case 'exponentiation': operationSymbol = '^'; break;
+      case 'modulus': operationSymbol = '%'; break;
+      case 'square_root': operationSymbol = '√'; break;
+      case 'logarithm': operationSymbol = 'log'; break;
+    }
+    
+    row.innerHTML = `
+      <td class="px-6 py-4 text-gray-800 whitespace-nowrap">
+        <span class="font-medium capitalize">${calc.type} ${operationSymbol}</span>
+      </td>
+      <td class="px-6 py-4 text-gray-800 whitespace-nowrap">
+        ${calc.inputs.join(', ')}
+      </td>
+      <td class="px-6 py-4 text-gray-800 whitespace-nowrap font-semibold">
+        ${calc.result ?? '…'}
+      </td>
+      <td class="px-6 py-4 text-gray-800 whitespace-nowrap">
+        <div class="text-sm">
+          <div>${formattedDate}</div>
+          <div class="text-gray-500">${formattedTime}</div>
+        </div>
+      </td>
+      <td class="px-6 py-4">
+        <div class="flex space-x-3">
+          <a 
+            href="/dashboard/view/${calc.id}"
+            class="text-blue-700 hover:text-blue-800 font-medium flex items-center"
+          >
+            <svg class="w-4 h-4 mr-1" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+              <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M15 12a3 3 0 11-6 0 3 3 0 016 0z"></path>
+              <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M2.458 12C3.732 7.943 7.523 5 12 5c4.478 0 8.268 2.943 9.542 7-1.274 4.057-5.064 7-9.542 7-4.477 0-8.268-2.943-9.542-7z"></path>
+            </svg>
+            View
+          </a>
+          <a 
+            href="/dashboard/edit/${calc.id}"
+            class="text-gray-700 hover:text-gray-800 font-medium flex items-center"
+          >
+            <svg class="w-4 h-4 mr-1" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+              <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M11 5H6a2 2 0 00-2 2v11a2 2 0 002 2h11a2 2 0 002-2v-5m-1.414-9.414a2 2 0 112.828 2.828L11.828 15H9v-2.828l8.586-8.586z"></path>
+            </svg>
+            Edit
+          </a>
+          <button 
+            class="text-red-600 hover:text-red-800 font-medium delete-calc flex items-center"
+            data-id="${calc.id}"
+          >
+            <svg class="w-4 h-4 mr-1" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+              <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M19 7l-.867 12.142A2 2 0 0116.138 21H7.862a2 2 0 01-1.995-1.858L5 7m5 4v6m4-6v6m1-10V4a1 1 0 00-1-1h-4a1 1 0 00-1 1v3M4 7h16"></path>
+            </svg>
+            Delete
+          </button>
+        </div>
+      </td>
+    `;
+
+    attachDeleteHandler(row);
+    return row;
+  }
+
+  function attachDeleteHandler(row) {
+    row.querySelector('.delete-calc').addEventListener('click', async (e) => {
+      if (!confirm('Are you sure you want to delete this calculation?')) return;
+
+      const calcId = e.target.closest('.delete-calc').dataset.id;
+      const originalContent = e.target.closest('.delete-calc').innerHTML;
+      e.target.closest('.delete-calc').innerHTML = '<svg class="animate-spin h-4 w-4 mr-1" xmlns="http://www.w3.org/2000/svg" fill="none" viewBox="0 0 24 24"><circle class="opacity-25" cx="12" cy="12" r="10" stroke="currentColor" stroke-width="4"></circle><path class="opacity-75" fill="currentColor" d="M4 12a8 8 0 018-8V0C5.373 0 0 5.373 0 12h4zm2 5.291A7.962 7.962 0 014 12H0c0 3.042 1.135 5.824 3 7.938l3-2.647z"></path></svg> Deleting...';
+      e.target.closest('.delete-calc').disabled = true;
+      
+      try {
+        const delResp = await fetch(`/calculations/${calcId}`, {
+          method: 'DELETE',
+          headers: { 'Authorization': `Bearer ${token}` }
+        });
+        
+        if (!delResp.ok) {
+          if (delResp.status === 401) {
+            localStorage.clear();
+            window.location.href = '/login';
+            return;
+          }
+          throw new Error('Failed to delete calculation');
+        }
+        
+        showSuccess('Calculation deleted successfully');
+        const row = e.target.closest('tr');
+        row.style.transition = 'opacity 0.5s';
+        row.style.opacity = '0';
+        setTimeout(() => {
+          removeRow(calcId);
+        }, 500);
+        
+      } catch (err) {
+        e.target.closest('.delete-calc').innerHTML = originalContent;
+        e.target.closest('.delete-calc').disabled = false;
+        showError(err.message || 'Error deleting calculation');
+      }
+    });
+  }
+
+  // Insert a new calculation or replace the row of an existing one
+  function upsertRow(calc) {
+    const tableBody = document.getElementById('calculationsTable');
+    const merged = { ...(calculationsById.get(calc.id) || {}), ...calc };
+    calculationsById.set(calc.id, merged);
+    document.getElementById('emptyRow')?.remove();
+
+    const row = renderRow(merged);
+    const existing = tableBody.querySelector(`tr[data-id="${calc.id}"]`);
+    if (existing) {
+      existing.replaceWith(row);
+    } else {
+      tableBody.prepend(row);
+    }
+    return row;
+  }
+
+  function removeRow(calcId) {
+    calculationsById.delete(calcId);
+    document.querySelector(`#calculationsTable tr[data-id="${calcId}"]`)?.remove();
+    if (calculationsById.size === 0) renderEmptyState();
+  }
+
+  // Load the calculations from the API
+  async function loadCalculations() {
+    try {
+      const tableBody = document.getElementById('calculationsTable');
+      document.getElementById('loadingRow')?.classList.remove('hidden');
+      
+      const response = await fetch('/calculations', {
+        headers: { 'Authorization': `Bearer ${token}` }
+      });
+      
+      if (!response.ok) {
+        if (response.status === 401) {
+          localStorage.clear();
+          window.location.href = '/login';
+          return;
+        }
+        throw new Error('Failed to load calculations');
+      }
+
+      const calculations = await response.json();
+      tableBody.innerHTML = '';
+      calculationsById.clear();
+
+      if (calculations.length === 0) {
+        renderEmptyState();
+        return;
+      }
+
+      calculations.forEach(calc => {
+        calculationsById.set(calc.id, calc);
+        tableBody.appendChild(renderRow(calc));
+      });
+    } catch (err) {
+      showError(err.message || 'Error loading calculations');
+      
+      const tableBody = document.getElementById('calculationsTable');
+      tableBody.innerHTML = `
+        <tr>
+          <td colspan="5" class="px-6 py-10 text-center">
+            <div class="flex flex-col items-center justify-center text-red-600">
+              <svg class="w-12 h-12 mb-3" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 8v4m0 4h.01M21 12a9 9 0 11-18 0 9 9 0 0118 0z"></path>
+              </svg>
+              <p class="text-lg font-medium">Failed to load calculations</p>
+              <button id="retryButton" class="mt-3 bg-blue-700 text-white px-4 py-2 rounded">
+                Retry
+              </button>
+            </div>
+          </td>
+        </tr>
+      `;
+      
+      document.getElementById('retryButton')?.addEventListener('click', loadCalculations);
+    }
+  }
+
+  // Live updates: patch the table from server-sent deltas instead of re-fetching it
+  function subscribeToUpdates() {
+    if (!window.EventSource) return;
+    // Same-origin EventSource sends the access_token cookie set at login
+    const events = new EventSource('/calculations/events');
+    events.addEventListener('created', e => upsertRow(JSON.parse(e.data)));
+    events.addEventListener('updated', e => {
+      const calc = JSON.parse(e.data);
+      // Appends carry only the new inputs; extend the ones we already show
+      if (calc.appended) {
+        const shown = calculationsById.get(calc.id);
+        if (!shown) return;
+        calc.inputs = [...shown.inputs, ...calc.appended];
+        delete calc.appended;
+      }
+      // Partial deltas (e.g. async results) only apply to rows we already show
+      if (calc.created_at || calculationsById.has(calc.id)) upsertRow(calc);
+    });
+    events.addEventListener('deleted', e => removeRow(JSON.parse(e.data).id));
+    // Server-rendered pages are paginated; reload the page rather than the full list
+    events.addEventListener('resync', () => initialData ? window.location.reload() : loadCalculations());
+    window.addEventListener('beforeunload', () => events.close());
+  }
+
+  // Handle form submission for new calculation
+  document.getElementById('calculationForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+    
+    const form = e.target;
+    const submitButton = form.querySelector('button[type="submit"]');
+    const originalButtonContent = submitButton.innerHTML;
+    
+    const type = document.getElementById('calcType').value;
+    const inputsVal = document.getElementById('calcInputs').value;
+    const inputs = inputsVal.split(',')
+      .map(num => parseFloat(num.trim()))
+      .filter(num => !isNaN(num));
+
+    // Validate based on operation type
+    let minInputs = 2;
+    let maxInputs = Infinity;
+    let errorMsg = 'Please enter at least two valid numbers, separated by commas';
+    
+    if (type === 'square_root') {
+      minInputs = 1;
+      maxInputs = 1;
+      errorMsg = 'Please enter exactly one positive number';
+      
+      if (inputs.length === 1 && inputs[0] < 0) {
+        showError('Square root requires a positive number');
+        return;
+      }
+    } else if (type === 'logarithm') {
+      minInputs = 2;
+      maxInputs = 2;
+      errorMsg = 'Please enter exactly two numbers: value and base';
+      
+      if (inputs.length === 2) {
+        if (inputs[0] <= 0) {
+          showError('Logarithm value must be positive');
+          return;
+        }
+        if (inputs[1] <= 0 || inputs[1] === 1) {
+          showError('Logarithm base must be positive and not equal to 1');
+          return;
+        }
+      }
+    } else if (type === 'division' || type === 'modulus') {
+      if (inputs.some((val, idx) => idx > 0 && val === 0)) {
+        showError(`Cannot ${type === 'division' ? 'divide' : 'perform modulus'} by zero`);
+        return;
+      }
+    }
+
+    if (inputs.length < minInputs || inputs.length > maxInputs) {
+      showError(errorMsg);
+      
+      const inputField = document.getElementById('calcInputs');
+      inputField.classList.add('border-red-500');
+      inputField.focus();
+      
+      setTimeout(() => inputField.classList.remove('border-red-500'), 3000);
+      inputField.addEventListener('input', () => inputField.classList.remove('border-red-500'), { once: true });
+      
+      return;
+    }
+
+    const newCalc = { type, inputs };
+
+    submitButton.disabled = true;
+    submitButton.innerHTML = '<svg class="animate-spin -ml-1 mr-2 h-4 w-4 text-white" xmlns="http://www.w3.org/2000/svg" fill="none" viewBox="0 0 24 24"><circle class="opacity-25" cx="12" cy="12" r="10" stroke="currentColor" stroke-width="4"></circle><path class="opacity-75" fill="currentColor" d="M4 12a8 8 0 018-8V0C5.373 0 0 5.373 0 12h4zm2 5.291A7.962 7.962 0 014 12H0c0 3.042 1.135 5.824 3 7.938l3-2.647z"></path></svg> Calculating...';
+
+    try {
+      const response = await fetch('/calculations', {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          'Authorization': `Bearer ${token}`
+        },
+        body: JSON.stringify(newCalc)
+      });
+      
+      if (!response.ok) {
+        if (response.status === 401) {
+          localStorage.clear();
+          window.location.href = '/login';
+          return;
+        }
+        
+        const errorData = await response.json();
+        throw new Error(errorData.detail || 'Failed to create calculation');
+      }
+      
+      const result = await response.json();
+      
+      showSuccess(`Calculation complete: ${result.result}`);
+      form.reset();
+      updateInputGuidance(); // Reset guidance after form reset
+      
+      const newRow = upsertRow(result);
+      newRow.classList.add('bg-blue-50');
+      setTimeout(() => {
+        newRow.classList.remove('bg-blue-50');
+      }, 2000);
+      
+    } catch (error) {
+      showError(error.message || 'Error creating calculation');
+    } finally {
+      submitButton.disabled = false;
+      submitButton.innerHTML = originalButtonContent;
+    }
+  });
+
+  // Initial load: server-rendered rows only need their data and handlers wired up
+  const initialData = document.getElementById('initialCalculations');
+  if (initialData) {
+    JSON.parse(initialData.textContent).forEach(calc => calculationsById.set(calc.id, calc));
+    document.querySelectorAll('#calculationsTable tr[data-id]').forEach(attachDeleteHandler);
+  } else {
+    loadCalculations();
+  }
+  subscribeToUpdates();
+});
@@ -4,16 +4,22 @@ import time
 import logging
 from typing import Generator, Dict, List
 from contextlib import contextmanager
+from uuid import uuid4
 
 import pytest
 import requests
 from faker import Faker
-from sqlalchemy.orm import Session
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import StaticPool
 from playwright.sync_api import sync_playwright, Browser, Page
 
-from app.database import Base, get_engine, get_sessionmaker
+from app.auth.jwt import create_token
+from app.database import Base, get_db, get_engine, get_sessionmaker
+from app.main import app
 from app.models.user import User
+from app.schemas.token import TokenType
 from app.core.config import settings
 from app.database_init import init_db, drop_db
 
@@ -158,6 +164,54 @@ def seed_users(db_session: Session, request) -> List[User]:
     logger.info(f"Seeded {len(users)} users.")
     return users
 
+# ======================================================================================
+# In-memory Database Fixtures
+# ======================================================================================
+@pytest.fixture
+def empty_engine():
+    """A private in-memory SQLite database without tables, shared by all its connections."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def memory_engine(empty_engine):
+    """A private in-memory SQLite database with the application's tables."""
+    Base.metadata.create_all(bind=empty_engine)
+    return empty_engine
+
+@pytest.fixture
+def app_db(memory_engine):
+    """
+    Serve the app's get_db from memory_engine for the test, restoring any
+    previous override afterwards. Yields the sessionmaker.
+    """
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=memory_engine)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    yield SessionLocal
+    if previous is not None:
+        app.dependency_overrides[get_db] = previous
+    else:
+        app.dependency_overrides.pop(get_db, None)
+
+@pytest.fixture
+def auth() -> Dict[str, str]:
+    """Bearer Authorization header for a new user id."""
+    return {"Authorization": f"Bearer {create_token(uuid4(), TokenType.ACCESS)}"}
+
 # ======================================================================================
 # FastAPI Server Fixture
 # ======================================================================================
@@ -0,0 +1,116 @@
+# tests/integration/test_append_inputs.py
+import struct
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth.jwt import create_token
+from app.encodings import MEDIA_FLOAT64
+from app.main import app
+from app.models.calculation import Calculation
+from app.schemas.token import TokenType
+
+client = TestClient(app)
+
+
+def create(headers, calculation_type, inputs):
+    response = client.post("/calculations", json={"type": calculation_type, "inputs": inputs}, headers=headers)
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def append(headers, calc_id, inputs):
+    return client.patch(f"/calculations/{calc_id}/inputs:append", json={"inputs": inputs}, headers=headers)
+
+
+@pytest.mark.parametrize("calculation_type, history, new, expected", [
+    ("addition", [1, 2], [3, 4], 10),
+    ("subtraction", [20, 5], [3, 2], 10),
+    ("multiplication", [2, 3], [4], 24),
+    ("division", [100, 2], [5, 2], 5),
+    ("modulus", [100, 7], [1.5], 0.5),
+    ("exponentiation", [2, 3], [2], 64),
+])
+def test_append_matches_full_recompute(app_db, auth, calculation_type, history, new, expected):
+    calc_id = create(auth, calculation_type, history)
+    response = append(auth, calc_id, new)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["result"] == pytest.approx(expected)
+    assert body["appended"] == new
+    assert "inputs" not in body
+
+    stored = client.get(f"/calculations/{calc_id}", headers=auth).json()
+    assert stored["inputs"] == history + new
+    assert stored["result"] == pytest.approx(expected)
+
+
+def test_repeated_appends_accumulate(app_db, auth):
+    # Stays well under the per-user CALCULATION_RATE_LIMIT
+    calc_id = create(auth, "addition", [0, 0])
+    for value in range(1, 31):
+        assert append(auth, calc_id, [value]).status_code == 200
+    stored = client.get(f"/calculations/{calc_id}", headers=auth).json()
+    assert stored["inputs"] == [0, 0, *range(1, 31)]
+    assert stored["result"] == sum(range(1, 31))
+
+
+def test_large_append_is_chunked(app_db, auth):
+    calc_id = create(auth, "addition", [1, 1])
+    assert append(auth, calc_id, [1] * 130).json()["result"] == 132
+    assert len(client.get(f"/calculations/{calc_id}", headers=auth).json()["inputs"]) == 132
+
+
+def test_append_from_float64_body(app_db, auth):
+    calc_id = create(auth, "multiplication", [1.5, 2])
+    response = client.patch(
+        f"/calculations/{calc_id}/inputs:append",
+        content=struct.pack("<2d", 2.0, 0.5),
+        headers={**auth, "Content-Type": MEDIA_FLOAT64},
+    )
+    assert response.status_code == 200
+    assert response.json()["result"] == 3.0
+
+
+@pytest.mark.parametrize("calculation_type, history, new, message", [
+    ("division", [10, 2], [0], "Cannot divide by zero"),
+    ("exponentiation", [10, 100], [100], "overflow"),
+    ("square_root", [16], [9], "does not support appending"),
+    ("logarithm", [8, 2], [2], "does not support appending"),
+])
+def test_invalid_appends_leave_the_calculation_unchanged(app_db, auth, calculation_type, history, new, message):
+    calc_id = create(auth, calculation_type, history)
+    before = client.get(f"/calculations/{calc_id}", headers=auth).json()
+    response = append(auth, calc_id, new)
+    assert response.status_code == 400
+    assert message in response.json()["detail"]
+    assert client.get(f"/calculations/{calc_id}", headers=auth).json() == before
+
+
+def test_append_requires_values_and_ownership(app_db, auth):
+    calc_id = create(auth, "addition", [1, 2])
+    assert append(auth, calc_id, []).status_code == 422
+    other_user = {"Authorization": f"Bearer {create_token(uuid4(), TokenType.ACCESS)}"}
+    assert append(other_user, calc_id, [1]).status_code == 404
+    assert append(auth, "not-a-uuid", [1]).status_code == 400
+
+
+def test_pending_results_cannot_be_appended_to(app_db, auth):
+    calc_id = create(auth, "addition", [1, 2])
+    with app_db() as db:
+        db.query(Calculation).update({Calculation.result: None})
+        db.commit()
+    response = append(auth, calc_id, [3])
+    assert response.status_code == 400
+    assert "pending" in response.json()["detail"]
+
+
+def test_failed_results_cannot_be_appended_to(app_db, auth):
+    calc_id = create(auth, "addition", [1, 2])
+    with app_db() as db:
+        db.query(Calculation).update({Calculation.result: None, Calculation.error: "Calculation timed out"})
+        db.commit()
+    response = append(auth, calc_id, [3])
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Calculation failed: Calculation timed out"
@@ -0,0 +1,105 @@
+# tests/integration/test_archive.py
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert, select
+
+from app.archive import archive_calculations
+from app.auth.jwt import create_token
+from app.main import app
+from app.models.archive import ArchivedCalculation, pack_inputs, unpack_inputs
+from app.models.calculation import Calculation
+from app.schemas.token import TokenType
+
+client = TestClient(app)
+
+NOW = datetime(2026, 6, 1)
+
+
+def seed(engine, user_id, ages_in_days):
+    ids = [uuid.uuid4() for _ in ages_in_days]
+    with engine.begin() as conn:
+        conn.execute(insert(Calculation), [
+            {
+                "id": calc_id,
+                "user_id": user_id,
+                "type": "multiplication",
+                "inputs": [float(i), 2.5],
+                "result": i * 2.5,
+                "created_at": NOW - timedelta(days=age),
+                "updated_at": NOW - timedelta(days=age),
+            }
+            for i, (calc_id, age) in enumerate(zip(ids, ages_in_days))
+        ])
+    return ids
+
+
+def count(engine, model):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(model)).scalar()
+
+
+def test_packed_inputs_round_trip():
+    inputs = [1.5, -2.0, 1e300, 0.1]
+    assert unpack_inputs(pack_inputs(inputs)) == inputs
+    assert len(pack_inputs([1.0] * 1000)) < 100
+
+
+def test_only_old_rows_are_archived_in_batches(memory_engine):
+    seed(memory_engine, uuid.uuid4(), [200, 150, 120, 100, 30, 1])
+
+    moved = archive_calculations(memory_engine, older_than_days=90, batch_size=2, now=NOW)
+
+    assert moved == 4
+    assert count(memory_engine, Calculation) == 2
+    assert count(memory_engine, ArchivedCalculation) == 4
+    # Re-running finds nothing new
+    assert archive_calculations(memory_engine, older_than_days=90, batch_size=2, now=NOW) == 0
+
+
+def test_get_falls_back_to_archive(memory_engine, app_db):
+    user_id = uuid.uuid4()
+    old_id, recent_id = seed(memory_engine, user_id, [365, 1])
+    archive_calculations(memory_engine, older_than_days=90, now=NOW)
+    headers = {"Authorization": f"Bearer {create_token(user_id, TokenType.ACCESS)}"}
+
+    archived = client.get(f"/calculations/{old_id}", headers=headers)
+    assert archived.status_code == 200
+    assert archived.json()["inputs"] == [0.0, 2.5]
+    assert archived.json()["created_at"].startswith("2025-06-01")
+
+    assert client.get(f"/calculations/{recent_id}", headers=headers).status_code == 200
+    listed = client.get("/calculations", headers=headers).json()
+    assert [row["id"] for row in listed] == [str(recent_id)]
+
+
+def test_archived_rows_stay_private_and_deletable(memory_engine, app_db):
+    user_id = uuid.uuid4()
+    (old_id,) = seed(memory_engine, user_id, [365])
+    archive_calculations(memory_engine, older_than_days=90, now=NOW)
+    other = {"Authorization": f"Bearer {create_token(uuid.uuid4(), TokenType.ACCESS)}"}
+    owner = {"Authorization": f"Bearer {create_token(user_id, TokenType.ACCESS)}"}
+
+    assert client.get(f"/calculations/{old_id}", headers=other).status_code == 404
+    assert client.delete(f"/calculations/{old_id}", headers=owner).status_code == 204
+    assert client.get(f"/calculations/{old_id}", headers=owner).status_code == 404
+    assert count(memory_engine, ArchivedCalculation) == 0
+
+
+def test_writes_to_archived_rows_conflict(memory_engine, app_db):
+    user_id = uuid.uuid4()
+    (old_id,) = seed(memory_engine, user_id, [365])
+    archive_calculations(memory_engine, older_than_days=90, now=NOW)
+    owner = {"Authorization": f"Bearer {create_token(user_id, TokenType.ACCESS)}"}
+    other = {"Authorization": f"Bearer {create_token(uuid.uuid4(), TokenType.ACCESS)}"}
+
+    updated = client.put(f"/calculations/{old_id}", json={"inputs": [1, 2]}, headers=owner)
+    assert updated.status_code == 409
+    assert updated.json()["detail"] == "Calculation is archived and read-only."
+    appended = client.patch(f"/calculations/{old_id}/inputs:append", json={"inputs": [3]}, headers=owner)
+    assert appended.status_code == 409
+
+    # Another user's archived row is still just not found
+    assert client.put(f"/calculations/{old_id}", json={"inputs": [1, 2]}, headers=other).status_code == 404
+    assert client.get(f"/calculations/{old_id}", headers=owner).json()["inputs"] == [0.0, 2.5]
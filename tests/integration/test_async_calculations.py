@@ -0,0 +1,311 @@
+# tests/integration/test_async_calculations.py
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy.orm import sessionmaker
+
+from app.auth.jwt import create_token
+from app.main import app
+from app.models.calculation import Calculation
+from app.schemas.token import TokenType
+from app.tasks import (
+    JOB_COMPLETED,
+    JOB_FAILED,
+    JOB_PENDING,
+    JOB_RUNNING,
+    PROCESSING_KEY,
+    QUEUE_KEY,
+    CalculationJobQueue,
+    calculation_jobs,
+    evaluate,
+    lease_key,
+)
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def no_redis():
+    """Job status stays in-process, as it does when Redis is down."""
+    with patch("app.tasks.get_redis", new=AsyncMock(side_effect=RedisConnectionError("down"))):
+        yield
+
+
+@pytest.fixture
+def jobs(no_redis):
+    queue = CalculationJobQueue(max_workers=1)
+    yield queue
+    if queue._executor is not None:
+        queue._executor.shutdown(wait=True)
+
+
+@pytest.fixture
+def app_db(app_db, no_redis):
+    """The shared app_db, also resetting the app's job queue afterwards."""
+    yield app_db
+    calculation_jobs._statuses.clear()
+    calculation_jobs._finished.clear()
+    if calculation_jobs._executor is not None:
+        calculation_jobs._executor.shutdown(wait=True)
+        calculation_jobs._executor = None
+
+
+def add_pending(engine, calculation_type, inputs):
+    calc = Calculation.create(calculation_type, uuid4(), inputs)
+    with sessionmaker(bind=engine)() as db:
+        db.add(calc)
+        db.commit()
+        return str(calc.id)
+
+
+def test_evaluate_matches_model_result():
+    assert evaluate("addition", [1, 2, 3]) == 6
+    assert evaluate("division", [100, 2, 5]) == 10
+
+
+@pytest.mark.asyncio
+async def test_run_stores_result_and_marks_completed(jobs, memory_engine):
+    calc_id = add_pending(memory_engine, "multiplication", [2, 3, 4])
+
+    await jobs.run(calc_id, "multiplication", [2, 3, 4], memory_engine)
+
+    status = await jobs.get_status(calc_id)
+    assert status["status"] == JOB_COMPLETED
+    assert status["result"] == 24
+    with sessionmaker(bind=memory_engine)() as db:
+        assert db.query(Calculation.result).filter(Calculation.id == UUID(calc_id)).scalar() == 24
+
+
+@pytest.mark.asyncio
+async def test_run_marks_invalid_calculation_failed(jobs, memory_engine):
+    calc_id = add_pending(memory_engine, "division", [1, 0])
+
+    await jobs.run(calc_id, "division", [1, 0], memory_engine)
+
+    status = await jobs.get_status(calc_id)
+    assert status["status"] == JOB_FAILED
+    assert "divide by zero" in status["error"]
+    # The row records the failure too, for polls that outlive the status
+    with sessionmaker(bind=memory_engine)() as db:
+        row = db.query(Calculation.result, Calculation.error).filter(Calculation.id == UUID(calc_id)).one()
+    assert row.result is None
+    assert "divide by zero" in row.error
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_enqueues_instead_of_running():
+    fake_redis = AsyncMock()
+    queue = CalculationJobQueue(max_workers=1, backend="redis")
+
+    with patch("app.tasks.get_redis", new=AsyncMock(return_value=fake_redis)):
+        await queue.submit("job-1", "addition", [1, 2], bind=None)
+
+    key, payload = fake_redis.lpush.await_args.args
+    assert key == QUEUE_KEY
+    assert json.loads(payload) == {"job_id": "job-1", "type": "addition", "inputs": [1, 2], "user_id": None}
+    assert queue._executor is None
+    assert (await queue.get_status("job-1"))["status"] == JOB_PENDING
+
+
+def test_async_create_returns_202_then_completes(app_db, auth):
+    response = client.post(
+        "/calculations?async=true",
+        json={"type": "addition", "inputs": [1, 2, 3]},
+        headers=auth,
+    )
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert response.json()["status"] == JOB_PENDING
+    assert response.headers["Location"] == f"/calculations/{job_id}/job"
+
+    # TestClient runs background tasks before returning, so the job is done
+    job = client.get(f"/calculations/{job_id}/job", headers=auth)
+    assert job.status_code == 200
+    assert job.json()["status"] == JOB_COMPLETED
+    assert job.json()["result"] == 6
+
+    calc = client.get(f"/calculations/{job_id}", headers=auth)
+    assert calc.json()["result"] == 6
+
+
+def test_job_status_is_private_to_owner(app_db):
+    owner = {"Authorization": f"Bearer {create_token(uuid4(), TokenType.ACCESS)}"}
+    other = {"Authorization": f"Bearer {create_token(uuid4(), TokenType.ACCESS)}"}
+    job_id = client.post(
+        "/calculations?async=true",
+        json={"type": "subtraction", "inputs": [10, 4]},
+        headers=owner,
+    ).json()["job_id"]
+
+    assert client.get(f"/calculations/{job_id}/job", headers=other).status_code == 404
+
+
+def test_failed_job_is_reported_from_the_row(app_db, auth):
+    calc_id = client.post(
+        "/calculations",
+        json={"type": "addition", "inputs": [2, 2]},
+        headers=auth,
+    ).json()["id"]
+    # As run() leaves it, after the status was evicted, expired or recorded on another worker
+    with app_db() as db:
+        db.query(Calculation).update({Calculation.result: None, Calculation.error: "Calculation timed out"})
+        db.commit()
+
+    job = client.get(f"/calculations/{calc_id}/job", headers=auth)
+    assert job.json() == {"job_id": calc_id, "status": JOB_FAILED, "result": None, "error": "Calculation timed out"}
+
+
+def test_job_status_falls_back_to_row(app_db, auth):
+    calc = client.post(
+        "/calculations",
+        json={"type": "addition", "inputs": [2, 2]},
+        headers=auth,
+    ).json()
+
+    job = client.get(f"/calculations/{calc['id']}/job", headers=auth)
+    assert job.json() == {"job_id": calc["id"], "status": JOB_COMPLETED, "result": 4.0, "error": None}
+
+
+@pytest.mark.asyncio
+async def test_finished_statuses_are_evicted_oldest_first(jobs, monkeypatch):
+    monkeypatch.setattr("app.tasks.settings.CALCULATION_FINISHED_JOBS_KEPT", 2)
+    await jobs.set_status("running", JOB_RUNNING)
+    for job_id in ("job-1", "job-2", "job-3"):
+        await jobs.set_status(job_id, JOB_PENDING)
+        await jobs.set_status(job_id, JOB_COMPLETED, result=1.0)
+
+    assert await jobs.get_status("job-1") is None
+    assert (await jobs.get_status("job-3"))["status"] == JOB_COMPLETED
+    assert (await jobs.get_status("running"))["status"] == JOB_RUNNING
+    assert list(jobs._statuses) == ["running"]
+
+
+class QueueRedis:
+    """Just enough of Redis lists, keys and the requeue script for the consumer and reaper."""
+
+    def __init__(self):
+        self.lists = {QUEUE_KEY: [], PROCESSING_KEY: []}
+        self.values = {}
+
+    async def lpush(self, key, value):
+        self.lists[key].insert(0, value)
+
+    async def blmove(self, source, destination, timeout, src, dest):
+        assert (src, dest) == ("RIGHT", "LEFT")
+        if not self.lists[source]:
+            await asyncio.sleep(0.01)
+            return None
+        item = self.lists[source].pop()
+        self.lists[destination].insert(0, item)
+        return item
+
+    async def lrange(self, key, start, end):
+        return list(self.lists[key])
+
+    async def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def eval(self, script, numkeys, processing, queue, lease, item):
+        if lease in self.values or item not in self.lists[processing]:
+            return 0
+        self.lists[processing].remove(item)
+        self.lists[queue].append(item)
+        return 1
+
+    def pipeline(self, transaction=True):
+        return QueuePipeline(self)
+
+
+class QueuePipeline:
+    def __init__(self, parent):
+        self.parent = parent
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def lrem(self, key, count, value):
+        self.commands.append(lambda: self.parent.lists[key].remove(value))
+
+    def delete(self, key):
+        self.commands.append(lambda: self.parent.values.pop(key, None))
+
+    async def execute(self):
+        for command in self.commands:
+            command()
+
+
+def queued_job(job_id):
+    return json.dumps({"job_id": job_id, "type": "addition", "inputs": [1, 2], "user_id": None})
+
+
+@pytest.mark.asyncio
+async def test_consumer_runs_jobs_concurrently_up_to_max_workers():
+    fake_redis = QueueRedis()
+    for job_id in ("job-1", "job-2", "job-3"):
+        await fake_redis.lpush(QUEUE_KEY, queued_job(job_id))
+    queue = CalculationJobQueue(max_workers=2, backend="redis")
+    release = asyncio.Event()
+    started, in_flight, peak = [], 0, 0
+
+    async def fake_run(job_id, calculation_type, inputs, bind, user_id=None):
+        nonlocal in_flight, peak
+        started.append(job_id)
+        in_flight += 1
+        peak = max(peak, in_flight)
+        # Each job holds a lease and sits in the processing list while it runs
+        assert fake_redis.values[lease_key(job_id)] == "1"
+        assert queued_job(job_id) in fake_redis.lists[PROCESSING_KEY]
+        await release.wait()
+        in_flight -= 1
+
+    with patch("app.tasks.get_redis", new=AsyncMock(return_value=fake_redis)), \
+         patch.object(queue, "run", side_effect=fake_run):
+        consumer = asyncio.create_task(queue.consume(bind=None))
+        await asyncio.sleep(0.05)
+        assert started == ["job-1", "job-2"]  # the third job waits on the queue for a slot
+        assert fake_redis.lists[QUEUE_KEY] == [queued_job("job-3")]
+
+        release.set()
+        await asyncio.sleep(0.05)
+        consumer.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await consumer
+
+    assert started == ["job-1", "job-2", "job-3"]
+    assert peak == 2
+    assert fake_redis.lists == {QUEUE_KEY: [], PROCESSING_KEY: []}
+    assert fake_redis.values == {}
+
+
+@pytest.mark.asyncio
+async def test_reaper_requeues_jobs_whose_lease_expired():
+    fake_redis = QueueRedis()
+    fake_redis.lists[PROCESSING_KEY] = [queued_job("stalled"), queued_job("running")]
+    fake_redis.values[lease_key("running")] = "1"
+    queue = CalculationJobQueue(max_workers=1, backend="redis")
+
+    with patch("app.tasks.get_redis", new=AsyncMock(return_value=fake_redis)):
+        # The first sweep only notes the job without a lease
+        assert await queue.reap() == 0
+        # A requeue that loses a race keeps the job tracked for the next sweep
+        with patch.object(fake_redis, "eval", new=AsyncMock(return_value=0)):
+            assert await queue.reap() == 0
+        assert await queue.reap() == 1
+
+    assert fake_redis.lists[PROCESSING_KEY] == [queued_job("running")]
+    assert fake_redis.lists[QUEUE_KEY] == [queued_job("stalled")]
@@ -0,0 +1,112 @@
+# tests/integration/test_dashboard_render.py
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.auth.jwt import create_token
+from app.fragments import FragmentCache, format_number, row_fragments
+from app.main import app
+from app.models.calculation import Calculation
+from app.schemas.token import TokenType
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def app_db(app_db):
+    """The shared app_db, with an empty fragment cache and no cookies left behind."""
+    row_fragments.clear()
+    yield app_db
+    client.cookies.clear()
+
+
+def seed(SessionLocal, user_id, count):
+    start = datetime(2024, 1, 1)
+    with SessionLocal() as db:
+        db.execute(insert(Calculation), [
+            {
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "type": "addition",
+                "inputs": [float(i), 1.0],
+                "result": float(i + 1),
+                "created_at": start + timedelta(minutes=i),
+                "updated_at": start + timedelta(minutes=i),
+            }
+            for i in range(count)
+        ])
+        db.commit()
+
+
+def test_format_number_matches_client_rendering():
+    assert format_number(6.0) == "6"
+    assert format_number(2.5) == "2.5"
+    assert format_number(None) == "…"
+
+
+def test_fragment_cache_evicts_least_recently_used():
+    cache = FragmentCache(max_entries=2)
+    cache.get_or_render("a", lambda: "A")
+    cache.get_or_render("b", lambda: "B")
+    cache.get_or_render("a", lambda: "stale")
+    cache.get_or_render("c", lambda: "C")
+
+    assert cache.get_or_render("a", lambda: "new") == "A"
+    assert cache.get_or_render("b", lambda: "B2") == "B2"
+    assert cache.hits == 2
+
+
+def test_client_mode_is_the_default(app_db):
+    response = client.get("/dashboard")
+    assert response.status_code == 200
+    assert 'id="loadingRow"' in response.text
+    assert 'id="initialCalculations"' not in response.text
+
+
+def test_server_mode_without_cookie_falls_back_to_client(app_db):
+    response = client.get("/dashboard?render=server")
+    assert response.status_code == 200
+    assert 'id="loadingRow"' in response.text
+
+
+def test_server_mode_renders_first_page_newest_first(app_db):
+    user_id = uuid.uuid4()
+    seed(app_db, user_id, 5)
+    client.cookies.set("access_token", create_token(user_id, TokenType.ACCESS))
+
+    with patch("app.main.settings.DASHBOARD_PAGE_SIZE", 2):
+        first = client.get("/dashboard?render=server")
+        last = client.get("/dashboard?render=server&page=3")
+
+    assert first.status_code == 200
+    assert 'id="loadingRow"' not in first.text
+    assert first.text.count('<tr class="hover:bg-gray-50') == 2
+    # Newest rows are 4 + 1 and 3 + 1
+    assert first.text.index("4, 1") < first.text.index("3, 1")
+    assert "page=2" in first.text and "Older" in first.text
+
+    assert last.text.count('<tr class="hover:bg-gray-50') == 1
+    assert "0, 1" in last.text
+    assert "Older" not in last.text
+
+
+def test_row_fragments_are_reused_until_updated(app_db):
+    user_id = uuid.uuid4()
+    seed(app_db, user_id, 3)
+    client.cookies.set("access_token", create_token(user_id, TokenType.ACCESS))
+
+    client.get("/dashboard?render=server")
+    assert (row_fragments.hits, row_fragments.misses) == (0, 3)
+    client.get("/dashboard?render=server")
+    assert (row_fragments.hits, row_fragments.misses) == (3, 3)
+
+    with app_db() as db:
+        calc = db.query(Calculation).first()
+        calc.updated_at = datetime.utcnow()
+        db.commit()
+    client.get("/dashboard?render=server")
+    assert (row_fragments.hits, row_fragments.misses) == (5, 4)
@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 from fastapi import HTTPException, status
 from app.auth.dependencies import get_current_user, get_current_active_user
 from app.schemas.user import UserResponse
@@ -9,6 +9,7 @@ from datetime import datetime, timezone
 
 # Sample user data dictionaries for testing
 sample_user_data = {
+    "type": "access",
     "id": uuid4(),
     "username": "testuser",
     "email": "test@example.com",
@@ -21,6 +22,7 @@ sample_user_data = {
 }
 
 inactive_user_data = {
+    "type": "access",
     "id": uuid4(),
     "username": "inactiveuser",
     "email": "inactive@example.com",
@@ -34,15 +36,22 @@ inactive_user_data = {
 
 # Fixture for mocking token verification
 @pytest.fixture
-def mock_verify_token():
-    with patch.object(User, 'verify_token') as mock:
+def mock_verify_token(revocation_check):
+    with patch.object(User, 'verify_token_payload') as mock:
+        yield mock
+
+# Fixture for mocking the blacklist / token generation check
+@pytest.fixture
+def revocation_check():
+    with patch("app.auth.dependencies.check_token_revocation", new_callable=AsyncMock) as mock:
         yield mock
 
 # Test get_current_user with valid token and complete payload
-def test_get_current_user_valid_token_existing_user(mock_verify_token):
+@pytest.mark.asyncio
+async def test_get_current_user_valid_token_existing_user(mock_verify_token):
     mock_verify_token.return_value = sample_user_data
 
-    user_response = get_current_user(token="validtoken")
+    user_response = await get_current_user(token="validtoken")
 
     assert isinstance(user_response, UserResponse)
     assert user_response.id == sample_user_data["id"]
@@ -58,11 +67,12 @@ def test_get_current_user_valid_token_existing_user(mock_verify_token):
     mock_verify_token.assert_called_once_with("validtoken")
 
 # Test get_current_user with invalid token (returns None)
-def test_get_current_user_invalid_token(mock_verify_token):
+@pytest.mark.asyncio
+async def test_get_current_user_invalid_token(mock_verify_token):
     mock_verify_token.return_value = None
 
     with pytest.raises(HTTPException) as exc_info:
-        get_current_user(token="invalidtoken")
+        await get_current_user(token="invalidtoken")
 
     assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
     assert exc_info.value.detail == "Could not validate credentials"
@@ -70,12 +80,13 @@ def test_get_current_user_invalid_token(mock_verify_token):
     mock_verify_token.assert_called_once_with("invalidtoken")
 
 # Test get_current_user with valid token but incomplete payload (simulate missing fields)
-def test_get_current_user_valid_token_incomplete_payload(mock_verify_token):
+@pytest.mark.asyncio
+async def test_get_current_user_valid_token_incomplete_payload(mock_verify_token):
     # Return an empty dict simulating missing required fields
-    mock_verify_token.return_value = {}
+    mock_verify_token.return_value = {"type": "access"}
 
     with pytest.raises(HTTPException) as exc_info:
-        get_current_user(token="validtoken")
+        await get_current_user(token="validtoken")
 
     assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
     assert exc_info.value.detail == "Could not validate credentials"
@@ -83,23 +94,50 @@ def test_get_current_user_valid_token_incomplete_payload(mock_verify_token):
     mock_verify_token.assert_called_once_with("validtoken")
 
 # Test get_current_active_user with an active user
-def test_get_current_active_user_active(mock_verify_token):
+@pytest.mark.asyncio
+async def test_get_current_active_user_active(mock_verify_token):
     mock_verify_token.return_value = sample_user_data
 
-    current_user = get_current_user(token="validtoken")
+    current_user = await get_current_user(token="validtoken")
     active_user = get_current_active_user(current_user=current_user)
 
     assert isinstance(active_user, UserResponse)
     assert active_user.is_active is True
 
 # Test get_current_active_user with an inactive user
-def test_get_current_active_user_inactive(mock_verify_token):
+@pytest.mark.asyncio
+async def test_get_current_active_user_inactive(mock_verify_token):
     mock_verify_token.return_value = inactive_user_data
 
-    current_user = get_current_user(token="validtoken")
+    current_user = await get_current_user(token="validtoken")
 
     with pytest.raises(HTTPException) as exc_info:
         get_current_active_user(current_user=current_user)
 
     assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
     assert exc_info.value.detail == "Inactive user"
+
+# A refresh token's claims are never accepted as an access token
+@pytest.mark.asyncio
+async def test_get_current_user_rejects_refresh_payload(mock_verify_token):
+    mock_verify_token.return_value = {"type": "refresh", "sub": str(uuid4())}
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_current_user(token="refreshtoken")
+
+    assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+# A revoked token is rejected after its claims are verified
+@pytest.mark.asyncio
+async def test_get_current_user_rejects_revoked_token(mock_verify_token, revocation_check):
+    mock_verify_token.return_value = sample_user_data
+    revocation_check.side_effect = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked"
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_current_user(token="revokedtoken")
+
+    assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+    assert exc_info.value.detail == "Token has been revoked"
+    revocation_check.assert_awaited_once_with(sample_user_data)
@@ -0,0 +1,187 @@
+# tests/integration/test_encodings.py
+import math
+import struct
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.encodings import (
+    CALCULATION_ID_HEADER,
+    CALCULATION_TYPE_HEADER,
+    MEDIA_FLOAT64,
+    MEDIA_JSON,
+    MEDIA_MSGPACK,
+    float64_view,
+    pack_float64,
+)
+from app.main import app
+
+client = TestClient(app)
+
+
+def float64_body(*values):
+    return struct.pack(f"<{len(values)}d", *values)
+
+
+def post_float64(headers, calculation_type, *values, **extra):
+    return client.post(
+        "/calculations",
+        content=float64_body(*values),
+        headers={**headers, "Content-Type": MEDIA_FLOAT64, CALCULATION_TYPE_HEADER: calculation_type, **extra},
+    )
+
+
+def test_float64_view_does_not_copy():
+    body = float64_body(1.5, -2.0, 1e300)
+    view = float64_view(body)
+    assert view.obj is body
+    assert view.tolist() == [1.5, -2.0, 1e300]
+    assert pack_float64([1.5, -2.0, 1e300]) == body
+
+
+def test_create_from_float64_body(app_db, auth):
+    response = post_float64(auth, "Multiplication", 1.5, 4.0, 2.0)
+    assert response.status_code == 201
+    assert response.json()["type"] == "multiplication"
+    assert response.json()["inputs"] == [1.5, 4.0, 2.0]
+    assert response.json()["result"] == 12.0
+
+
+def test_float64_response(app_db, auth):
+    response = post_float64(auth, "division", 1.0, 8.0, Accept=MEDIA_FLOAT64)
+    assert response.status_code == 201
+    assert response.headers["content-type"] == MEDIA_FLOAT64
+    assert struct.unpack("<d", response.content) == (0.125,)
+    assert response.headers[CALCULATION_TYPE_HEADER] == "division"
+
+    calc_id = response.headers[CALCULATION_ID_HEADER]
+    fetched = client.get(f"/calculations/{calc_id}", headers={**auth, "Accept": MEDIA_FLOAT64})
+    assert struct.unpack("<d", fetched.content) == (0.125,)
+
+
+def test_update_from_float64_body(app_db, auth):
+    calc_id = post_float64(auth, "addition", 1.0, 2.0).json()["id"]
+    response = client.put(
+        f"/calculations/{calc_id}",
+        content=float64_body(10.0, 20.0, 30.0),
+        headers={**auth, "Content-Type": MEDIA_FLOAT64},
+    )
+    assert response.status_code == 200
+    assert response.json()["result"] == 60.0
+
+
+@pytest.mark.parametrize("body, calculation_type, message", [
+    (b"\x00" * 12, "addition", "8-byte"),
+    (float64_body(1.0, math.inf), "addition", "finite"),
+    (float64_body(1.0, 0.0), "division", "divide by zero"),
+    (float64_body(4.0), "addition", "at least two"),
+    (float64_body(1.0, 2.0), "cube_root", "X-Calculation-Type"),
+])
+def test_invalid_float64_bodies_are_rejected(app_db, auth, body, calculation_type, message):
+    response = client.post(
+        "/calculations",
+        content=body,
+        headers={**auth, "Content-Type": MEDIA_FLOAT64, CALCULATION_TYPE_HEADER: calculation_type},
+    )
+    assert response.status_code == 422
+    assert message in response.json()["detail"][0]["msg"]
+
+
+def test_json_is_still_the_default(app_db, auth):
+    response = client.post("/calculations", json={"type": "addition", "inputs": [1, 2]}, headers=auth)
+    assert response.status_code == 201
+    assert response.json()["result"] == 3
+
+    invalid = client.post("/calculations", json={"type": "division", "inputs": [1, 0]}, headers=auth)
+    assert invalid.status_code == 422
+    assert invalid.json()["detail"][0]["loc"][0] == "body"
+
+
+def test_unsupported_content_type(app_db, auth):
+    response = client.post(
+        "/calculations", content=b"1,2", headers={**auth, "Content-Type": "text/csv"}
+    )
+    assert response.status_code == 415
+
+
+def test_msgpack_is_not_acceptable_without_the_package(app_db, auth):
+    with patch("app.encodings.get_msgpack", return_value=None):
+        rejected = client.post(
+            "/calculations", content=b"\x80", headers={**auth, "Content-Type": MEDIA_MSGPACK}
+        )
+        not_acceptable = client.post(
+            "/calculations",
+            json={"type": "addition", "inputs": [1, 2]},
+            headers={**auth, "Accept": MEDIA_MSGPACK},
+        )
+        preferred = client.post(
+            "/calculations",
+            json={"type": "addition", "inputs": [1, 2]},
+            headers={**auth, "Accept": f"{MEDIA_MSGPACK}, {MEDIA_JSON};q=0.5"},
+        )
+    assert rejected.status_code == 415
+    assert not_acceptable.status_code == 406
+    assert preferred.headers["content-type"] == MEDIA_JSON
+
+
+def test_unacceptable_encodings_get_406_before_anything_is_written(app_db, auth):
+    response = client.post(
+        "/calculations", json={"type": "addition", "inputs": [1, 2]}, headers={**auth, "Accept": "text/csv"}
+    )
+    assert response.status_code == 406
+    assert client.get("/calculations", headers=auth).json() == []
+
+    assert client.get("/calculations", headers={**auth, "Accept": "*/*"}).status_code == 200
+
+
+def test_lists_have_no_float64_encoding(app_db, auth):
+    post_float64(auth, "addition", 1.0, 2.0)
+    response = client.get("/calculations", headers={**auth, "Accept": MEDIA_FLOAT64})
+    assert response.status_code == 406
+    assert MEDIA_JSON in response.json()["detail"]
+
+
+def test_append_response_follows_accept(app_db, auth):
+    calc_id = post_float64(auth, "addition", 1.0, 2.0).json()["id"]
+    response = client.patch(
+        f"/calculations/{calc_id}/inputs:append",
+        content=float64_body(3.0, 4.0),
+        headers={**auth, "Content-Type": MEDIA_FLOAT64, "Accept": MEDIA_FLOAT64},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == MEDIA_FLOAT64
+    assert struct.unpack("<d", response.content) == (10.0,)
+    assert response.headers[CALCULATION_ID_HEADER] == calc_id
+
+    rejected = client.patch(
+        f"/calculations/{calc_id}/inputs:append", json={"inputs": [1]}, headers={**auth, "Accept": "text/csv"}
+    )
+    assert rejected.status_code == 406
+
+
+def test_msgpack_round_trip(app_db, auth):
+    msgpack = pytest.importorskip("msgpack")
+    headers = {**auth, "Content-Type": MEDIA_MSGPACK, "Accept": MEDIA_MSGPACK}
+
+    response = client.post(
+        "/calculations", content=msgpack.packb({"type": "subtraction", "inputs": [10.0, 2.5]}), headers=headers
+    )
+    assert response.status_code == 201
+    assert response.headers["content-type"] == MEDIA_MSGPACK
+    assert msgpack.unpackb(response.content)["result"] == 7.5
+
+    listed = client.get("/calculations", headers={**auth, "Accept": MEDIA_MSGPACK})
+    assert [row["result"] for row in msgpack.unpackb(listed.content)] == [7.5]
+
+
+def test_accept_quality_values_are_honoured(app_db, auth):
+    response = post_float64(auth, "addition", 1.0, 2.0, Accept=f"{MEDIA_JSON};q=0.5, {MEDIA_FLOAT64}")
+    assert response.headers["content-type"] == MEDIA_FLOAT64
+    response = post_float64(auth, "addition", 1.0, 2.0, Accept=f"{MEDIA_JSON}, {MEDIA_FLOAT64};q=0.5")
+    assert response.headers["content-type"] == MEDIA_JSON
+
+
+def test_openapi_lists_every_encoding():
+    body = client.get("/openapi.json").json()["paths"]["/calculations"]["post"]["requestBody"]
+    assert set(body["content"]) == {MEDIA_JSON, MEDIA_MSGPACK, MEDIA_FLOAT64}
@@ -0,0 +1,117 @@
+# tests/integration/test_health.py
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from app.health import STATUS_DEGRADED, STATUS_FAIL, STATUS_OK, HealthChecker, pool_status
+from app.main import app, health_checker
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def redis_up():
+    fake_redis = AsyncMock()
+    with patch("app.health.get_redis", new=AsyncMock(return_value=fake_redis)):
+        yield fake_redis
+
+
+@pytest.fixture
+def redis_down():
+    with patch("app.health.get_redis", new=AsyncMock(side_effect=RedisConnectionError("down"))):
+        yield
+
+
+def test_pool_status_reports_saturation(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=1, max_overflow=1
+    )
+    first = engine.connect()
+    assert pool_status(engine)["saturation"] == 0.5
+    second = engine.connect()
+    status = pool_status(engine)
+    assert (status["status"], status["checked_out"], status["capacity"]) == (STATUS_FAIL, 2, 2)
+    first.close()
+    second.close()
+    engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_probe_reports_each_dependency(empty_engine, redis_up):
+    report = await HealthChecker(empty_engine, ttl=10).probe()
+
+    assert report["status"] == STATUS_OK
+    assert report["checks"]["database"]["status"] == STATUS_OK
+    assert report["checks"]["redis"]["status"] == STATUS_OK
+    redis_up.ping.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_redis_failure_degrades_the_check(empty_engine, redis_down):
+    report = await HealthChecker(empty_engine, ttl=10).probe()
+
+    assert report["status"] == STATUS_DEGRADED
+    assert report["checks"]["redis"] == {"status": STATUS_FAIL, "error": "ConnectionError"}
+    assert report["checks"]["database"]["status"] == STATUS_OK
+
+
+@pytest.mark.asyncio
+async def test_database_failure_fails_the_check(redis_up):
+    engine = create_engine("sqlite:////nonexistent-dir/health.db")
+    report = await HealthChecker(engine, ttl=10).probe()
+
+    assert report["status"] == STATUS_FAIL
+    assert report["checks"]["database"]["status"] == STATUS_FAIL
+
+
+@pytest.mark.asyncio
+async def test_reports_are_cached_for_ttl(empty_engine, redis_up):
+    checker = HealthChecker(empty_engine, ttl=60)
+    first = await checker.report()
+    second = await checker.report()
+    assert first is second
+    assert redis_up.ping.await_count == 1
+
+    checker.reset()
+    await checker.report()
+    assert redis_up.ping.await_count == 2
+
+
+def test_shallow_health_does_not_probe(redis_down):
+    response = client.get("/health")
+    assert response.json() == {"status": "ok"}
+
+
+def test_deep_health_stays_up_when_redis_is_down(empty_engine, redis_down):
+    health_checker.reset()
+    with patch.object(health_checker, "engine", empty_engine):
+        response = client.get("/health?deep=true")
+    health_checker.reset()
+
+    assert response.status_code == 200
+    assert response.json()["status"] == STATUS_DEGRADED
+    assert response.json()["checks"]["redis"]["status"] == STATUS_FAIL
+
+
+def test_deep_health_returns_503_when_the_database_is_down(redis_up):
+    health_checker.reset()
+    with patch.object(health_checker, "engine", create_engine("sqlite:////nonexistent-dir/health.db")):
+        response = client.get("/health?deep=true")
+    health_checker.reset()
+
+    assert response.status_code == 503
+    assert response.json()["checks"]["database"]["status"] == STATUS_FAIL
+
+
+def test_deep_health_ok(empty_engine, redis_up):
+    health_checker.reset()
+    with patch.object(health_checker, "engine", empty_engine):
+        response = client.get("/health?deep=true")
+    health_checker.reset()
+
+    assert response.status_code == 200
+    assert set(response.json()["checks"]) == {"database", "redis", "pool"}
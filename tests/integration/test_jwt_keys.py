@@ -0,0 +1,153 @@
+# tests/integration/test_jwt_keys.py
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from app.auth import jwt as jwt_module
+from app.auth.keys import load_keyring
+from app.main import app
+from app.models.user import User
+from app.schemas.token import TokenType
+
+client = TestClient(app)
+
+
+def write_rsa_key(directory, kid, public_only=False):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    if public_only:
+        pem = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        (directory / f"{kid}.pub.pem").write_bytes(pem)
+    else:
+        pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        )
+        (directory / f"{kid}.pem").write_bytes(pem)
+    return private_key
+
+
+@pytest.fixture
+def rs256(tmp_path):
+    """Switch token signing to RS256 with two rotating keys."""
+    write_rsa_key(tmp_path, "2025-01")
+    write_rsa_key(tmp_path, "2025-02")
+    keyring = load_keyring(str(tmp_path), "RS256")
+    with patch.object(jwt_module.settings, "ALGORITHM", "RS256"), \
+         patch("app.core.config.settings.ALGORITHM", "RS256"), \
+         patch("app.auth.jwt.get_keyring", return_value=keyring), \
+         patch("app.main.get_keyring", return_value=keyring), \
+         patch("app.auth.jwt.is_blacklisted", new=AsyncMock(return_value=False)), \
+         patch("app.auth.jwt.get_token_generation", new=AsyncMock(return_value=0)):
+        yield keyring
+
+
+def test_newest_private_key_is_active(tmp_path):
+    write_rsa_key(tmp_path, "2025-01")
+    write_rsa_key(tmp_path, "2025-02")
+    write_rsa_key(tmp_path, "2024-12", public_only=True)
+
+    keyring = load_keyring(str(tmp_path), "RS256")
+
+    assert keyring.active_kid == "2025-02"
+    assert keyring.get("2024-12").private_key is None
+    assert set(keyring.keys) == {"2024-12", "2025-01", "2025-02"}
+
+
+def test_explicit_active_kid(tmp_path):
+    write_rsa_key(tmp_path, "a")
+    write_rsa_key(tmp_path, "b")
+    assert load_keyring(str(tmp_path), "RS256", active_kid="a").active_kid == "a"
+
+
+def test_keyring_requires_private_key(tmp_path):
+    write_rsa_key(tmp_path, "old", public_only=True)
+    with pytest.raises(ValueError):
+        load_keyring(str(tmp_path), "RS256")
+
+
+def test_keyring_rejects_symmetric_algorithm(tmp_path):
+    with pytest.raises(ValueError):
+        load_keyring(str(tmp_path), "HS256")
+
+
+@pytest.mark.asyncio
+async def test_rs256_round_trip_with_kid(rs256):
+    user_id = uuid4()
+    token = jwt_module.create_token(user_id, TokenType.ACCESS)
+
+    assert jwt.get_unverified_header(token)["kid"] == "2025-02"
+    payload = await jwt_module.decode_token(token, TokenType.ACCESS)
+    assert payload["sub"] == str(user_id)
+    assert User.verify_token(token) == user_id
+
+
+def test_refresh_token_is_not_a_bearer_token(rs256):
+    user_id = uuid4()
+    refresh_token = jwt_module.create_token(user_id, TokenType.REFRESH)
+    access_token = jwt_module.create_token(user_id, TokenType.ACCESS)
+
+    # Both are signed by the same key, so only the type claim tells them apart
+    assert User.verify_token(refresh_token) is None
+    response = client.get("/calculations", headers={"Authorization": f"Bearer {refresh_token}"})
+    assert response.status_code == 401
+    response = client.get("/calculations", headers={"Authorization": f"Bearer {access_token}"})
+    assert response.status_code != 401
+
+
+@pytest.mark.asyncio
+async def test_tokens_from_rotated_out_key_still_verify(rs256):
+    old_key = rs256.get("2025-01")
+    token = jwt.encode(
+        {"sub": "abc", "type": "access", "jti": "x", "iat": 1, "exp": 4_000_000_000},
+        old_key.private_key,
+        algorithm="RS256",
+        headers={"kid": "2025-01"}
+    )
+    payload = await jwt_module.decode_token(token, TokenType.ACCESS)
+    assert payload["sub"] == "abc"
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_is_rejected(rs256, tmp_path):
+    stranger = write_rsa_key(tmp_path, "stranger")
+    pem = stranger.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    )
+    token = jwt.encode(
+        {"sub": "abc", "type": "access", "jti": "x", "iat": 1, "exp": 4_000_000_000},
+        pem.decode(),
+        algorithm="RS256",
+        headers={"kid": "stranger"}
+    )
+    with pytest.raises(HTTPException) as exc_info:
+        await jwt_module.decode_token(token, TokenType.ACCESS)
+    assert exc_info.value.status_code == 401
+
+
+def test_jwks_endpoint_publishes_public_keys(rs256):
+    response = client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    keys = response.json()["keys"]
+    assert {key["kid"] for key in keys} == {"2025-01", "2025-02"}
+    for key in keys:
+        assert key["kty"] == "RSA"
+        assert key["alg"] == "RS256"
+        assert "d" not in key  # no private material
+
+
+def test_jwks_endpoint_is_empty_for_hs256():
+    response = client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert response.json() == {"keys": []}
@@ -0,0 +1,131 @@
+# tests/integration/test_last_login.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.auth.last_login import LastLoginBuffer
+from app.models.user import User
+
+T0 = datetime(2026, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def users(memory_engine):
+    db = sessionmaker(bind=memory_engine)()
+    created = [
+        User(first_name="Ada", last_name="L", email=f"user{i}@example.com",
+             username=f"user{i}", password="x")
+        for i in range(3)
+    ]
+    db.add_all(created)
+    db.commit()
+    yield db, created
+    db.close()
+
+
+def stored_logins(engine):
+    with engine.connect() as conn:
+        return {
+            user_id: None if at is None else at.replace(tzinfo=timezone.utc)
+            for user_id, at in conn.execute(select(User.id, User.last_login))
+        }
+
+
+def test_writes_through_when_not_running(memory_engine, users):
+    db, (user, *_) = users
+    buffer = LastLoginBuffer(flush_seconds=5, max_pending=100)
+    buffer.record(db, user, T0)
+    db.commit()
+    assert stored_logins(memory_engine)[user.id] == T0
+
+
+@pytest.mark.asyncio
+async def test_logins_are_batched_until_flush(memory_engine, users):
+    db, (first, second, third) = users
+    buffer = LastLoginBuffer(flush_seconds=60, max_pending=100)
+    buffer.start(memory_engine)
+
+    buffer.record(db, first, T0)
+    buffer.record(db, first, T0 + timedelta(seconds=5))
+    buffer.record(db, first, T0 + timedelta(seconds=1))  # out of order: the latest wins
+    buffer.record(db, second, T0)
+    assert set(stored_logins(memory_engine).values()) == {None}
+
+    await buffer.stop()
+    assert stored_logins(memory_engine) == {
+        first.id: T0 + timedelta(seconds=5), second.id: T0, third.id: None,
+    }
+    assert not buffer.running
+
+
+@pytest.mark.asyncio
+async def test_staleness_is_bounded_by_the_flush_interval(memory_engine, users):
+    db, (user, *_) = users
+    buffer = LastLoginBuffer(flush_seconds=0.05, max_pending=100)
+    buffer.start(memory_engine)
+    try:
+        buffer.record(db, user, T0)
+        await asyncio.sleep(0.3)
+        assert stored_logins(memory_engine)[user.id] == T0
+    finally:
+        await buffer.stop()
+
+
+@pytest.mark.asyncio
+async def test_full_buffer_wakes_the_flusher(memory_engine, users):
+    db, (first, second, _) = users
+    buffer = LastLoginBuffer(flush_seconds=60, max_pending=2)
+    buffer.start(memory_engine)
+    try:
+        await asyncio.to_thread(buffer.record, db, first, T0)
+        await asyncio.to_thread(buffer.record, db, second, T0)
+        # The login that filled the buffer did not write it itself
+        assert set(stored_logins(memory_engine).values()) == {None}
+
+        await asyncio.sleep(0.2)
+        assert stored_logins(memory_engine)[first.id] == T0
+        assert stored_logins(memory_engine)[second.id] == T0
+    finally:
+        await buffer.stop()
+
+
+def test_flush_is_one_statement_and_never_moves_backwards(memory_engine, users):
+    db, (first, second, third) = users
+    buffer = LastLoginBuffer(flush_seconds=60, max_pending=100)
+    buffer._bind = memory_engine  # buffering without the background flusher
+    buffer.record(db, first, T0 + timedelta(minutes=1))
+    buffer.flush()
+
+    statements = []
+    event.listen(memory_engine, "before_cursor_execute",
+                 lambda conn, cursor, sql, params, context, many: statements.append((sql, many)))
+    # A slower worker flushing an older login does not overwrite a newer one
+    buffer.record(db, first, T0)
+    buffer.record(db, second, T0)
+    buffer.record(db, third, T0 + timedelta(seconds=1))
+    assert buffer.flush() == 3
+
+    updates = [(sql, many) for sql, many in statements if sql.startswith("UPDATE")]
+    assert len(updates) == 1 and not updates[0][1]
+    assert stored_logins(memory_engine) == {
+        first.id: T0 + timedelta(minutes=1), second.id: T0, third.id: T0 + timedelta(seconds=1),
+    }
+
+
+def test_failed_flush_keeps_timestamps(memory_engine, users):
+    db, (user, *_) = users
+    buffer = LastLoginBuffer(flush_seconds=60, max_pending=100)
+    buffer._bind = memory_engine
+    buffer.record(db, user, T0)
+
+    with patch.object(memory_engine, "begin", side_effect=OperationalError("UPDATE", {}, Exception("down"))):
+        assert buffer.flush() == 0
+    assert stored_logins(memory_engine)[user.id] is None
+
+    assert buffer.flush() == 1
+    assert stored_logins(memory_engine)[user.id] == T0
@@ -0,0 +1,119 @@
+# tests/integration/test_list_projection.py
+import json
+import time
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.auth.jwt import create_token
+from app.main import app
+from app.models.calculation import Calculation
+from app.models.user import User
+from app.schemas.calculation import CalculationResponse, calculation_row_to_json
+from app.schemas.token import TokenType
+
+client = TestClient(app)
+
+
+def seed(SessionLocal, count: int) -> uuid.UUID:
+    """Bulk-insert `count` calculations of mixed types for one new user."""
+    user_id = uuid.uuid4()
+    types = ["addition", "subtraction", "multiplication", "division"]
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        db.add(User(
+            id=user_id, username=f"u{user_id.hex[:8]}", email=f"{user_id.hex[:8]}@example.com",
+            password="x", first_name="Bench", last_name="User"
+        ))
+        if count:
+            db.execute(insert(Calculation), [
+                {
+                    "id": uuid.uuid4(),
+                    "user_id": user_id,
+                    "type": types[i % len(types)],
+                    "inputs": [float(i + 1), 2.0, 3.0],
+                    "result": float(i),
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in range(count)
+            ])
+        db.commit()
+    return user_id
+
+
+def orm_path(db, user_id) -> bytes:
+    """The previous implementation: full entities, validated through the response model."""
+    calculations = db.query(Calculation).filter(Calculation.user_id == user_id).all()
+    return json.dumps(jsonable_encoder(
+        [CalculationResponse.model_validate(c) for c in calculations]
+    )).encode()
+
+
+def projected_path(db, user_id) -> bytes:
+    rows = Calculation.list_rows(db, user_id)
+    return json.dumps([calculation_row_to_json(row) for row in rows]).encode()
+
+
+def test_list_rows_are_plain_tuples(app_db):
+    user_id = seed(app_db, 5)
+    with app_db() as db:
+        rows = Calculation.list_rows(db, user_id)
+        assert len(rows) == 5
+        assert not isinstance(rows[0], Calculation)
+        assert len(db.identity_map) == 0
+        assert {row.type for row in rows} == {"addition", "subtraction", "multiplication", "division"}
+
+
+def test_list_endpoint_matches_orm_serialization(app_db):
+    user_id = seed(app_db, 12)
+
+    headers = {"Authorization": f"Bearer {create_token(user_id, TokenType.ACCESS)}"}
+    response = client.get("/calculations", headers=headers)
+
+    assert response.status_code == 200
+    with app_db() as db:
+        expected = json.loads(orm_path(db, user_id))
+    assert response.json() == expected
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("count", [1_000, 10_000, 100_000])
+def test_benchmark_projection_vs_orm(app_db, count):
+    user_id = seed(app_db, count)
+
+    timings = {}
+    for name, path in (("orm", orm_path), ("projected", projected_path)):
+        with app_db() as db:
+            start = time.perf_counter()
+            path(db, user_id)
+            timings[name] = time.perf_counter() - start
+
+    print(
+        f"\n{count:>7} rows: ORM {timings['orm'] * 1000:8.1f} ms, "
+        f"projected {timings['projected'] * 1000:8.1f} ms, "
+        f"speedup {timings['orm'] / timings['projected']:.1f}x"
+    )
+    assert timings["projected"] < timings["orm"]
+
+
+def test_new_rows_get_time_ordered_ids(app_db):
+    user_id = seed(app_db, 0)
+    with app_db() as db:
+        for inputs in ([1, 2], [3, 4], [5, 6]):
+            db.add(Calculation.create("addition", user_id, inputs))
+            db.commit()
+        rows = Calculation.list_rows(db, user_id, limit=10)
+        # Existing uuid4 rows stay valid alongside the new ones
+        legacy = Calculation.create("addition", user_id, [7, 8])
+        legacy.id = uuid.uuid4()
+        db.add(legacy)
+        db.commit()
+        assert len(Calculation.list_rows(db, user_id)) == 4
+
+    assert all(row.id.version == 7 for row in rows)
+    assert [row.id for row in rows] == sorted((row.id for row in rows), reverse=True)
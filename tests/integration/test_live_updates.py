@@ -0,0 +1,209 @@
+# tests/integration/test_live_updates.py
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.auth.jwt import create_token
+from app.events import (
+    CHANNEL_PREFIX,
+    EVENT_CREATED,
+    EVENT_DELETED,
+    EVENT_RESYNC,
+    EVENT_UPDATED,
+    CalculationEventBroker,
+    calculation_events,
+    event_stream,
+    format_event,
+)
+from app.main import app, stream_calculation_events
+from app.schemas.token import TokenType
+
+client = TestClient(app)
+
+
+class FakeRequest:
+    def __init__(self, disconnect_after: int):
+        self.checks = 0
+        self.disconnect_after = disconnect_after
+
+    async def is_disconnected(self):
+        self.checks += 1
+        return self.checks > self.disconnect_after
+
+
+def test_format_event():
+    assert format_event("deleted", {"id": "abc"}) == 'event: deleted\ndata: {"id": "abc"}\n\n'
+
+
+@pytest.mark.asyncio
+async def test_publish_delivers_only_to_that_users_streams():
+    broker = CalculationEventBroker()
+    alice = broker.subscribe("alice")
+    bob = broker.subscribe("bob")
+
+    await broker.publish("alice", EVENT_CREATED, {"id": "1"})
+
+    assert alice.get_nowait() == (EVENT_CREATED, {"id": "1"})
+    assert bob.empty()
+
+    broker.unsubscribe("alice", alice)
+    broker.unsubscribe("bob", bob)
+    assert broker._subscribers == {}
+
+
+@pytest.mark.asyncio
+async def test_publish_goes_through_redis_while_listening():
+    broker = CalculationEventBroker()
+    broker._listening = True
+    queue = broker.subscribe("alice")
+    fake_redis = AsyncMock()
+
+    with patch("app.events.get_redis", new=AsyncMock(return_value=fake_redis)):
+        await broker.publish("alice", EVENT_DELETED, {"id": "1"})
+
+    channel, payload = fake_redis.publish.await_args.args
+    assert channel == f"{CHANNEL_PREFIX}alice"
+    assert json.loads(payload) == {"origin": broker.origin, "event": EVENT_DELETED, "data": {"id": "1"}}
+    # Local streams get the delta directly, and skip it when it comes back from Redis
+    assert queue.get_nowait() == (EVENT_DELETED, {"id": "1"})
+    broker.dispatch({"type": "message", "channel": channel.encode(), "data": payload})
+    assert queue.empty()
+
+    # Deltas published by other workers are relayed
+    other = json.dumps({"origin": "other-worker", "event": EVENT_CREATED, "data": {"id": "2"}})
+    broker.dispatch({"type": "message", "channel": channel.encode(), "data": other})
+    assert queue.get_nowait() == (EVENT_CREATED, {"id": "2"})
+
+
+class FakePubSub:
+    def __init__(self, messages=()):
+        self.channels = set()
+        self.messages = list(messages)
+
+    async def subscribe(self, *channels):
+        self.channels.update(channels)
+
+    async def unsubscribe(self, *channels):
+        self.channels.difference_update(channels)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        if self.messages:
+            return self.messages.pop(0)
+        await asyncio.sleep(timeout)
+        return None
+
+    async def aclose(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_worker_subscribes_only_to_its_streaming_users():
+    broker = CalculationEventBroker()
+    pubsub = FakePubSub()
+    alice = broker.subscribe("alice")
+    broker.subscribe("bob")
+
+    await broker.sync_channels(pubsub)
+    assert pubsub.channels == {f"{CHANNEL_PREFIX}alice", f"{CHANNEL_PREFIX}bob"}
+
+    broker.unsubscribe("alice", alice)
+    await broker.sync_channels(pubsub)
+    assert pubsub.channels == {f"{CHANNEL_PREFIX}bob"}
+
+
+@pytest.mark.asyncio
+async def test_listener_relays_other_workers_deltas():
+    broker = CalculationEventBroker()
+    queue = broker.subscribe("alice")
+    pubsub = FakePubSub([{
+        "type": "message",
+        "channel": f"{CHANNEL_PREFIX}alice",
+        "data": json.dumps({"origin": "other-worker", "event": EVENT_UPDATED, "data": {"id": "1"}}),
+    }])
+    fake_redis = AsyncMock()
+    fake_redis.pubsub = lambda: pubsub
+
+    with patch("app.events.get_redis", new=AsyncMock(return_value=fake_redis)):
+        listener = asyncio.create_task(broker.listen())
+        assert await asyncio.wait_for(queue.get(), timeout=1) == (EVENT_UPDATED, {"id": "1"})
+        assert broker._listening
+        assert pubsub.channels == {f"{CHANNEL_PREFIX}alice"}
+        listener.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await listener
+    assert not broker._listening
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_told_to_resync():
+    broker = CalculationEventBroker(queue_size=2)
+    queue = broker.subscribe("alice")
+    for i in range(3):
+        broker.deliver("alice", EVENT_UPDATED, {"id": str(i)})
+
+    assert queue.get_nowait() == (EVENT_RESYNC, None)
+    assert queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_event_stream_yields_events_and_unsubscribes():
+    with patch("app.events.settings.SSE_KEEPALIVE_SECONDS", 0.01):
+        stream = event_stream(FakeRequest(disconnect_after=1), "carol")
+        chunks = [await stream.__anext__()]
+        calculation_events.deliver("carol", EVENT_CREATED, {"id": "1"})
+        chunks += [chunk async for chunk in stream]
+
+    assert chunks[0].startswith("retry:")
+    assert chunks[1] == format_event(EVENT_CREATED, {"id": "1"})
+    assert chunks[2:] == [": keep-alive\n\n"]
+    assert "carol" not in calculation_events._subscribers
+
+
+def test_events_endpoint_requires_the_access_token_cookie():
+    token = create_token(uuid4(), TokenType.ACCESS)
+    assert client.get("/calculations/events").status_code == 401
+    # A token in the query string is not accepted: it would end up in logs
+    assert client.get(f"/calculations/events?token={token}").status_code == 401
+    assert client.get("/calculations/events", cookies={"access_token": "garbage"}).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_events_endpoint_authenticates_from_cookie():
+    user_id = uuid4()
+    request = SimpleNamespace(cookies={"access_token": create_token(user_id, TokenType.ACCESS)})
+
+    with patch("app.auth.dependencies.check_token_revocation", new=AsyncMock()):
+        response = await stream_calculation_events(request)
+    assert response.media_type == "text/event-stream"
+
+    with pytest.raises(HTTPException) as exc_info:
+        await stream_calculation_events(SimpleNamespace(cookies={}))
+    assert exc_info.value.status_code == 401
+
+
+def test_routes_publish_deltas(app_db):
+    user_id = uuid4()
+    headers = {"Authorization": f"Bearer {create_token(user_id, TokenType.ACCESS)}"}
+
+    with patch.object(calculation_events, "publish", new=AsyncMock()) as publish:
+        calc = client.post(
+            "/calculations", json={"type": "addition", "inputs": [1, 2]}, headers=headers
+        ).json()
+        client.put(f"/calculations/{calc['id']}", json={"inputs": [3, 4]}, headers=headers)
+        client.delete(f"/calculations/{calc['id']}", headers=headers)
+
+    events = [c.args for c in publish.await_args_list]
+    assert [(str(uid), event) for uid, event, _ in events] == [
+        (str(user_id), EVENT_CREATED),
+        (str(user_id), EVENT_UPDATED),
+        (str(user_id), EVENT_DELETED),
+    ]
+    assert events[0][2]["result"] == 3
+    assert events[1][2]["result"] == 7
+    assert events[2][2] == {"id": calc["id"]}
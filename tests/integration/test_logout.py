@@ -0,0 +1,205 @@
+# tests/integration/test_logout.py
+import time
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.auth import jwt as jwt_module
+from app.auth import rate_limit
+from app.auth import redis as redis_module
+from app.auth.jwt import create_token, decode_token
+from app.auth.redis import bump_token_generation, get_token_generation
+from app.main import app
+from app.schemas.token import TokenType
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def revocation_store():
+    """Patch the Redis-backed revocation checks used by decode_token."""
+    jwt_module._revocation_unavailable_until = 0.0
+    with patch("app.auth.jwt.is_blacklisted", new=AsyncMock(return_value=False)), \
+         patch("app.auth.jwt.get_token_generation", new=AsyncMock(return_value=0)) as generation:
+        yield generation
+
+
+def auth_header(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_logout_blacklists_access_token(revocation_store):
+    user_id = uuid4()
+    access_token = create_token(user_id, TokenType.ACCESS)
+
+    with patch("app.main.add_many_to_blacklist", new=AsyncMock()) as blacklist:
+        response = client.post("/auth/logout", headers=auth_header(access_token))
+
+    assert response.status_code == 204
+    revoked = blacklist.await_args.args[0]
+    assert len(revoked) == 1
+    assert all(ttl > 0 for ttl in revoked.values())
+
+
+def test_logout_also_revokes_refresh_token(revocation_store):
+    user_id = uuid4()
+    access_token = create_token(user_id, TokenType.ACCESS)
+    refresh_token = create_token(user_id, TokenType.REFRESH)
+
+    with patch("app.main.add_many_to_blacklist", new=AsyncMock()) as blacklist:
+        response = client.post(
+            "/auth/logout",
+            json={"refresh_token": refresh_token},
+            headers=auth_header(access_token)
+        )
+
+    assert response.status_code == 204
+    assert len(blacklist.await_args.args[0]) == 2
+
+
+def test_logout_rejects_foreign_refresh_token(revocation_store):
+    access_token = create_token(uuid4(), TokenType.ACCESS)
+    refresh_token = create_token(uuid4(), TokenType.REFRESH)
+
+    with patch("app.main.add_many_to_blacklist", new=AsyncMock()) as blacklist:
+        response = client.post(
+            "/auth/logout",
+            json={"refresh_token": refresh_token},
+            headers=auth_header(access_token)
+        )
+
+    assert response.status_code == 400
+    blacklist.assert_not_awaited()
+
+
+def test_logout_returns_503_while_redis_is_down(revocation_store):
+    access_token = create_token(uuid4(), TokenType.ACCESS)
+
+    with patch("app.main.add_many_to_blacklist", new=AsyncMock(side_effect=RedisConnectionError())):
+        response = client.post("/auth/logout", headers=auth_header(access_token))
+
+    assert response.status_code == 503
+
+
+def test_logout_requires_token():
+    response = client.post("/auth/logout")
+    assert response.status_code == 401
+
+
+def test_logout_all_bumps_generation(revocation_store):
+    user_id = uuid4()
+    access_token = create_token(user_id, TokenType.ACCESS)
+
+    with patch("app.main.bump_token_generation", new=AsyncMock(return_value=1)) as bump:
+        response = client.post("/auth/logout-all", headers=auth_header(access_token))
+
+    assert response.status_code == 204
+    bump.assert_awaited_once_with(str(user_id))
+
+
+@pytest.mark.asyncio
+async def test_decode_token_rejects_tokens_from_older_generation(revocation_store):
+    token = create_token(uuid4(), TokenType.ACCESS)
+    revocation_store.return_value = int(time.time() * 1000)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await decode_token(token, TokenType.ACCESS)
+    assert exc_info.value.status_code == 401
+    assert exc_info.value.detail == "Token has been revoked"
+
+
+@pytest.mark.asyncio
+async def test_decode_token_accepts_tokens_from_current_generation(revocation_store):
+    token = create_token(uuid4(), TokenType.ACCESS)
+    revocation_store.return_value = int(time.time() * 1000) - 60_000
+
+    payload = await decode_token(token, TokenType.ACCESS)
+    assert payload["type"] == "access"
+
+
+class GenerationRedis:
+    def __init__(self):
+        self.values = {}
+        self.reads = 0
+
+    async def get(self, key):
+        self.reads += 1
+        return self.values.get(key)
+
+    async def exists(self, key):
+        return key in self.values
+
+    async def eval(self, script, numkeys, key, now, ttl):
+        self.values[key] = max(int(self.values.get(key, 0)), now)
+        return self.values[key]
+
+
+@pytest.fixture
+def generation_redis():
+    fake = GenerationRedis()
+    redis_module.get_redis.redis = fake
+    redis_module._generation_cache.clear()
+    jwt_module._revocation_unavailable_until = 0.0
+    yield fake
+    redis_module._generation_cache.clear()
+    if hasattr(redis_module.get_redis, "redis"):
+        del redis_module.get_redis.redis
+
+
+@pytest.mark.asyncio
+async def test_token_generation_is_cached_locally(generation_redis):
+    assert await get_token_generation("user-1") == 0
+    assert await get_token_generation("user-1") == 0
+    assert generation_redis.reads == 1
+
+
+@pytest.mark.asyncio
+async def test_bump_token_generation_updates_local_cache(generation_redis):
+    assert await get_token_generation("user-1") == 0
+    generation = await bump_token_generation("user-1")
+    assert generation >= int(time.time() * 1000) - 1000
+    assert await get_token_generation("user-1") == generation
+    assert generation_redis.reads == 1
+
+
+@pytest.mark.asyncio
+async def test_token_generation_cache_is_bounded(generation_redis, monkeypatch):
+    monkeypatch.setattr(redis_module.settings, "TOKEN_GENERATION_CACHE_MAX_ENTRIES", 2)
+    for user in ("user-1", "user-2", "user-1", "user-3"):
+        await get_token_generation(user)
+
+    # user-2 was least recently used when user-3 arrived
+    assert list(redis_module._generation_cache) == ["user-1", "user-3"]
+
+
+@pytest.fixture
+def local_limits():
+    """Keep the per-user quota off the fake Redis."""
+    rate_limit._redis_unavailable_until = time.monotonic() + 3600
+    yield
+    rate_limit._redis_unavailable_until = 0.0
+
+
+def test_logout_all_revokes_access_to_the_api(generation_redis, local_limits):
+    access_token = create_token(uuid4(), TokenType.ACCESS)
+    assert client.get("/calculations", headers=auth_header(access_token)).status_code == 200
+
+    assert client.post("/auth/logout-all", headers=auth_header(access_token)).status_code == 204
+
+    response = client.get("/calculations", headers=auth_header(access_token))
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token has been revoked"
+
+
+def test_token_minted_after_logout_all_is_accepted(generation_redis, local_limits):
+    user_id = uuid4()
+    old_token = create_token(user_id, TokenType.ACCESS)
+    assert client.post("/auth/logout-all", headers=auth_header(old_token)).status_code == 204
+
+    time.sleep(0.002)  # generations are compared at millisecond precision
+    new_token = create_token(user_id, TokenType.ACCESS)
+    assert client.get("/calculations", headers=auth_header(new_token)).status_code == 200
@@ -0,0 +1,219 @@
+# tests/integration/test_migrations.py
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import inspect, insert, text
+
+from app import database_init
+from app.database_init import (
+    SCHEMA_LOCK_KEY,
+    SCHEMA_VERSION,
+    get_schema_version,
+    init_db,
+    schema_lock,
+    stamp_schema_version,
+)
+from app.migrations import (
+    MIGRATIONS,
+    AddColumn,
+    Backfill,
+    CreateIndex,
+    Migration,
+    migrate,
+    pending_migrations,
+)
+from app.models.calculation import Calculation
+
+INDEX = "ix_calculations_user_id_created_at"
+UPDATED_AT_INDEX = "ix_calculations_updated_at"
+
+
+@pytest.fixture
+def version_one_db(empty_engine):
+    """A database as create_all left it before migration 2 existed."""
+    init_db(empty_engine)
+    with empty_engine.begin() as conn:
+        conn.execute(text(f"DROP INDEX {INDEX}"))
+        conn.execute(text(f"DROP INDEX {UPDATED_AT_INDEX}"))
+        conn.execute(text("ALTER TABLE calculations DROP COLUMN error"))
+    stamp_schema_version(empty_engine, 1)
+    return empty_engine
+
+
+def index_names(engine, table="calculations"):
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def seed(engine, count):
+    with engine.begin() as conn:
+        conn.execute(insert(Calculation), [
+            {
+                "id": uuid.uuid4(),
+                "user_id": uuid.uuid4(),
+                "type": "addition",
+                "inputs": [float(i), 1.0],
+                "result": float(i + 1),
+                "created_at": datetime(2026, 1, 1),
+                "updated_at": datetime(2026, 1, 1),
+            }
+            for i in range(count)
+        ])
+
+
+def test_latest_migration_matches_schema_version():
+    versions = [migration.version for migration in MIGRATIONS]
+    assert versions == sorted(set(versions))
+    assert versions[-1] == SCHEMA_VERSION
+    assert pending_migrations(SCHEMA_VERSION) == []
+
+
+def test_fresh_database_is_stamped_current(empty_engine):
+    init_db(empty_engine)
+    assert get_schema_version(empty_engine) == SCHEMA_VERSION
+    assert {INDEX, UPDATED_AT_INDEX} <= index_names(empty_engine)
+
+
+def test_dry_run_reports_lock_impact_without_changes(version_one_db):
+    seed(version_one_db, 3)
+
+    report, updated_at_index, error_column = migrate(version_one_db, dry_run=True)
+
+    assert report["version"] == 2
+    assert updated_at_index["version"] == 3
+    assert error_column["sql"] == ["ALTER TABLE calculations ADD COLUMN error VARCHAR(255)"]
+    assert report["estimated_rows"] == 3
+    assert report["sql"] == [f"CREATE INDEX IF NOT EXISTS {INDEX} ON calculations (user_id, created_at)"]
+    assert report["blocking"] is True  # SQLite cannot build indexes online
+    assert get_schema_version(version_one_db) == 1
+    assert INDEX not in index_names(version_one_db)
+    assert UPDATED_AT_INDEX not in index_names(version_one_db)
+
+
+def test_upgrade_builds_index_and_stamps_version(version_one_db):
+    migrate(version_one_db)
+    assert {INDEX, UPDATED_AT_INDEX} <= index_names(version_one_db)
+    assert "error" in {c["name"] for c in inspect(version_one_db).get_columns("calculations")}
+    assert get_schema_version(version_one_db) == SCHEMA_VERSION
+    # Nothing left to do
+    assert migrate(version_one_db) == []
+
+
+def test_init_db_migrates_existing_databases(version_one_db):
+    init_db(version_one_db)
+    assert INDEX in index_names(version_one_db)
+    assert get_schema_version(version_one_db) == SCHEMA_VERSION
+
+
+def test_unversioned_database_is_treated_as_baseline(version_one_db):
+    with version_one_db.begin() as conn:
+        conn.execute(text("DROP TABLE schema_version"))
+    init_db(version_one_db)
+    assert INDEX in index_names(version_one_db)
+    assert get_schema_version(version_one_db) == SCHEMA_VERSION
+
+
+def test_postgres_index_builds_online():
+    step = CreateIndex(INDEX, "calculations", ["user_id", "created_at"])
+    assert step.statements("postgresql") == [
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX} ON calculations (user_id, created_at)"
+    ]
+    assert step.blocking_for("postgresql") is False
+    assert "SHARE UPDATE EXCLUSIVE" in step.lock_for("postgresql")
+
+
+def test_partitioned_index_is_built_per_partition_and_attached():
+    step = CreateIndex(INDEX, "calculations", ["user_id", "created_at"])
+    assert step.statements("postgresql", ["calculations_p00", "calculations_p01"]) == [
+        f"CREATE INDEX IF NOT EXISTS {INDEX} ON ONLY calculations (user_id, created_at)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS calculations_p00_user_id_created_at_idx "
+        "ON calculations_p00 (user_id, created_at)",
+        f"ALTER INDEX {INDEX} ATTACH PARTITION calculations_p00_user_id_created_at_idx",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS calculations_p01_user_id_created_at_idx "
+        "ON calculations_p01 (user_id, created_at)",
+        f"ALTER INDEX {INDEX} ATTACH PARTITION calculations_p01_user_id_created_at_idx",
+    ]
+
+
+def test_add_column_and_batched_backfill(empty_engine):
+    init_db(empty_engine)
+    seed(empty_engine, 7)
+    migrations = MIGRATIONS + [
+        Migration(SCHEMA_VERSION + 1, "Store input counts", [
+            AddColumn("calculations", "input_count", "INTEGER"),
+            Backfill("calculations", "input_count = json_array_length(inputs)",
+                     "input_count IS NULL", batch_size=3),
+        ]),
+    ]
+
+    add, backfill = migrate(empty_engine, dry_run=True, migrations=migrations)
+    assert "ACCESS EXCLUSIVE" in add["lock"]
+    assert add["sql"] == ["ALTER TABLE calculations ADD COLUMN input_count INTEGER"]
+    assert (backfill["estimated_rows"], backfill["batches"]) == (7, 3)
+
+    with patch("app.migrations.settings.MIGRATION_BATCH_PAUSE_SECONDS", 0):
+        migrate(empty_engine, migrations=migrations)
+
+    with empty_engine.connect() as conn:
+        counts = conn.execute(text("SELECT DISTINCT input_count FROM calculations")).scalars().all()
+    assert counts == [2]
+    assert get_schema_version(empty_engine) == SCHEMA_VERSION + 1
+
+    assert "input_count" in {c["name"] for c in inspect(empty_engine).get_columns("calculations")}
+    assert migrate(empty_engine, migrations=migrations) == []
+
+
+def test_migrate_requires_an_initialised_database(empty_engine):
+    with pytest.raises(RuntimeError, match="app.database_init"):
+        migrate(empty_engine)
+
+
+def test_schema_lock_is_taken_once_per_thread_on_postgres():
+    conn = MagicMock()
+    conn.execution_options.return_value.__enter__.return_value = conn
+    conn.execute.return_value.scalar.return_value = True
+    bind = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"), connect=lambda: conn)
+
+    with schema_lock(bind):
+        with schema_lock(bind):  # migrate() inside init_db()
+            pass
+
+    conn.execution_options.assert_called_once_with(isolation_level="AUTOCOMMIT")
+    statements = [(str(call.args[0]), call.args[1]) for call in conn.execute.call_args_list]
+    assert statements == [
+        ("SELECT pg_try_advisory_lock(:key)", {"key": SCHEMA_LOCK_KEY}),
+        ("SELECT pg_advisory_unlock(:key)", {"key": SCHEMA_LOCK_KEY}),
+    ]
+
+
+def test_schema_lock_waiters_poll_instead_of_blocking_in_postgres():
+    conn = MagicMock()
+    conn.execution_options.return_value.__enter__.return_value = conn
+    # Another worker holds the lock for the first two attempts
+    conn.execute.return_value.scalar.side_effect = [False, False, True, None]
+    bind = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"), connect=lambda: conn)
+
+    with patch("app.database_init.time.sleep") as sleep:
+        with schema_lock(bind):
+            pass
+
+    statements = [str(call.args[0]) for call in conn.execute.call_args_list]
+    assert statements.count("SELECT pg_try_advisory_lock(:key)") == 3
+    # Never a blocking pg_advisory_lock, whose open snapshot would stall CREATE INDEX CONCURRENTLY
+    assert "SELECT pg_advisory_lock(:key)" not in statements
+    assert sleep.call_count == 2
+
+
+def test_migrate_reads_the_version_under_the_schema_lock(version_one_db):
+    held = []
+    real_get_version = get_schema_version
+
+    def record(bind):
+        held.append(database_init._schema_lock.depth)
+        return real_get_version(bind)
+
+    with patch("app.migrations.get_schema_version", side_effect=record):
+        migrate(version_one_db)
+    assert held == [1]
@@ -0,0 +1,139 @@
+# tests/integration/test_password_rehash.py
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth.calibrate import main as calibrate_main, write_env_setting
+from app.auth.jwt import (
+    calibrate_bcrypt_rounds,
+    get_password_context,
+    get_password_hash,
+    password_needs_rehash,
+    rehash_user_password,
+    settings,
+)
+from app.main import app
+from app.models.user import User
+from tests.conftest import create_fake_user
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def cheap_rounds(monkeypatch):
+    """Use cheap bcrypt costs for the test; `use_rounds` changes the configured cost."""
+    def use_rounds(rounds: int) -> None:
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", rounds)
+        get_password_context.cache_clear()
+
+    use_rounds(4)
+    yield use_rounds
+    get_password_context.cache_clear()
+
+
+def test_calibration_respects_budget():
+    rounds = calibrate_bcrypt_rounds(target_ms=50, probe_rounds=5, samples=1)
+    assert 4 <= rounds <= 31
+
+    cheaper = calibrate_bcrypt_rounds(target_ms=0.001, probe_rounds=5, samples=1)
+    assert cheaper == 4
+
+
+def test_calibration_grows_with_budget():
+    small = calibrate_bcrypt_rounds(target_ms=5, probe_rounds=5, samples=1)
+    large = calibrate_bcrypt_rounds(target_ms=5000, probe_rounds=5, samples=1)
+    assert large > small
+
+
+def test_write_env_setting_replaces_or_appends(tmp_path):
+    env_file = tmp_path / ".env"
+    env_file.write_text("DATABASE_URL=sqlite://\nBCRYPT_ROUNDS=12\n")
+
+    write_env_setting(str(env_file), "BCRYPT_ROUNDS", 11)
+    assert env_file.read_text() == "DATABASE_URL=sqlite://\nBCRYPT_ROUNDS=11\n"
+
+    write_env_setting(str(env_file), "FAST_START", "true")
+    assert env_file.read_text().splitlines()[-1] == "FAST_START=true"
+
+
+def test_calibration_cli_saves_rounds_once(tmp_path):
+    env_file = tmp_path / ".env"
+    with patch("app.auth.calibrate.calibrate_bcrypt_rounds", return_value=10) as calibrate:
+        calibrate_main(["--target-ms", "250", "--env-file", str(env_file)])
+
+    calibrate.assert_called_once_with(250.0)
+    assert env_file.read_text() == "BCRYPT_ROUNDS=10\n"
+
+
+def test_needs_rehash_follows_configured_cost(cheap_rounds):
+    hashed = get_password_hash("SecurePass123")
+    assert not password_needs_rehash(hashed)
+
+    cheap_rounds(5)
+    assert password_needs_rehash(hashed)
+    assert get_password_context().verify("SecurePass123", hashed)
+
+
+def test_authenticate_reports_outdated_hash(db_session, cheap_rounds):
+    user_data = create_fake_user()
+    user = User.register(db_session, user_data)
+    db_session.commit()
+
+    cheap_rounds(5)
+    result = User.authenticate(db_session, user.username, user_data["password"])
+
+    assert result is not None
+    assert result["needs_rehash"] is True
+
+
+def test_rehash_user_password_upgrades_hash(db_session, cheap_rounds):
+    user_data = create_fake_user()
+    user = User.register(db_session, user_data)
+    db_session.commit()
+
+    cheap_rounds(5)
+    rehash_user_password(db_session.get_bind(), user.id, user_data["password"])
+
+    db_session.expire_all()
+    refreshed = db_session.query(User).filter(User.id == user.id).first()
+    assert refreshed.password.startswith("$2b$05$")
+    assert refreshed.verify_password(user_data["password"])
+    assert not refreshed.password_needs_rehash()
+
+
+def test_rehash_skips_current_hashes(db_session, cheap_rounds):
+    user_data = create_fake_user()
+    user = User.register(db_session, user_data)
+    db_session.commit()
+    original = user.password
+
+    rehash_user_password(db_session.get_bind(), user.id, user_data["password"])
+
+    db_session.expire_all()
+    assert db_session.query(User).filter(User.id == user.id).first().password == original
+
+
+def test_login_schedules_rehash_in_background():
+    fake_user = SimpleNamespace(
+        id=uuid4(), username="rehash", email="rehash@example.com",
+        first_name="Re", last_name="Hash", is_active=True, is_verified=False
+    )
+    auth_result = {
+        "access_token": "access",
+        "refresh_token": "refresh",
+        "expires_at": datetime.now(timezone.utc),
+        "user": fake_user,
+        "needs_rehash": True,
+    }
+
+    with patch.object(User, "authenticate", return_value=auth_result), \
+         patch("app.main.rehash_user_password") as rehash:
+        response = client.post("/auth/login", json={"username": "rehash", "password": "SecurePass123"})
+
+    assert response.status_code == 200
+    rehash.assert_called_once()
+    assert rehash.call_args.args[1:] == (fake_user.id, "SecurePass123")
@@ -0,0 +1,88 @@
+# tests/integration/test_query_count.py
+from contextlib import contextmanager
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.auth.jwt import create_token
+from app.main import app
+from app.schemas.token import TokenType
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def counted_db(memory_engine, app_db):
+    """Point the app at a private in-memory database and record every SQL statement."""
+    statements = []
+
+    @event.listens_for(memory_engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split(None, 1)[0].upper())
+
+    return statements
+
+
+@contextmanager
+def counting(statements):
+    statements.clear()
+    yield statements
+
+
+def register_user():
+    unique = uuid4().hex[:12]
+    response = client.post("/auth/register", json={
+        "username": f"user_{unique}",
+        "email": f"user_{unique}@example.com",
+        "password": "Password123!",
+        "confirm_password": "Password123!",
+        "first_name": "Query",
+        "last_name": "Count",
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_register_is_one_lookup_and_one_insert(counted_db):
+    with counting(counted_db) as statements:
+        register_user()
+    assert statements == ["SELECT", "INSERT"]
+
+
+def test_create_calculation_is_a_single_insert(counted_db):
+    user = register_user()
+    headers = {"Authorization": f"Bearer {create_token(user['id'], TokenType.ACCESS)}"}
+
+    with counting(counted_db) as statements:
+        response = client.post(
+            "/calculations",
+            json={"type": "addition", "inputs": [1, 2, 3]},
+            headers=headers
+        )
+
+    assert response.status_code == 201
+    assert response.json()["result"] == 6
+    assert statements == ["INSERT"]
+
+
+def test_update_calculation_does_not_reselect(counted_db):
+    user = register_user()
+    headers = {"Authorization": f"Bearer {create_token(user['id'], TokenType.ACCESS)}"}
+    calc = client.post(
+        "/calculations",
+        json={"type": "multiplication", "inputs": [2, 3]},
+        headers=headers
+    ).json()
+
+    with counting(counted_db) as statements:
+        response = client.put(
+            f"/calculations/{calc['id']}",
+            json={"inputs": [4, 5]},
+            headers=headers
+        )
+
+    assert response.status_code == 200
+    assert response.json()["result"] == 20
+    assert statements == ["SELECT", "UPDATE"]
@@ -0,0 +1,196 @@
+# tests/integration/test_rate_limit.py
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.auth import rate_limit
+from app.auth.jwt import create_token
+from app.auth.rate_limit import ConcurrencyLimiter, SlidingWindowLimiter, TokenBucket, calculation_quota
+from app.main import app
+from app.models.user import User
+from app.schemas.token import TokenType
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def local_limits():
+    """Run limiters on their in-process buckets with a clean slate."""
+    rate_limit._redis_unavailable_until = time.monotonic() + 3600
+    limiters = (
+        rate_limit.login_ip_limiter,
+        rate_limit.login_username_limiter,
+        rate_limit.calculation_rate_limiter,
+        rate_limit.calculation_concurrency_limiter,
+    )
+    for limiter in limiters:
+        limiter.reset()
+    yield
+    rate_limit._redis_unavailable_until = 0.0
+    for limiter in limiters:
+        limiter.reset()
+
+
+@pytest.fixture
+def redis_limits():
+    """Make limiters try Redis first, regardless of earlier failures."""
+    rate_limit._redis_unavailable_until = 0.0
+    yield
+    rate_limit._redis_unavailable_until = 0.0
+
+
+def test_token_bucket_allows_burst_then_throttles():
+    bucket = TokenBucket(capacity=3, rate=1.0)
+    assert all(bucket.consume().allowed for _ in range(3))
+    denied = bucket.consume()
+    assert not denied.allowed
+    assert 0 < denied.retry_after <= 1.0
+
+
+@pytest.mark.asyncio
+async def test_limiter_uses_redis_result(redis_limits):
+    fake_redis = AsyncMock()
+    fake_redis.eval.return_value = [0, 1500]
+    limiter = SlidingWindowLimiter("test", limit=2, window=60)
+
+    with patch("app.auth.rate_limit.get_redis", new=AsyncMock(return_value=fake_redis)):
+        result = await limiter.hit("alice")
+
+    assert not result.allowed
+    assert result.retry_after == 1.5
+    key = fake_redis.eval.await_args.args[2]
+    assert key == "ratelimit:test:alice"
+
+
+@pytest.mark.asyncio
+async def test_limiter_window_members_are_unique_across_workers(redis_limits):
+    fake_redis = AsyncMock()
+    fake_redis.eval.return_value = [1, 0]
+    # Each worker has its own limiter; both hit in the same millisecond
+    workers = [SlidingWindowLimiter("test", limit=2, window=60) for _ in range(2)]
+
+    with patch("app.auth.rate_limit.get_redis", new=AsyncMock(return_value=fake_redis)), \
+         patch("app.auth.rate_limit.time.time", return_value=1_700_000_000.0):
+        for limiter in workers:
+            await limiter.hit("alice")
+            await limiter.hit("alice")
+
+    members = [call.args[-1] for call in fake_redis.eval.await_args_list]
+    assert len(set(members)) == 4
+
+
+@pytest.mark.asyncio
+async def test_limiter_falls_back_to_local_bucket_when_redis_fails(redis_limits):
+    fake_redis = AsyncMock()
+    fake_redis.eval.side_effect = RedisConnectionError("down")
+    limiter = SlidingWindowLimiter("fallback", limit=2, window=60)
+
+    with patch("app.auth.rate_limit.get_redis", new=AsyncMock(return_value=fake_redis)):
+        results = [await limiter.hit("bob") for _ in range(3)]
+
+    # Redis is skipped while it is marked unavailable
+    assert fake_redis.eval.await_count == 1
+
+    assert [r.allowed for r in results] == [True, True, False]
+
+
+@pytest.mark.asyncio
+async def test_sprayed_identifiers_do_not_reset_an_active_bucket(local_limits):
+    limiter = SlidingWindowLimiter("spray", limit=2, window=60, max_local_buckets=10)
+    assert [(await limiter.hit("victim")).allowed for _ in range(2)] == [True, True]
+
+    for i in range(50):
+        await limiter.hit(f"sprayed-{i}")
+        await limiter.hit("victim")  # the attacked identifier stays recently used
+
+    assert not (await limiter.hit("victim")).allowed
+    assert len(limiter._buckets) == 10
+
+
+def test_login_is_throttled_before_authenticate(local_limits):
+    with patch.object(rate_limit.login_username_limiter, "limit", 2), \
+         patch.object(User, "authenticate", return_value=None) as authenticate:
+        statuses = [
+            client.post("/auth/login", json={"username": "Victim", "password": "Wrong1234"}).status_code
+            for _ in range(3)
+        ]
+        throttled = client.post("/auth/login", json={"username": "victim", "password": "Wrong1234"})
+
+    assert statuses == [401, 401, 429]
+    assert throttled.status_code == 429
+    assert int(throttled.headers["Retry-After"]) >= 1
+    assert authenticate.call_count == 2
+
+
+def test_form_login_is_throttled_per_ip(local_limits):
+    with patch.object(rate_limit.login_ip_limiter, "limit", 1), \
+         patch.object(User, "authenticate", return_value=None) as authenticate:
+        first = client.post("/auth/token", data={"username": "a", "password": "x"})
+        second = client.post("/auth/token", data={"username": "b", "password": "x"})
+
+    assert first.status_code == 401
+    assert second.status_code == 429
+    assert authenticate.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limiter_local_slots(local_limits):
+    limiter = ConcurrencyLimiter("test", limit=2, lease_seconds=60)
+    first = await limiter.acquire("carol")
+    second = await limiter.acquire("carol")
+    assert first and second
+    assert await limiter.acquire("carol") is None
+    assert await limiter.acquire("dave") is not None
+
+    await limiter.release("carol", first)
+    assert await limiter.acquire("carol") is not None
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limiter_uses_redis_leases(redis_limits):
+    fake_redis = AsyncMock()
+    fake_redis.eval.return_value = 0
+    limiter = ConcurrencyLimiter("test", limit=1, lease_seconds=30)
+
+    with patch("app.auth.rate_limit.get_redis", new=AsyncMock(return_value=fake_redis)):
+        assert await limiter.acquire("erin") is None
+        fake_redis.eval.return_value = 1
+        lease_id = await limiter.acquire("erin")
+        await limiter.release("erin", lease_id)
+
+    fake_redis.zrem.assert_awaited_once_with("concurrency:test:erin", lease_id)
+
+
+@pytest.mark.asyncio
+async def test_calculation_quota_holds_slot_until_request_finishes(local_limits):
+    user = SimpleNamespace(id=uuid4())
+    with patch.object(rate_limit.calculation_concurrency_limiter, "limit", 1):
+        first = calculation_quota(current_user=user)
+        await first.__anext__()
+
+        second = calculation_quota(current_user=user)
+        with pytest.raises(Exception) as exc_info:
+            await second.__anext__()
+        assert exc_info.value.status_code == 429
+
+        await first.aclose()
+        third = calculation_quota(current_user=user)
+        await third.__anext__()
+        await third.aclose()
+
+
+def test_calculation_routes_enforce_per_user_rate(local_limits):
+    headers = {"Authorization": f"Bearer {create_token(uuid4(), TokenType.ACCESS)}"}
+    other = {"Authorization": f"Bearer {create_token(uuid4(), TokenType.ACCESS)}"}
+
+    with patch.object(rate_limit.calculation_rate_limiter, "limit", 2):
+        statuses = [client.get("/calculations", headers=headers).status_code for _ in range(3)]
+        other_status = client.get("/calculations", headers=other).status_code
+
+    assert statuses == [200, 200, 429]
+    assert other_status == 200
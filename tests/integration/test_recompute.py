@@ -0,0 +1,100 @@
+# tests/integration/test_recompute.py
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert, select
+
+from app.models.calculation import Calculation
+from app.recompute import recompute_results
+
+NOW = datetime(2026, 6, 1)
+
+
+def seed(engine, rows):
+    """Insert (type, inputs, stored result) rows directly; returns their ids in order."""
+    ids = sorted(uuid.uuid4() for _ in rows)
+    with engine.begin() as conn:
+        conn.execute(insert(Calculation), [
+            {
+                "id": calc_id,
+                "user_id": uuid.uuid4(),
+                "type": calculation_type,
+                "inputs": inputs,
+                "result": result,
+                "created_at": NOW,
+                "updated_at": NOW,
+            }
+            for calc_id, (calculation_type, inputs, result) in zip(ids, rows)
+        ])
+    return ids
+
+
+def results(engine):
+    with engine.connect() as conn:
+        return dict(conn.execute(select(Calculation.id, Calculation.result)).all())
+
+
+def test_stale_results_are_rewritten(memory_engine):
+    ids = seed(memory_engine, [
+        ("addition", [1, 2], 3.0),
+        ("addition", [2, 2], 5.0),
+        ("square_root", [16], 3.0),
+        ("division", [1, 0], 7.0),  # no longer valid: left untouched
+    ])
+
+    progress = recompute_results(memory_engine, batch_size=2, rows_per_second=0)
+
+    assert (progress.scanned, progress.changed, progress.failed) == (4, 2, 1)
+    assert [results(memory_engine)[calc_id] for calc_id in ids] == [3.0, 4.0, 4.0, 7.0]
+
+
+def test_types_filter_and_dry_run(memory_engine):
+    ids = seed(memory_engine, [("addition", [1, 1], 0.0), ("multiplication", [2, 3], 0.0)])
+
+    dry = recompute_results(memory_engine, types=["Addition"], dry_run=True, rows_per_second=0)
+    assert (dry.scanned, dry.changed) == (1, 1)
+    assert set(results(memory_engine).values()) == {0.0}
+
+    recompute_results(memory_engine, types=["addition"], rows_per_second=0)
+    assert [results(memory_engine)[calc_id] for calc_id in ids] == [2.0, 0.0]
+
+
+def test_interrupted_run_resumes_from_checkpoint(memory_engine, tmp_path):
+    ids = seed(memory_engine, [("addition", [i, 1], 0.0) for i in range(5)])
+    checkpoint = tmp_path / "recompute.json"
+
+    def crash_after_first_batch(name, progress):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        recompute_results(memory_engine, types=["addition"], batch_size=2, rows_per_second=0,
+                          checkpoint_path=str(checkpoint), on_batch=crash_after_first_batch)
+    saved = json.loads(checkpoint.read_text())
+    assert saved["types"]["addition"] == {"after": str(ids[1]), "done": False}
+    assert [results(memory_engine)[calc_id] for calc_id in ids] == [1.0, 2.0, 0.0, 0.0, 0.0]
+
+    scanned_batches = []
+    progress = recompute_results(memory_engine, types=["addition"], batch_size=2, rows_per_second=0,
+                                 checkpoint_path=str(checkpoint),
+                                 on_batch=lambda name, p: scanned_batches.append(p.scanned))
+    assert scanned_batches == [4, 5]  # totals carry over; the first batch is not re-read
+    assert progress.changed == 5
+    assert [results(memory_engine)[calc_id] for calc_id in ids] == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert json.loads(checkpoint.read_text())["types"]["addition"]["done"] is True
+
+    # A finished type is skipped on the next run
+    assert recompute_results(memory_engine, types=["addition"], rows_per_second=0,
+                             checkpoint_path=str(checkpoint)).scanned == 5
+
+
+def test_rate_limit_paces_the_scan(memory_engine):
+    seed(memory_engine, [("addition", [1, 1], 2.0) for _ in range(6)])
+    pauses = []
+
+    recompute_results(memory_engine, batch_size=2, rows_per_second=10, sleep=pauses.append)
+
+    # The fake sleep does not advance the clock, so each pause is the whole
+    # lead over the target pace: 2, 4 and 6 rows at 10 rows/s
+    assert pauses == pytest.approx([0.2, 0.4, 0.6], abs=0.05)
@@ -0,0 +1,98 @@
+# tests/integration/test_redis.py
+import pytest
+
+from app.auth import redis as redis_module
+from app.auth.redis import (
+    add_many_to_blacklist,
+    are_blacklisted,
+    close_redis,
+    create_connection_pool,
+    get_redis,
+)
+
+
+class FakePipeline:
+    """Records queued commands and reports how many times it was executed."""
+
+    def __init__(self, parent):
+        self.parent = parent
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, *args, **kwargs):
+        self.commands.append(("set", args, kwargs))
+
+    async def execute(self):
+        self.parent.round_trips += 1
+        return [True] * len(self.commands)
+
+
+class FakeRedis:
+    def __init__(self, stored=None):
+        self.stored = stored or {}
+        self.round_trips = 0
+        self.pipelines = []
+
+    def pipeline(self, transaction=True):
+        pipe = FakePipeline(self)
+        self.pipelines.append(pipe)
+        return pipe
+
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.stored.get(key) for key in keys]
+
+
+@pytest.fixture
+def fake_redis():
+    fake = FakeRedis(stored={"blacklist:revoked": "1"})
+    redis_module.get_redis.redis = fake
+    yield fake
+    if hasattr(redis_module.get_redis, "redis"):
+        del redis_module.get_redis.redis
+
+
+def test_connection_pool_uses_settings():
+    pool = create_connection_pool()
+    settings = redis_module.settings
+    assert pool.max_connections == settings.REDIS_MAX_CONNECTIONS
+    assert pool.connection_kwargs["socket_timeout"] == settings.REDIS_SOCKET_TIMEOUT
+    assert pool.connection_kwargs["socket_connect_timeout"] == settings.REDIS_SOCKET_CONNECT_TIMEOUT
+    assert pool.connection_kwargs["health_check_interval"] == settings.REDIS_HEALTH_CHECK_INTERVAL
+    assert pool.connection_kwargs["retry"] is not None
+
+
+@pytest.mark.asyncio
+async def test_get_redis_reuses_client_and_close_resets_it():
+    first = await get_redis()
+    assert await get_redis() is first
+    await close_redis()
+    assert not hasattr(get_redis, "redis")
+
+
+@pytest.mark.asyncio
+async def test_add_many_to_blacklist_is_one_round_trip(fake_redis):
+    await add_many_to_blacklist({"a": 60, "b": 120, "c": 30})
+    assert fake_redis.round_trips == 1
+    commands = fake_redis.pipelines[0].commands
+    assert [c[1][0] for c in commands] == ["blacklist:a", "blacklist:b", "blacklist:c"]
+    assert commands[1][2] == {"ex": 120}
+
+
+@pytest.mark.asyncio
+async def test_add_many_to_blacklist_empty_is_noop(fake_redis):
+    await add_many_to_blacklist({})
+    assert fake_redis.round_trips == 0
+
+
+@pytest.mark.asyncio
+async def test_are_blacklisted_checks_all_jtis_at_once(fake_redis):
+    result = await are_blacklisted(["revoked", "valid"])
+    assert result == {"revoked": True, "valid": False}
+    assert fake_redis.round_trips == 1
+    assert await are_blacklisted([]) == {}
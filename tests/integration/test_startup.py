@@ -0,0 +1,91 @@
+# tests/integration/test_startup.py
+import json
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import Base
+from app.database_init import SCHEMA_VERSION, get_schema_version, init_db, stamp_schema_version
+from app.main import app
+
+# Wall-clock budget for `import app.main` in a fresh interpreter: about
+# twice the ~1 s it takes once the modules below are deferred
+IMPORT_TIME_BUDGET_SECONDS = float(os.environ.get("IMPORT_TIME_BUDGET_SECONDS", "2.0"))
+
+# Only needed to serve pages, hash passwords, encode msgpack or run the dev server
+LAZY_MODULES = ("uvicorn", "jinja2", "passlib", "bcrypt", "msgpack")
+
+
+def run_python(code: str) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        check=True, capture_output=True, text=True, env=os.environ.copy(),
+    ).stdout
+
+
+def test_rarely_used_modules_are_not_imported_eagerly():
+    loaded = json.loads(run_python(
+        "import sys, json, app.main; "
+        f"print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))"
+    ))
+    assert loaded == []
+
+
+def test_import_time_budget():
+    timings = [
+        float(run_python(
+            "import time; start = time.perf_counter(); import app.main; "
+            "print(time.perf_counter() - start)"
+        ))
+        for _ in range(3)
+    ]
+    print(f"\nimport app.main: best {min(timings) * 1000:.0f} ms of {len(timings)}")
+    assert min(timings) < IMPORT_TIME_BUDGET_SECONDS
+
+
+def test_password_context_is_built_on_first_use():
+    from app.auth import jwt
+
+    jwt.get_password_context.cache_clear()
+    assert jwt.pwd_context is jwt.get_password_context()
+    assert jwt.verify_password("secret", jwt.get_password_hash("secret"))
+
+
+def test_schema_version_is_stamped_by_init_db(empty_engine):
+    assert get_schema_version(empty_engine) is None
+    init_db(empty_engine)
+    assert get_schema_version(empty_engine) == SCHEMA_VERSION
+    stamp_schema_version(empty_engine, SCHEMA_VERSION + 1)
+    assert get_schema_version(empty_engine) == SCHEMA_VERSION + 1
+
+
+def test_ready_is_unavailable_outside_lifespan():
+    response = TestClient(app).get("/ready")
+    assert response.status_code == 503
+    assert TestClient(app).get("/health").status_code == 200
+
+
+def test_ready_after_fast_start(empty_engine):
+    init_db(empty_engine)
+    with patch("app.main.engine", empty_engine), \
+         patch("app.main.settings.FAST_START", True), \
+         patch("app.main.init_db") as create_all:
+        with TestClient(app) as client:
+            assert client.get("/ready").json() == {"status": "ready"}
+        assert client.get("/ready").status_code == 503
+
+    create_all.assert_not_called()
+
+
+def test_fast_start_refuses_unversioned_database(empty_engine):
+    Base.metadata.create_all(bind=empty_engine)
+    with patch("app.main.engine", empty_engine), \
+         patch("app.main.settings.FAST_START", True):
+        with pytest.raises(RuntimeError, match="app.database_init"):
+            with TestClient(app):
+                pass
+    assert app.state.ready is False
@@ -0,0 +1,114 @@
+# tests/integration/test_static_assets.py
+import gzip
+import os
+import re
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.static_assets import (
+    IMMUTABLE_CACHE_CONTROL,
+    AssetManifest,
+    FingerprintedStaticFiles,
+    fingerprinted_name,
+    precompress,
+)
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    (tmp_path / "js").mkdir()
+    (tmp_path / "js" / "app.js").write_text("console.log('hello');\n" * 100)
+    (tmp_path / "robots.txt").write_text("User-agent: *\n")
+    return tmp_path
+
+
+@pytest.fixture
+def static_client(static_dir):
+    manifest = AssetManifest(str(static_dir))
+    site = FastAPI()
+    site.mount("/static", FingerprintedStaticFiles(directory=str(static_dir), manifest=manifest))
+    return TestClient(site), manifest
+
+
+def test_fingerprinted_name():
+    assert fingerprinted_name("css/style.css", "abc123") == "css/style.abc123.css"
+    assert fingerprinted_name("LICENSE", "abc123") == "LICENSE.abc123"
+
+
+def test_manifest_url_changes_with_content(static_dir):
+    manifest = AssetManifest(str(static_dir))
+    first = manifest.url("js/app.js")
+    assert re.fullmatch(r"/static/js/app\.[0-9a-f]{10}\.js", first)
+
+    (static_dir / "js" / "app.js").write_text("console.log('changed');")
+    manifest.build()
+    assert manifest.url("js/app.js") != first
+    assert manifest.url("missing.css") == "/static/missing.css"
+
+
+def test_fingerprinted_url_is_immutable(static_client):
+    client, manifest = static_client
+    response = client.get(manifest.url("js/app.js"), headers={"Accept-Encoding": "identity"})
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert "console.log('hello');" in response.text
+
+
+def test_plain_url_is_not_immutable(static_client):
+    client, _ = static_client
+    response = client.get("/static/js/app.js")
+    assert response.status_code == 200
+    assert "cache-control" not in response.headers
+
+
+def test_unknown_fingerprint_is_not_found(static_client):
+    client, _ = static_client
+    assert client.get("/static/js/app.0000000000.js").status_code == 404
+
+
+def test_precompressed_variant_is_served_when_accepted(static_dir, static_client):
+    client, manifest = static_client
+    assert precompress(str(static_dir)) >= 1
+    # Too small to be worth compressing
+    assert not (static_dir / "robots.txt.gz").exists()
+
+    response = client.get(manifest.url("js/app.js"), headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/javascript")
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    # The test client decodes transparently
+    assert response.content == (static_dir / "js" / "app.js").read_bytes()
+
+    raw = client.get("/static/js/app.js", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in raw.headers
+
+
+def test_stale_variant_is_ignored(static_dir, static_client):
+    client, _ = static_client
+    precompress(str(static_dir))
+    source = static_dir / "js" / "app.js"
+    source.write_text("console.log('newer');\n" * 100)
+    variant = static_dir / "js" / "app.js.gz"
+    os.utime(variant, (source.stat().st_mtime - 10, source.stat().st_mtime - 10))
+
+    response = client.get("/static/js/app.js", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert "newer" in response.text
+    assert gzip.decompress(variant.read_bytes()).startswith(b"console.log('hello')")
+
+
+def test_pages_reference_fingerprinted_assets():
+    page = client.get("/login").text
+    script = re.search(r'src="(/static/js/layout\.[0-9a-f]{10}\.js)"', page)
+    assert script is not None
+
+    asset = client.get(script.group(1))
+    assert asset.status_code == 200
+    assert asset.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
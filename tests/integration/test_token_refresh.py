@@ -0,0 +1,99 @@
+# tests/integration/test_token_refresh.py
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.auth import redis as redis_module
+from app.auth.jwt import create_token
+from app.auth.redis import mark_refresh_token_used
+from app.main import app
+from app.schemas.token import TokenType
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def revocation_store():
+    with patch("app.auth.jwt.is_blacklisted", new=AsyncMock(return_value=False)), \
+         patch("app.auth.jwt.get_token_generation", new=AsyncMock(return_value=0)):
+        yield
+
+
+def test_refresh_rotates_token_pair(revocation_store):
+    user_id = uuid4()
+    refresh_token = create_token(user_id, TokenType.REFRESH)
+
+    with patch("app.main.mark_refresh_token_used", new=AsyncMock(return_value=True)) as mark_used, \
+         patch("app.main.bump_token_generation", new=AsyncMock()) as bump, \
+         patch("app.models.user.User.authenticate") as authenticate:
+        response = client.post("/auth/refresh", json={"refresh_token": refresh_token})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["token_type"] == "bearer"
+    assert data["access_token"]
+    assert data["refresh_token"] != refresh_token
+    mark_used.assert_awaited_once()
+    bump.assert_not_awaited()
+    authenticate.assert_not_called()
+
+
+def test_refresh_reuse_revokes_all_user_tokens(revocation_store):
+    user_id = uuid4()
+    refresh_token = create_token(user_id, TokenType.REFRESH)
+
+    with patch("app.main.mark_refresh_token_used", new=AsyncMock(return_value=False)), \
+         patch("app.main.bump_token_generation", new=AsyncMock()) as bump:
+        response = client.post("/auth/refresh", json={"refresh_token": refresh_token})
+
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Refresh token reuse detected"
+    bump.assert_awaited_once_with(str(user_id))
+
+
+def test_refresh_returns_503_while_redis_is_down(revocation_store):
+    refresh_token = create_token(uuid4(), TokenType.REFRESH)
+
+    with patch("app.main.mark_refresh_token_used", new=AsyncMock(side_effect=RedisConnectionError())):
+        response = client.post("/auth/refresh", json={"refresh_token": refresh_token})
+
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+
+def test_refresh_rejects_access_token(revocation_store):
+    access_token = create_token(uuid4(), TokenType.ACCESS)
+
+    response = client.post("/auth/refresh", json={"refresh_token": access_token})
+
+    assert response.status_code == 401
+
+
+def test_refresh_rejects_garbage_token():
+    response = client.post("/auth/refresh", json={"refresh_token": "not-a-jwt"})
+    assert response.status_code == 401
+
+
+class SetNxRedis:
+    def __init__(self):
+        self.values = {}
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+
+@pytest.mark.asyncio
+async def test_mark_refresh_token_used_detects_replay():
+    redis_module.get_redis.redis = SetNxRedis()
+    try:
+        assert await mark_refresh_token_used("jti-1", 60) is True
+        assert await mark_refresh_token_used("jti-1", 60) is False
+        assert await mark_refresh_token_used("jti-2", 60) is True
+    finally:
+        del redis_module.get_redis.redis
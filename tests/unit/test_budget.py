@@ -0,0 +1,88 @@
+# tests/unit/test_budget.py
+
+import math
+import threading
+import time
+import uuid
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.budget import (
+    MAX_RESULT_LOG10,
+    BudgetExceeded,
+    check_power_chain,
+    evaluation_budget,
+    power_chain_log10,
+)
+from app.models.calculation import Exponentiation
+from app.schemas.calculation import CalculationBase
+
+
+def test_power_chain_estimate_matches_evaluation():
+    assert power_chain_log10([2, 10]) == pytest.approx(math.log10(2 ** 10))
+    assert power_chain_log10([10.0, 2, 3]) == pytest.approx(6)
+    assert power_chain_log10([0.5, -3]) == pytest.approx(math.log10(8))
+    assert power_chain_log10([7, 0]) == 0
+    assert power_chain_log10([0, 5]) == -math.inf
+
+
+def test_overflowing_chains_are_rejected_without_evaluating():
+    start = time.perf_counter()
+    for inputs in ([10, 300, 300], [10, 400, 0], [0, -1], [2, 10 ** 9]):
+        with pytest.raises(ValueError, match="overflow"):
+            check_power_chain(inputs)
+    assert time.perf_counter() - start < 0.1
+
+    check_power_chain([2, 1000])
+    check_power_chain([1, 10 ** 9])
+    check_power_chain([2, -5000])  # underflows to 0, which is cheap and representable
+
+
+def test_model_short_circuits_integer_chains():
+    calc = Exponentiation(user_id=uuid.uuid4(), inputs=[10, 300, 300])
+    start = time.perf_counter()
+    with pytest.raises(ValueError, match="overflow"):
+        calc.get_result()
+    assert time.perf_counter() - start < 0.1
+
+    near_limit = Exponentiation(user_id=uuid.uuid4(), inputs=[10, 300])
+    assert math.log10(near_limit.get_result()) < MAX_RESULT_LOG10
+
+
+def test_schema_checks_the_whole_chain():
+    with pytest.raises(ValidationError, match="Exponent too large"):
+        CalculationBase(type="exponentiation", inputs=[10, 300, 300])
+    assert CalculationBase(type="exponentiation", inputs=[1, 5000]).inputs == [1, 5000]
+
+
+def test_cpu_budget_interrupts_runaway_evaluation():
+    with pytest.raises(BudgetExceeded, match="CPU"):
+        with evaluation_budget(cpu_seconds=0.2, memory_bytes=None):
+            while True:
+                pass
+    # The timer is disarmed afterwards
+    deadline = time.process_time() + 0.3
+    while time.process_time() < deadline:
+        pass
+
+
+def test_memory_budget_stops_large_allocations():
+    with pytest.raises(BudgetExceeded, match="memory"):
+        with evaluation_budget(cpu_seconds=None, memory_bytes=64 * 1024 * 1024):
+            bytearray(1024 * 1024 * 1024)
+    # The limit is restored afterwards
+    assert len(bytearray(128 * 1024 * 1024)) == 128 * 1024 * 1024
+
+
+def test_budget_is_not_armed_off_the_main_thread():
+    outcome = []
+
+    def evaluate():
+        with evaluation_budget(cpu_seconds=0.01, memory_bytes=1):
+            outcome.append(sum(range(200_000)))
+
+    worker = threading.Thread(target=evaluate)
+    worker.start()
+    worker.join()
+    assert outcome == [sum(range(200_000))]
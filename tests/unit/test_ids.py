@@ -0,0 +1,34 @@
+# tests/unit/test_ids.py
+
+import time
+import uuid
+
+import pytest
+
+from app.core.ids import uuid7, uuid7_timestamp_ms
+
+
+def test_uuid7_version_and_variant():
+    value = uuid7()
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+
+
+def test_uuid7_embeds_current_time():
+    before = time.time_ns() // 1_000_000
+    value = uuid7()
+    after = time.time_ns() // 1_000_000
+    assert before <= uuid7_timestamp_ms(value) <= after + 1
+
+
+def test_uuid7_is_strictly_increasing():
+    ids = [uuid7() for _ in range(10_000)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    # Byte order matches too, which is what the database index compares
+    assert [u.bytes for u in ids] == sorted(u.bytes for u in ids)
+
+
+def test_uuid7_timestamp_rejects_other_versions():
+    with pytest.raises(ValueError):
+        uuid7_timestamp_ms(uuid.uuid4())
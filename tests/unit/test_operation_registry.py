@@ -0,0 +1,88 @@
+# tests/unit/test_operation_registry.py
+
+import uuid
+from unittest.mock import patch
+
+import pytest
+
+from app.models.calculation import Calculation, Division
+from app.operations.registry import OPERATIONS, Operation, get_operation
+from app.schemas.calculation import CalculationType
+
+SAMPLE_INPUTS = {
+    "addition": [[1, 2, 3], [0.5, -0.25]],
+    "subtraction": [[10, 3, 2], [1.5, 4]],
+    "multiplication": [[2, 3, 4], [0.5, 8, -1]],
+    "division": [[10, 2, 5], [1, 3]],
+    "exponentiation": [[2, 3, 2], [9, 0.5]],
+    "modulus": [[100, 7, 3], [7.5, 2]],
+    "square_root": [[16], [2]],
+    "logarithm": [[100, 10], [8, 2]],
+}
+
+
+def test_every_calculation_type_is_registered():
+    assert set(OPERATIONS) == {member.value for member in CalculationType}
+    assert get_operation("Division") is OPERATIONS["division"]
+    with pytest.raises(ValueError, match="Unsupported calculation type"):
+        get_operation("cube_root")
+
+
+@pytest.mark.parametrize("name, inputs, schema_message, model_message", [
+    ("division", [1, 2, 0], "Cannot divide by zero", "Cannot divide by zero."),
+    ("modulus", [1, 0], "Cannot perform modulus with zero", "Cannot perform modulus with zero."),
+    ("addition", [1], "addition requires at least two numbers",
+     "Inputs must be a list with at least two numbers."),
+    ("square_root", [1, 2], "square_root requires exactly one number",
+     "Square root requires exactly one number."),
+    ("logarithm", [8], "logarithm requires exactly two numbers",
+     "Logarithm requires exactly two numbers: [value, base]."),
+    ("exponentiation", [10, 300, 300], "Exponent too large, may cause overflow",
+     "Result too large (overflow)"),
+])
+def test_one_rule_serves_both_layers(name, inputs, schema_message, model_message):
+    operation = OPERATIONS[name]
+    with pytest.raises(ValueError) as schema_error:
+        operation.check(inputs)
+    assert str(schema_error.value) == schema_message
+    with pytest.raises(ValueError) as model_error:
+        operation.evaluate(inputs)
+    assert str(model_error.value) == model_message
+
+
+def test_factory_uses_registry():
+    calc = Calculation.create("Division", uuid.uuid4(), [10, 4])
+    assert isinstance(calc, Division)
+    assert calc.get_result() == 2.5
+
+
+def test_validated_inputs_are_not_checked_again():
+    inputs = [10.0, 4.0]
+    calc = Calculation.create("division", uuid.uuid4(), inputs, validated=True)
+    with patch.object(Operation, "check", side_effect=AssertionError("checked twice")):
+        assert calc.get_result() == 2.5
+        # Replaced inputs have not been through the schema, so they are checked
+        calc.inputs = [1.0, 0.0]
+        with pytest.raises(AssertionError):
+            calc.get_result()
+
+
+@pytest.mark.parametrize("name", sorted(
+    name for name, operation in OPERATIONS.items() if operation.left_fold
+))
+def test_append_continues_the_fold(name):
+    operation = OPERATIONS[name]
+    history, new = SAMPLE_INPUTS[name]
+    assert operation.append(operation.evaluate(history), new) == pytest.approx(
+        operation.evaluate(history + new)
+    )
+
+
+def test_append_checks_only_the_new_values():
+    assert OPERATIONS["division"].append(0.0, [4]) == 0.0  # a zero result is not a divisor
+    with pytest.raises(ValueError, match="Cannot divide by zero"):
+        OPERATIONS["division"].append(5.0, [2, 0])
+    with pytest.raises(ValueError, match="overflow"):
+        OPERATIONS["exponentiation"].append(1e10, [100, 100])
+    with pytest.raises(ValueError, match="does not support appending"):
+        OPERATIONS["square_root"].append(4.0, [9])
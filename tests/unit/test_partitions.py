@@ -0,0 +1,110 @@
+# tests/unit/test_partitions.py
+
+import uuid
+from datetime import date, datetime
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from app.core.ids import uuid7, uuid7_timestamp_ms
+from app.models.calculation import Calculation
+from app.partitions import (
+    PARTITION_HASH,
+    PARTITION_MONTH,
+    PARTITION_NONE,
+    add_months,
+    id_time_window,
+    partition_ddl,
+    partition_table_kwargs,
+    partitions_to_detach,
+)
+
+
+def compile_pg(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_add_months_wraps_years():
+    assert add_months(date(2026, 11, 15), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 31), -1) == date(2025, 12, 1)
+
+
+@pytest.mark.parametrize("mode, clause", [
+    (PARTITION_HASH, "PARTITION BY HASH (user_id)"),
+    (PARTITION_MONTH, "PARTITION BY RANGE (created_at)"),
+])
+def test_table_kwargs_render_partition_clause(mode, clause):
+    table = Table(
+        "calculations", MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("created_at", DateTime),
+        **partition_table_kwargs(mode),
+    )
+    assert clause in compile_pg(CreateTable(table))
+
+
+def test_unknown_mode_is_rejected():
+    assert partition_table_kwargs(PARTITION_NONE) == {}
+    with pytest.raises(ValueError):
+        partition_table_kwargs("weekly")
+
+
+def test_hash_partition_ddl_covers_every_remainder():
+    with patch("app.partitions.settings.CALCULATION_HASH_PARTITIONS", 4):
+        statements = partition_ddl(PARTITION_HASH)
+    assert len(statements) == 4
+    assert statements[3] == (
+        "CREATE TABLE IF NOT EXISTS calculations_p03 PARTITION OF calculations "
+        "FOR VALUES WITH (MODULUS 4, REMAINDER 3)"
+    )
+
+
+def test_month_partition_ddl_creates_current_and_future_months():
+    statements = partition_ddl(PARTITION_MONTH, today=date(2026, 11, 19), months_ahead=2)
+    assert statements == [
+        "CREATE TABLE IF NOT EXISTS calculations_y2026m11 PARTITION OF calculations "
+        "FOR VALUES FROM ('2026-11-01') TO ('2026-12-01')",
+        "CREATE TABLE IF NOT EXISTS calculations_y2026m12 PARTITION OF calculations "
+        "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')",
+        "CREATE TABLE IF NOT EXISTS calculations_y2027m01 PARTITION OF calculations "
+        "FOR VALUES FROM ('2027-01-01') TO ('2027-02-01')",
+    ]
+    assert partition_ddl(PARTITION_NONE) == []
+
+
+def test_only_month_partitions_past_retention_are_detached():
+    names = [
+        "calculations_p00",
+        "calculations_y2025m09",
+        "calculations_y2025m10",
+        "calculations_y2025m11",
+        "calculations_y2026m10",
+    ]
+    assert partitions_to_detach(names, older_than_months=12, today=date(2026, 10, 19)) == [
+        "calculations_y2025m09",
+    ]
+
+
+def test_id_time_window_brackets_uuid7_creation_time():
+    calc_id = uuid7()
+    low, high = id_time_window(calc_id)
+    created = datetime.utcfromtimestamp(uuid7_timestamp_ms(calc_id) / 1000)
+    assert low < created < high
+    assert id_time_window(uuid.uuid4()) is None
+
+
+def test_lookup_criteria_adds_partition_key_in_month_mode():
+    calc_id, user_id = uuid7(), uuid.uuid4()
+
+    plain = compile_pg(select(Calculation.id).where(*Calculation.lookup_criteria(calc_id, user_id)))
+    assert "created_at" not in plain.split("WHERE")[1]
+    assert "user_id" in plain.split("WHERE")[1]
+
+    with patch("app.models.calculation.settings.CALCULATION_PARTITIONING", PARTITION_MONTH):
+        pruned = compile_pg(select(Calculation.id).where(*Calculation.lookup_criteria(calc_id)))
+        legacy = compile_pg(select(Calculation.id).where(*Calculation.lookup_criteria(uuid.uuid4())))
+    assert "calculations.created_at BETWEEN" in pruned
+    assert "created_at" not in legacy.split("WHERE")[1]